@@ -2,10 +2,11 @@ import disnake
 from disnake.ext import commands
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
-import json
-import os
 import asyncio
 from utils.ClientUser import ClientUser
+from utils.persistence import PERSISTENCE
+from utils.database.boost_log import BoostLog
+from utils.guild_stats import GUILD_STATS
 
 
 class BoostView(disnake.ui.View):
@@ -137,45 +138,25 @@ class BoostTracker(commands.Cog):
     def __init__(self, bot: ClientUser):
         self.bot = bot
         self.boost_data_file = 'data/boost_settings.json'
-        self.boost_history_file = 'data/boost_history.json'
+        # Dữ liệu được giữ trong bộ nhớ, việc ghi file do PERSISTENCE đảm nhận
+        self.boost_settings: Dict = PERSISTENCE.load(self.boost_data_file, {})
+        PERSISTENCE.register("boost_settings", self.boost_data_file, lambda: self.boost_settings)
+        self.boost_log = BoostLog()
+        self.bot.shutdown_hooks.append(self.boost_log.close)
+    
+    def cog_unload(self):
+        if self.boost_log.close in self.bot.shutdown_hooks:
+            self.bot.shutdown_hooks.remove(self.boost_log.close)
+        self.bot.loop.create_task(self.boost_log.close())
     
     async def load_boost_settings(self) -> Dict:
-        """Load boost settings from file"""
-        try:
-            if os.path.exists(self.boost_data_file):
-                with open(self.boost_data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
-        except:
-            return {}
+        """Load boost settings"""
+        return self.boost_settings
     
     async def save_boost_settings(self, data: Dict):
-        """Save boost settings to file"""
-        try:
-            os.makedirs('data', exist_ok=True)
-            with open(self.boost_data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving boost settings: {e}")
-    
-    async def load_boost_history(self) -> List:
-        """Load boost history from file"""
-        try:
-            if os.path.exists(self.boost_history_file):
-                with open(self.boost_history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
-        except:
-            return []
-    
-    async def save_boost_history(self, data: List):
-        """Save boost history to file"""
-        try:
-            os.makedirs('data', exist_ok=True)
-            with open(self.boost_history_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving boost history: {e}")
+        """Save boost settings"""
+        self.boost_settings = data
+        PERSISTENCE.mark_dirty("boost_settings")
     
     @commands.Cog.listener()
     async def on_member_update(self, before: disnake.Member, after: disnake.Member):
@@ -309,9 +290,8 @@ class BoostTracker(commands.Cog):
                 view=view
             )
             
-            # Save to boost history
-            history = await self.load_boost_history()
-            history.append({
+            # Save to boost history, chỉ ghi thêm một dòng
+            await self.boost_log.append({
                 'user_id': member.id,
                 'user_name': str(member),
                 'guild_id': guild.id,
@@ -323,12 +303,6 @@ class BoostTracker(commands.Cog):
                 'channel_id': channel.id
             })
             
-            # Keep only last 100 boosts
-            if len(history) > 100:
-                history = history[-100:]
-            
-            await self.save_boost_history(history)
-            
             # Add reaction to the message
             try:
                 await message.add_reaction("🚀")
@@ -494,7 +468,8 @@ class BoostTracker(commands.Cog):
         # Current boost info
         boost_count = guild.premium_subscription_count or 0
         boost_tier = guild.premium_tier
-        boosters = [member for member in guild.members if member.premium_since]
+        guild_stats = GUILD_STATS.get(guild)
+        boosters = guild_stats.boosters
 
         embed.add_field(
             name="🚀 Boost hiện tại",
@@ -537,18 +512,22 @@ class BoostTracker(commands.Cog):
                 inline=False
             )
 
+        # Số liệu lịch sử lấy từ bảng tổng hợp
+        total_boosts, unique_boosters = await self.boost_log.stats(guild.id)
+        embed.add_field(
+            name="📈 Lịch sử",
+            value=f"**Tổng lượt boost:** {total_boosts}\n**Người boost khác nhau:** {unique_boosters}",
+            inline=True
+        )
+
         # Recent boosters (last 5)
         if boosters:
             try:
-                recent_boosters = sorted(
-                    [b for b in boosters if b.premium_since],
-                    key=lambda m: m.premium_since,
-                    reverse=True
-                )[:5]
+                recent_boosters = guild_stats.recent_boosters(5)
                 booster_list = []
-                for booster in recent_boosters:
-                    boost_time = f"<t:{int(booster.premium_since.timestamp())}:R>"
-                    booster_list.append(f"• {booster.mention} - {boost_time}")
+                for member_id, premium_since in recent_boosters:
+                    boost_time = f"<t:{int(premium_since.timestamp())}:R>"
+                    booster_list.append(f"• <@{member_id}> - {boost_time}")
 
                 if booster_list:
                     embed.add_field(
@@ -570,10 +549,9 @@ class BoostTracker(commands.Cog):
     async def boost_history(self, interaction: disnake.ApplicationCommandInteraction):
         """Hiển thị lịch sử boost"""
 
-        history = await self.load_boost_history()
-        guild_history = [entry for entry in history if entry['guild_id'] == interaction.guild.id]
+        total_boosts, _ = await self.boost_log.stats(interaction.guild.id)
 
-        if not guild_history:
+        if not total_boosts:
             embed = disnake.Embed(
                 title="📋 Lịch sử Boost",
                 description="Chưa có lịch sử boost nào được ghi nhận cho server này.",
@@ -584,21 +562,21 @@ class BoostTracker(commands.Cog):
 
         embed = disnake.Embed(
             title=f"📋 Lịch sử Boost - {interaction.guild.name}",
-            description=f"Hiển thị {len(guild_history)} boost gần đây:",
+            description=f"Hiển thị {total_boosts} boost gần đây:",
             color=0xFF73FA,
             timestamp=datetime.now()
         )
 
         # Show last 10 boosts
-        recent_history = guild_history[-10:]
+        recent_history = await self.boost_log.recent(interaction.guild.id, 10)
 
-        for i, entry in enumerate(reversed(recent_history), 1):
+        for i, entry in enumerate(recent_history, 1):
             try:
                 boost_time = datetime.fromisoformat(entry['boost_time'])
                 time_str = f"<t:{int(boost_time.timestamp())}:F>"
 
                 embed.add_field(
-                    name=f"🚀 Boost #{len(guild_history) - i + 1}",
+                    name=f"🚀 Boost #{total_boosts - i + 1}",
                     value=f"**User:** {entry.get('user_name', 'Unknown')}\n"
                           f"**Time:** {time_str}\n"
                           f"**Tier after:** {entry.get('tier_after', 0)}/3",
@@ -608,7 +586,7 @@ class BoostTracker(commands.Cog):
                 print(f"Error processing boost history entry: {e}")
                 continue
 
-        embed.set_footer(text=f"Tổng cộng {len(guild_history)} boost • Hiển thị 10 gần nhất")
+        embed.set_footer(text=f"Tổng cộng {total_boosts} boost • Hiển thị 10 gần nhất")
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
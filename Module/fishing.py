@@ -16,14 +16,70 @@ from disnake.ui import View, Button, Select
 import disnake
 
 from utils.ClientUser import ClientUser
+from utils.database.fishing_store import FishingStore
+
+
+class FishSampler:
+    """Bảng alias (Walker/Vose) cho một cấp cần câu, mỗi lần quăng cần chỉ cần một lần bốc ngẫu nhiên
+
+    outcomes là danh sách (kết quả, xác suất), kết quả None nghĩa là không câu được gì
+    """
+
+    __slots__ = ("outcomes", "probabilities", "_prob", "_alias")
+
+    def __init__(self, outcomes: List[tuple[Optional[str], float]]):
+        total = sum(weight for _, weight in outcomes)
+        self.outcomes = [outcome for outcome, _ in outcomes]
+        self.probabilities = {outcome: weight / total for outcome, weight in outcomes}
+
+        size = len(outcomes)
+        scaled = [weight / total * size for _, weight in outcomes]
+        self._prob = [1.0] * size
+        self._alias = list(range(size))
+        small = [i for i, value in enumerate(scaled) if value < 1]
+        large = [i for i, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._prob[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+
+    def sample(self, rng: Optional[random.Random] = None) -> Optional[str]:
+        # Một số ngẫu nhiên duy nhất: phần nguyên chọn cột, phần lẻ quyết định lấy cột hay alias
+        value = (rng or random).random() * len(self.outcomes)
+        column = int(value)
+        if value - column < self._prob[column]:
+            return self.outcomes[column]
+        return self.outcomes[self._alias[column]]
+
+    def table_probabilities(self) -> Dict[Optional[str], float]:
+        """Xác suất của từng kết quả suy ra từ bảng alias, phải khớp với probabilities"""
+        size = len(self.outcomes)
+        result: Dict[Optional[str], float] = dict.fromkeys(self.outcomes, 0.0)
+        for column in range(size):
+            result[self.outcomes[column]] += self._prob[column] / size
+            result[self.outcomes[self._alias[column]]] += (1 - self._prob[column]) / size
+        return result
+
+    def sample_many(self, n: int, rng: Optional[random.Random] = None) -> List[Optional[str]]:
+        rng = rng or random
+        size = len(self.outcomes)
+        outcomes, prob, alias = self.outcomes, self._prob, self._alias
+        result = []
+        for value in (rng.random() * size for _ in range(n)):
+            column = int(value)
+            result.append(outcomes[column] if value - column < prob[column] else outcomes[alias[column]])
+        return result
 
 
 class Fishing(commands.Cog):
     def __init__(self, bot):
         self.bot: ClientUser = bot
         
-        # Database giả lập cho fishing data
-        self.fishing_data = {}
+        # Dữ liệu người chơi lưu trong SQLite, người chơi đang hoạt động được giữ trong cache
+        self.store = FishingStore()
+        self.bot.shutdown_hooks.append(self.store.close)
         
         # Danh sách các loại cá
         self.fish_types = {
@@ -46,60 +102,89 @@ class Fishing(commands.Cog):
             5: {"name": "Cần câu huyền thoại", "price": 50000, "bonus": 100, "emoji": "🌟"}
         }
 
-    def get_user_data(self, user_id: int) -> Dict:
+        # Bảng lấy mẫu dựng sẵn cho từng cấp cần câu
+        self.samplers = self.build_samplers()
+
+    def cog_unload(self):
+        if self.store.close in self.bot.shutdown_hooks:
+            self.bot.shutdown_hooks.remove(self.store.close)
+        self.bot.loop.create_task(self.store.close())
+
+    async def get_user_data(self, user_id: int) -> Dict:
         """Lấy dữ liệu người chơi"""
-        if user_id not in self.fishing_data:
-            self.fishing_data[user_id] = {
-                "money": 100,
-                "fish_caught": {},
-                "rod_level": 1,
-                "last_fish": None,
-                "total_caught": 0,
-                "achievements": []
-            }
-        return self.fishing_data[user_id]
+        return await self.store.get(user_id)
 
-    def can_fish(self, user_id: int) -> bool:
+    def save_user_data(self, user_id: int):
+        """Đánh dấu dữ liệu người chơi đã thay đổi"""
+        self.store.mark_dirty(user_id)
+
+    def can_fish(self, data: Dict) -> bool:
         """Kiểm tra có thể câu cá không (cooldown)"""
-        data = self.get_user_data(user_id)
         if data["last_fish"] is None:
             return True
         
         cooldown = timedelta(seconds=30)  # 30 giây cooldown
         return datetime.now() - data["last_fish"] >= cooldown
 
-    def catch_fish(self, user_id: int) -> Optional[str]:
+    def build_samplers(self) -> Dict[int, FishSampler]:
+        """Dựng bảng xác suất cho từng cấp cần câu
+
+        - Tỉ lệ trượt giữ đúng như cách tính cũ: trượt khi mọi loại cá đều trượt
+        - Khi câu trúng, loại cá được chọn theo tỉ lệ chance (đã cộng bonus cần câu),
+          không còn thiên vị các loại cá đứng đầu danh sách
+        """
+        samplers = {}
+        for level, rod in self.fishing_rods.items():
+            chances = {
+                fish_emoji: min(fish_data["chance"] + rod["bonus"] * 0.1, 100) / 100
+                for fish_emoji, fish_data in self.fish_types.items()
+            }
+            miss = 1.0
+            for chance in chances.values():
+                miss *= 1 - chance
+            total_chance = sum(chances.values())
+            outcomes = [(fish_emoji, (1 - miss) * chance / total_chance) for fish_emoji, chance in chances.items()]
+            if miss > 0:
+                outcomes.append((None, miss))
+            samplers[level] = FishSampler(outcomes)
+        return samplers
+
+    def _record_catch(self, data: Dict, fish_emoji: str, count: int = 1):
+        data["total_caught"] += count
+        data["fish_caught"][fish_emoji] = data["fish_caught"].get(fish_emoji, 0) + count
+
+    def catch_fish(self, data: Dict, rng: Optional[random.Random] = None) -> Optional[str]:
         """Logic câu cá"""
-        data = self.get_user_data(user_id)
-        rod_bonus = self.fishing_rods[data["rod_level"]]["bonus"]
-        
-        # Tính toán xác suất với bonus từ cần câu
-        total_chance = 0
-        for fish_emoji, fish_data in self.fish_types.items():
-            adjusted_chance = fish_data["chance"] + (rod_bonus * 0.1)
-            if random.random() * 100 < adjusted_chance:
-                # Câu được cá!
-                data["last_fish"] = datetime.now()
-                data["total_caught"] += 1
-                
-                if fish_emoji not in data["fish_caught"]:
-                    data["fish_caught"][fish_emoji] = 0
-                data["fish_caught"][fish_emoji] += 1
-                
-                return fish_emoji
-        
-        # Không câu được gì
+        fish_emoji = self.samplers[data["rod_level"]].sample(rng)
         data["last_fish"] = datetime.now()
-        return None
+        if fish_emoji is not None:
+            self._record_catch(data, fish_emoji)
+        return fish_emoji
+
+    async def catch_many(self, user_id: int, n: int, rng: Optional[random.Random] = None) -> Dict[str, int]:
+        """Câu n lần liên tiếp cho người chơi (sự kiện, tự động câu), trả về số lượng từng loại cá câu được
+
+        Không kiểm tra thời gian chờ 30 giây giữa các lần câu, lệnh gọi tự chịu trách nhiệm giới hạn
+        """
+        data = await self.get_user_data(user_id)
+        caught: Dict[str, int] = {}
+        for fish_emoji in self.samplers[data["rod_level"]].sample_many(n, rng):
+            if fish_emoji is not None:
+                caught[fish_emoji] = caught.get(fish_emoji, 0) + 1
+        for fish_emoji, count in caught.items():
+            self._record_catch(data, fish_emoji, count)
+        data["last_fish"] = datetime.now()
+        self.save_user_data(user_id)
+        return caught
 
     @commands.slash_command(name="fish", description="🎣 Câu cá để kiếm tiền!")
     async def fish(self, inter: ApplicationCommandInteraction):
         await inter.response.defer()
         
-        user_data = self.get_user_data(inter.author.id)
+        user_data = await self.get_user_data(inter.author.id)
         
         # Kiểm tra cooldown
-        if not self.can_fish(inter.author.id):
+        if not self.can_fish(user_data):
             cooldown_left = 30 - (datetime.now() - user_data["last_fish"]).seconds
             embed = Embed(
                 title="⏰ Chờ một chút!",
@@ -120,7 +205,10 @@ class Fishing(commands.Cog):
         # Delay để tạo cảm giác hồi hộp
         await asyncio.sleep(2)
         
-        caught_fish = self.catch_fish(inter.author.id)
+        # Lấy lại dữ liệu sau khi chờ, bản cũ có thể đã bị bỏ khỏi cache
+        user_data = await self.get_user_data(inter.author.id)
+        caught_fish = self.catch_fish(user_data)
+        self.save_user_data(inter.author.id)
         
         if caught_fish:
             fish_info = self.fish_types[caught_fish]
@@ -171,7 +259,7 @@ class Fishing(commands.Cog):
     async def inventory(self, inter: ApplicationCommandInteraction):
         await inter.response.defer()
         
-        user_data = self.get_user_data(inter.author.id)
+        user_data = await self.get_user_data(inter.author.id)
         
         embed = Embed(
             title=f"🎒 Túi đồ của {inter.author.display_name}",
@@ -223,7 +311,7 @@ class Fishing(commands.Cog):
     async def fish_market(self, inter: ApplicationCommandInteraction):
         await inter.response.defer()
         
-        user_data = self.get_user_data(inter.author.id)
+        user_data = await self.get_user_data(inter.author.id)
         
         class FishMarketView(View):
             def __init__(self, fishing_game):
@@ -256,7 +344,7 @@ class Fishing(commands.Cog):
             async def market_select(self, select: Select, interaction: disnake.MessageInteraction):
                 await interaction.response.defer(ephemeral=True)
                 
-                user_data = self.fishing_game.get_user_data(interaction.author.id)
+                user_data = await self.fishing_game.get_user_data(interaction.author.id)
                 
                 if select.values[0] == "sell_all":
                     if not user_data["fish_caught"]:
@@ -277,6 +365,7 @@ class Fishing(commands.Cog):
                         
                         user_data["money"] += total_money
                         user_data["fish_caught"] = {}
+                        self.fishing_game.save_user_data(interaction.author.id)
                         
                         embed = Embed(
                             title="💰 Đã bán cá thành công!",
@@ -302,6 +391,7 @@ class Fishing(commands.Cog):
                         if user_data["money"] >= next_rod["price"]:
                             user_data["money"] -= next_rod["price"]
                             user_data["rod_level"] = next_level
+                            self.fishing_game.save_user_data(interaction.author.id)
                             
                             embed = Embed(
                                 title="🎉 Nâng cấp thành công!",
@@ -319,15 +409,11 @@ class Fishing(commands.Cog):
                             )
                 
                 elif select.values[0] == "leaderboard":
-                    # Tạo bảng xếp hạng
-                    leaderboard = []
-                    for user_id, data in self.fishing_game.fishing_data.items():
-                        leaderboard.append((user_id, data["total_caught"]))
-                    
-                    leaderboard.sort(key=lambda x: x[1], reverse=True)
+                    # Tạo bảng xếp hạng, đọc theo chỉ mục thay vì duyệt toàn bộ người chơi
+                    leaderboard = await self.fishing_game.store.leaderboard("total_caught", 10)
                     
                     lb_text = ""
-                    for i, (user_id, count) in enumerate(leaderboard[:10], 1):
+                    for i, (user_id, count) in enumerate(leaderboard, 1):
                         try:
                             user = self.fishing_game.bot.get_user(user_id)
                             name = user.display_name if user else f"User {user_id}"
@@ -428,7 +514,7 @@ class Fishing(commands.Cog):
     async def daily_fish(self, inter: ApplicationCommandInteraction):
         await inter.response.defer()
 
-        user_data = self.get_user_data(inter.author.id)
+        user_data = await self.get_user_data(inter.author.id)
 
         # Kiểm tra đã nhận daily chưa
         today = datetime.now().date()
@@ -458,6 +544,8 @@ class Fishing(commands.Cog):
                 user_data["fish_caught"][bonus_fish] = 0
             user_data["fish_caught"][bonus_fish] += 1
 
+        self.save_user_data(inter.author.id)
+
         embed = Embed(
             title="🎁 Phần thưởng hàng ngày!",
             description=f"Bạn đã nhận được:\n💰 **{daily_money}** xu",
@@ -480,7 +568,7 @@ class Fishing(commands.Cog):
     async def fish_quest(self, inter: ApplicationCommandInteraction):
         await inter.response.defer()
 
-        user_data = self.get_user_data(inter.author.id)
+        user_data = await self.get_user_data(inter.author.id)
 
         # Định nghĩa các nhiệm vụ
         quests = [
@@ -524,7 +612,7 @@ class Fishing(commands.Cog):
             color=0x7289DA
         )
 
-        completed_quests = user_data.get("completed_quests", [])
+        completed_quests = user_data.get("completed_quests", {})
 
         for quest in quests:
             if quest["id"] in completed_quests:
@@ -534,8 +622,9 @@ class Fishing(commands.Cog):
                 # Tự động nhận thưởng
                 if quest["id"] not in completed_quests:
                     user_data["money"] += quest["reward"]
-                    completed_quests.append(quest["id"])
+                    completed_quests[quest["id"]] = datetime.now().timestamp()
                     user_data["completed_quests"] = completed_quests
+                    self.save_user_data(inter.author.id)
                     status = f"✅ Vừa hoàn thành! +{quest['reward']} xu"
             else:
                 progress = 0
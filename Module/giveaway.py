@@ -1,21 +1,22 @@
 import disnake
-from disnake.ext import commands, tasks
+from disnake.ext import commands
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 import random
 import asyncio
-import json
-import os
+import heapq
 from utils.ClientUser import ClientUser
+from utils.database.giveaway_store import GiveawayStore
 
 
 class GiveawayView(disnake.ui.View):
     """View cho giveaway với button tham gia"""
     
-    def __init__(self, giveaway_id: str, bot: 'ClientUser'):
+    def __init__(self, giveaway_id: str, bot: 'ClientUser', store: GiveawayStore):
         super().__init__(timeout=None)
         self.giveaway_id = giveaway_id
         self.bot = bot
+        self.store = store
         
     @disnake.ui.button(
         label="🎉 Tham gia Giveaway",
@@ -26,35 +27,28 @@ class GiveawayView(disnake.ui.View):
     async def join_giveaway(self, button: disnake.ui.Button, interaction: disnake.MessageInteraction):
         """Button tham gia giveaway"""
         try:
-            # Load giveaway data
-            giveaway_data = await self.load_giveaway_data()
+            giveaway = await self.store.get(self.giveaway_id, with_participants=False)
             
-            if self.giveaway_id not in giveaway_data:
+            if giveaway is None:
                 await interaction.response.send_message("❌ Giveaway này không tồn tại!", ephemeral=True)
                 return
-                
-            giveaway = giveaway_data[self.giveaway_id]
             
             # Check if giveaway is still active
             end_time = datetime.fromisoformat(giveaway['end_time'])
-            if datetime.now() >= end_time:
+            if giveaway['ended'] or datetime.now() >= end_time:
                 await interaction.response.send_message("❌ Giveaway này đã kết thúc!", ephemeral=True)
                 return
             
-            # Check if user already joined
-            if interaction.author.id in giveaway['participants']:
+            # Add user to participants, chỉ thêm một dòng mới thay vì ghi lại toàn bộ dữ liệu
+            if not await self.store.add_participant(self.giveaway_id, interaction.author.id):
                 await interaction.response.send_message("❌ Bạn đã tham gia giveaway này rồi!", ephemeral=True)
                 return
             
-            # Add user to participants
-            giveaway['participants'].append(interaction.author.id)
-            await self.save_giveaway_data(giveaway_data)
-            
             # Success response
             embed = disnake.Embed(
                 title="🎉 Tham gia thành công!",
                 description=f"**Bạn đã tham gia giveaway:**\n🎁 **{giveaway['prize']}**\n\n"
-                           f"👥 **Số người tham gia:** {len(giveaway['participants'])}\n"
+                           f"👥 **Số người tham gia:** {giveaway['participant_count'] + 1}\n"
                            f"⏰ **Kết thúc:** <t:{int(end_time.timestamp())}:R>",
                 color=0x00FF00
             )
@@ -64,78 +58,74 @@ class GiveawayView(disnake.ui.View):
             
         except Exception as e:
             await interaction.response.send_message(f"❌ Có lỗi xảy ra: {str(e)}", ephemeral=True)
-    
-    async def load_giveaway_data(self) -> Dict:
-        """Load giveaway data from file"""
-        try:
-            if os.path.exists('data/giveaways.json'):
-                with open('data/giveaways.json', 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
-        except:
-            return {}
-    
-    async def save_giveaway_data(self, data: Dict):
-        """Save giveaway data to file"""
-        try:
-            os.makedirs('data', exist_ok=True)
-            with open('data/giveaways.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving giveaway data: {e}")
 
 
 class Giveaway(commands.Cog):
     """Hệ thống Giveaway đẹp và đầy đủ tính năng"""
     
+    # Số giây chờ trước khi thử kết thúc lại một giveaway bị lỗi
+    RETRY_DELAY = 30
+    
     def __init__(self, bot: ClientUser):
         self.bot = bot
-        self.giveaway_data_file = 'data/giveaways.json'
-        self.check_giveaways.start()
+        self.store = GiveawayStore()
+        # Min-heap (end_time, giveaway_id) của các giveaway chưa kết thúc
+        self.deadlines: List[tuple] = []
+        self.deadline_changed = asyncio.Event()
+        self.deadline_task = self.bot.loop.create_task(self.run_deadlines())
     
     def cog_unload(self):
-        self.check_giveaways.cancel()
+        self.deadline_task.cancel()
+        self.bot.loop.create_task(self.store.close())
     
-    async def load_giveaway_data(self) -> Dict:
-        """Load giveaway data from file"""
-        try:
-            if os.path.exists(self.giveaway_data_file):
-                with open(self.giveaway_data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
-        except:
-            return {}
+    def schedule_deadline(self, giveaway_id: str, end_time: float):
+        heapq.heappush(self.deadlines, (end_time, giveaway_id))
+        self.deadline_changed.set()
     
-    async def save_giveaway_data(self, data: Dict):
-        """Save giveaway data to file"""
+    async def run_deadlines(self):
+        """Ngủ đúng tới hạn chót gần nhất thay vì quét toàn bộ giveaway mỗi 30 giây"""
+        await self.bot.wait_until_ready()
         try:
-            os.makedirs('data', exist_ok=True)
-            with open(self.giveaway_data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.deadlines = await self.store.pending()
+            heapq.heapify(self.deadlines)
         except Exception as e:
-            print(f"Error saving giveaway data: {e}")
-    
-    @tasks.loop(seconds=30)
-    async def check_giveaways(self):
-        """Check for ended giveaways every 30 seconds"""
-        try:
-            giveaway_data = await self.load_giveaway_data()
-            current_time = datetime.now()
-            
-            for giveaway_id, giveaway in list(giveaway_data.items()):
-                end_time = datetime.fromisoformat(giveaway['end_time'])
+            print(f"Error loading giveaways: {e}")
+        
+        while True:
+            try:
+                self.deadline_changed.clear()
+                if not self.deadlines:
+                    await self.deadline_changed.wait()
+                    continue
+                
+                delay = self.deadlines[0][0] - datetime.now().timestamp()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self.deadline_changed.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 
-                if current_time >= end_time and not giveaway.get('ended', False):
+                _, giveaway_id = heapq.heappop(self.deadlines)
+                try:
+                    giveaway = await self.store.get(giveaway_id)
+                    # Có thể đã được kết thúc sớm bằng lệnh
+                    if giveaway is None or giveaway['ended']:
+                        continue
                     await self.end_giveaway(giveaway_id, giveaway)
-                    giveaway['ended'] = True
-                    await self.save_giveaway_data(giveaway_data)
-                    
-        except Exception as e:
-            print(f"Error checking giveaways: {e}")
-    
-    @check_giveaways.before_loop
-    async def before_check_giveaways(self):
-        await self.bot.wait_until_ready()
+                    await self.store.mark_ended(giveaway_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Đưa lại vào heap để thử lại sau, nếu không giveaway sẽ không bao giờ kết thúc
+                    print(f"Error ending giveaway {giveaway_id}, retrying in {self.RETRY_DELAY}s: {e}")
+                    self.schedule_deadline(giveaway_id, datetime.now().timestamp() + self.RETRY_DELAY)
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error checking giveaways: {e}")
+                await asyncio.sleep(5)
     
     async def end_giveaway(self, giveaway_id: str, giveaway: Dict):
         """End a giveaway and announce winners"""
@@ -294,15 +284,14 @@ class Giveaway(commands.Cog):
         embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/1211567863538786334/1312988508645752892/ExuEyes.gif")
         
         # Create view with join button
-        view = GiveawayView(giveaway_id, self.bot)
+        view = GiveawayView(giveaway_id, self.bot, self.store)
         
         # Send giveaway message
         await interaction.response.send_message("✅ Đang tạo giveaway...", ephemeral=True)
         giveaway_message = await target_channel.send(embed=embed, view=view)
         
         # Save giveaway data
-        giveaway_data = await self.load_giveaway_data()
-        giveaway_data[giveaway_id] = {
+        await self.store.create(giveaway_id, {
             'prize': prize,
             'duration': duration_seconds,
             'winners': winners,
@@ -310,12 +299,10 @@ class Giveaway(commands.Cog):
             'channel_id': target_channel.id,
             'message_id': giveaway_message.id,
             'guild_id': interaction.guild.id,
-            'participants': [],
             'start_time': datetime.now().isoformat(),
-            'end_time': end_time.isoformat(),
-            'ended': False
-        }
-        await self.save_giveaway_data(giveaway_data)
+            'end_time': end_time.isoformat()
+        })
+        self.schedule_deadline(giveaway_id, end_time.timestamp())
         
         # Success message
         success_embed = disnake.Embed(
@@ -360,14 +347,8 @@ class Giveaway(commands.Cog):
     async def list_giveaways(self, interaction: disnake.ApplicationCommandInteraction):
         """Hiển thị danh sách giveaway đang diễn ra"""
 
-        giveaway_data = await self.load_giveaway_data()
-        active_giveaways = []
-
-        for giveaway_id, giveaway in giveaway_data.items():
-            if giveaway['guild_id'] == interaction.guild.id and not giveaway.get('ended', False):
-                end_time = datetime.fromisoformat(giveaway['end_time'])
-                if datetime.now() < end_time:
-                    active_giveaways.append((giveaway_id, giveaway))
+        now = datetime.now().timestamp()
+        active_giveaways = await self.store.active_in_guild(interaction.guild.id, now, limit=10)
 
         if not active_giveaways:
             embed = disnake.Embed(
@@ -379,19 +360,22 @@ class Giveaway(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
+        total_active = await self.store.count_active_in_guild(interaction.guild.id, now)
+
         embed = disnake.Embed(
             title="📋 Danh sách Giveaway đang diễn ra",
-            description=f"🎉 **Tìm thấy {len(active_giveaways)} giveaway đang diễn ra:**",
+            description=f"🎉 **Tìm thấy {total_active} giveaway đang diễn ra:**",
             color=0x00FF88
         )
 
-        for i, (giveaway_id, giveaway) in enumerate(active_giveaways[:10], 1):  # Limit to 10
+        for i, giveaway in enumerate(active_giveaways, 1):  # Limit to 10
+            giveaway_id = giveaway['id']
             end_time = datetime.fromisoformat(giveaway['end_time'])
             host = self.bot.get_user(giveaway['host_id'])
 
             embed.add_field(
                 name=f"🎁 {i}. {giveaway['prize'][:50]}{'...' if len(giveaway['prize']) > 50 else ''}",
-                value=f"👥 **Tham gia:** {len(giveaway['participants'])}\n"
+                value=f"👥 **Tham gia:** {giveaway['participant_count']}\n"
                       f"🏆 **Số người thắng:** {giveaway['winners']}\n"
                       f"⏰ **Kết thúc:** <t:{int(end_time.timestamp())}:R>\n"
                       f"👤 **Host:** {host.mention if host else 'Unknown'}\n"
@@ -399,7 +383,7 @@ class Giveaway(commands.Cog):
                 inline=True
             )
 
-        embed.set_footer(text=f"Trang 1 • Tổng cộng {len(active_giveaways)} giveaway")
+        embed.set_footer(text=f"Trang 1 • Tổng cộng {total_active} giveaway")
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @commands.slash_command(name="giveaway-end", description="Kết thúc giveaway sớm")
@@ -411,14 +395,12 @@ class Giveaway(commands.Cog):
     ):
         """Kết thúc giveaway sớm"""
 
-        giveaway_data = await self.load_giveaway_data()
+        giveaway = await self.store.get(giveaway_id)
 
-        if giveaway_id not in giveaway_data:
+        if giveaway is None:
             await interaction.response.send_message("❌ Không tìm thấy giveaway với ID này!", ephemeral=True)
             return
 
-        giveaway = giveaway_data[giveaway_id]
-
         if giveaway['guild_id'] != interaction.guild.id:
             await interaction.response.send_message("❌ Giveaway này không thuộc server này!", ephemeral=True)
             return
@@ -436,8 +418,7 @@ class Giveaway(commands.Cog):
         await interaction.response.send_message("⏳ Đang kết thúc giveaway...", ephemeral=True)
 
         await self.end_giveaway(giveaway_id, giveaway)
-        giveaway['ended'] = True
-        await self.save_giveaway_data(giveaway_data)
+        await self.store.mark_ended(giveaway_id)
 
         embed = disnake.Embed(
             title="✅ Giveaway đã kết thúc!",
@@ -458,14 +439,12 @@ class Giveaway(commands.Cog):
     ):
         """Quay lại người thắng cho giveaway đã kết thúc"""
 
-        giveaway_data = await self.load_giveaway_data()
+        giveaway = await self.store.get(giveaway_id)
 
-        if giveaway_id not in giveaway_data:
+        if giveaway is None:
             await interaction.response.send_message("❌ Không tìm thấy giveaway với ID này!", ephemeral=True)
             return
 
-        giveaway = giveaway_data[giveaway_id]
-
         if giveaway['guild_id'] != interaction.guild.id:
             await interaction.response.send_message("❌ Giveaway này không thuộc server này!", ephemeral=True)
             return
@@ -530,14 +509,12 @@ class Giveaway(commands.Cog):
     ):
         """Xem thông tin chi tiết về giveaway"""
 
-        giveaway_data = await self.load_giveaway_data()
+        giveaway = await self.store.get(giveaway_id)
 
-        if giveaway_id not in giveaway_data:
+        if giveaway is None:
             await interaction.response.send_message("❌ Không tìm thấy giveaway với ID này!", ephemeral=True)
             return
 
-        giveaway = giveaway_data[giveaway_id]
-
         if giveaway['guild_id'] != interaction.guild.id:
             await interaction.response.send_message("❌ Giveaway này không thuộc server này!", ephemeral=True)
             return
@@ -19,6 +19,8 @@ from mafic import Track, Playlist, TrackEndEvent, EndReason, Timescale, Filter,
     TrackStuckEvent
 from musicCore.player import MusicPlayer, QueueInterface, VolumeInteraction, SelectInteraction, STATE
 from musicCore.check import check_voice, has_player
+from utils.controller.scheduler import CONTROLLER_SCHEDULER
+from utils.database.player_snapshot import PlayerSnapshotStore
 from utils.conv import trim_text, time_format, string_to_seconds, percentage, music_source_image, URLREGEX, \
     YOUTUBE_VIDEO_REG, LoopMODE
 from re import match
@@ -29,6 +31,85 @@ from utils.error import GenericError, NoPlayer, DiffVoice, YoutubeSourceDisabled
 class Music(commands.Cog):
     def __init__(self, bot):
         self.bot: ClientUser = bot
+        # Lưu trạng thái trình phát định kỳ, khôi phục lại sau khi khởi động lại bot
+        self.snapshots = PlayerSnapshotStore(
+            self.player_snapshots,
+            flush_interval=float(self.bot.env.get("PLAYER_SNAPSHOT_INTERVAL", 15))
+        )
+        self.bot.shutdown_hooks.append(self.snapshots.close)
+        self.restore_lock = asyncio.Lock()
+        self.restore_task = self.bot.loop.create_task(self.restore_players()) if self.bot.env.get("PLAYER_SNAPSHOT", "True") == "True" else None
+
+    def cog_unload(self):
+        if self.restore_task is not None:
+            self.restore_task.cancel()
+        if self.snapshots.close in self.bot.shutdown_hooks:
+            self.bot.shutdown_hooks.remove(self.snapshots.close)
+        self.bot.loop.create_task(self.snapshots.close())
+
+    def player_snapshots(self):
+        for voice_client in self.bot.voice_clients:
+            if isinstance(voice_client, MusicPlayer):
+                snapshot = voice_client.snapshot()
+                if snapshot is not None:
+                    yield snapshot
+
+    async def restore_players(self):
+        """Khôi phục trình phát đã lưu sau khi các node đã kết nối (và resume) xong"""
+        await self.bot.wait_until_ready()
+        await self.bot.connect_node_task
+        try:
+            await self.snapshots.load_all()
+            await self.restore_pending()
+        finally:
+            # Bắt đầu lưu định kỳ, trạng thái chưa khôi phục được vẫn được giữ lại để thử lại
+            self.snapshots.start()
+
+    async def restore_pending(self):
+        """Thử khôi phục các trạng thái còn chờ, lỗi tạm thời sẽ được thử lại khi có node sẵn sàng"""
+        async with self.restore_lock:
+            restored = 0
+            for snapshot in self.snapshots.pending():
+                try:
+                    if await self.restore_player(snapshot):
+                        restored += 1
+                except Exception as e:
+                    self.bot.logger.error(f"Không thể khôi phục trình phát tại GUILDID {snapshot['guild_id']}: {e!r}")
+            if restored:
+                self.bot.logger.info(f"Đã khôi phục {restored} trình phát")
+
+    async def restore_player(self, snapshot: dict) -> bool:
+        guild = self.bot.get_guild(snapshot["guild_id"])
+        if guild is None:
+            return False
+
+        player = guild.voice_client
+        if isinstance(player, MusicPlayer):
+            # Lavalink vẫn giữ trình phát nhờ session được resume qua Node.sync_players
+            await player.restore(snapshot, resumed=True)
+        elif player is None:
+            if not self.bot.available_nodes:
+                return False
+            channel = guild.get_channel(snapshot["voice_channel_id"])
+            if channel is None:
+                # Kênh thoại đã bị xóa, không thể khôi phục
+                self.snapshots.restored(guild.id)
+                return False
+            player = await channel.connect(cls=MusicPlayer)
+            await player.restore(snapshot)
+        else:
+            return False
+
+        self.snapshots.restored(guild.id)
+        await player.controller()
+        CONTROLLER_SCHEDULER.register(player)
+        return True
+
+    @commands.Cog.listener("on_node_ready")
+    async def retry_restore(self, node):
+        # Chỉ thử lại sau lần khôi phục đầu tiên, lần đầu chờ mọi node kết nối xong
+        if self.restore_task is not None and self.restore_task.done():
+            await self.restore_pending()
 
 
     search_list = {
@@ -131,10 +212,9 @@ class Music(commands.Cog):
 
                 if view.select == "playlist":
 
-                    total_time = 0
-                    for track in result.tracks:
-                        player.queue.add_next_track(track)
-                        if not track.stream: total_time += track.length
+                    # Thêm payload thô, Track chỉ được tạo khi bài được phát tới
+                    player.queue.extend(result.raw_tracks)
+                    total_time = result.total_length
 
                     thumbnail_track = result.tracks[0]
                     embed = Embed(
@@ -142,10 +222,10 @@ class Music(commands.Cog):
                         url=thumbnail_track.uri,
                         color=0xFFFFFF
                     )
-                    embed.set_author(name=result.tracks[0].source.capitalize(),
-                                     icon_url=music_source_image(result.tracks[0].source.lower()))
+                    embed.set_author(name=thumbnail_track.source.capitalize(),
+                                     icon_url=music_source_image(thumbnail_track.source.lower()))
                     embed.description = f"``{thumbnail_track.source.capitalize()} | {result.tracks.__len__()} {select_opt_music_label.lower()} | {time_format(total_time)}``"
-                    embed.set_thumbnail(result.tracks[0].artwork_url)
+                    embed.set_thumbnail(thumbnail_track.artwork_url)
                     try:
                         await inter.edit_original_response(embed=embed, delete_after=5, view=None,
                                                            flags=MessageFlags(suppress_notifications=True))  # noqa
@@ -210,7 +290,7 @@ class Music(commands.Cog):
 
         if not begined:
             await player.process_next()
-            player.update_controller_task = self.bot.loop.create_task(player.update_controller())
+            CONTROLLER_SCHEDULER.register(player)
             self.bot.logger.info(f"Trình phát được khởi tạo tại máy chủ {inter.guild.id}")
         else:
             await player.controller()
@@ -897,6 +977,7 @@ class Music(commands.Cog):
             raise NoPlayer()
         if not (interaction.author.voice and interaction.author.id in interaction.guild.me.voice.channel.voice_states):
             raise DiffVoice()
+        CONTROLLER_SCHEDULER.touch(interaction.guild.id)
         match customID:
             case "player_controller_pause_resume_btn":
                 await player.pause_player()
@@ -3,12 +3,34 @@ from disnake.ext import commands
 from datetime import datetime
 from typing import Optional
 from utils.ClientUser import ClientUser
+from utils.guild_stats import GUILD_STATS
 
 
 class ServerInfo(commands.Cog):
     def __init__(self, bot: ClientUser):
         self.bot = bot
 
+    # Giữ bộ đếm thành viên luôn khớp với cache của guild
+    @commands.Cog.listener()
+    async def on_member_join(self, member: disnake.Member):
+        GUILD_STATS.member_join(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: disnake.Member):
+        GUILD_STATS.member_remove(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: disnake.Member, after: disnake.Member):
+        GUILD_STATS.member_update(before, after)
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: disnake.Member, after: disnake.Member):
+        GUILD_STATS.member_update(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: disnake.Guild):
+        GUILD_STATS.forget(guild.id)
+
     @commands.cooldown(1, 5, commands.BucketType.user)
     @commands.slash_command(name="server-info", description="Xem thông tin chi tiết về server")
     async def server_info(self, interaction: disnake.ApplicationCommandInteraction):
@@ -20,9 +42,10 @@ class ServerInfo(commands.Cog):
         guild = interaction.guild
 
         # Get server statistics
+        stats = GUILD_STATS.get(guild)
         total_members = guild.member_count
-        online_members = sum(1 for member in guild.members if member.status != disnake.Status.offline)
-        bot_count = sum(1 for member in guild.members if member.bot)
+        online_members = stats.online
+        bot_count = stats.bots
         human_count = total_members - bot_count
 
         # Get channel counts
@@ -265,13 +288,14 @@ class ServerInfo(commands.Cog):
         guild = interaction.guild
 
         # Count members by status
-        online = sum(1 for member in guild.members if member.status == disnake.Status.online)
-        idle = sum(1 for member in guild.members if member.status == disnake.Status.idle)
-        dnd = sum(1 for member in guild.members if member.status == disnake.Status.dnd)
-        offline = sum(1 for member in guild.members if member.status == disnake.Status.offline)
+        stats = GUILD_STATS.get(guild)
+        online = stats.count(disnake.Status.online)
+        idle = stats.count(disnake.Status.idle)
+        dnd = stats.count(disnake.Status.dnd)
+        offline = stats.count(disnake.Status.offline)
 
         # Count bots vs humans
-        bots = sum(1 for member in guild.members if member.bot)
+        bots = stats.bots
         humans = guild.member_count - bots
 
         embed = disnake.Embed(
@@ -4,14 +4,23 @@ import json
 import os
 from datetime import datetime
 import asyncio
+from utils.persistence import PERSISTENCE
+from utils.database.ticket_store import TicketStore
 
 class TicketSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config_file = "Data/ticket_config.json"
-        self.tickets_file = "Data/tickets.json"
+        PERSISTENCE.register("ticket_config", self.config_file, lambda: self.config, indent=4)
+        # Ticket được lưu từng dòng trong SQLite thay vì ghi lại cả file
+        self.tickets = TicketStore()
+        self.bot.shutdown_hooks.append(self.tickets.close)
         self.load_config()
-        self.load_tickets()
+
+    def cog_unload(self):
+        if self.tickets.close in self.bot.shutdown_hooks:
+            self.bot.shutdown_hooks.remove(self.tickets.close)
+        self.bot.loop.create_task(self.tickets.close())
         
     def load_config(self):
         """Load ticket configuration"""
@@ -50,31 +59,14 @@ class TicketSystem(commands.Cog):
         }
         
         if os.path.exists(self.config_file):
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
+            self.config = PERSISTENCE.load(self.config_file, default_config)
         else:
             self.config = default_config
             self.save_config()
     
     def save_config(self):
         """Save ticket configuration"""
-        os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, indent=4, ensure_ascii=False)
-    
-    def load_tickets(self):
-        """Load active tickets"""
-        if os.path.exists(self.tickets_file):
-            with open(self.tickets_file, 'r', encoding='utf-8') as f:
-                self.tickets = json.load(f)
-        else:
-            self.tickets = {}
-    
-    def save_tickets(self):
-        """Save active tickets"""
-        os.makedirs(os.path.dirname(self.tickets_file), exist_ok=True)
-        with open(self.tickets_file, 'w', encoding='utf-8') as f:
-            json.dump(self.tickets, f, indent=4, ensure_ascii=False)
+        PERSISTENCE.mark_dirty("ticket_config")
 
     @commands.slash_command(name="ticket")
     async def ticket_command(self, interaction):
@@ -285,19 +277,15 @@ class TicketSystem(commands.Cog):
             await interaction.response.send_message("❌ Bạn cần quyền Manage Messages!", ephemeral=True)
             return
 
-        guild_tickets = [t for t in self.tickets.values() if t.get("guild_id") == interaction.guild.id]
-        open_tickets = [t for t in guild_tickets if t.get("status") == "open"]
-
-        # Count by type
-        type_counts = {}
-        for ticket in guild_tickets:
-            ticket_type = ticket.get("type", "unknown")
-            type_counts[ticket_type] = type_counts.get(ticket_type, 0) + 1
+        stats = await self.tickets.stats(interaction.guild.id)
+        total_tickets = sum(total for total, _ in stats.values())
+        open_tickets = sum(opened for _, opened in stats.values())
+        type_counts = {ticket_type: total for ticket_type, (total, _) in stats.items()}
 
         embed = disnake.Embed(title="📊 Thống kê Ticket", color=0x7289da)
-        embed.add_field(name="🎫 Tổng ticket", value=len(guild_tickets), inline=True)
-        embed.add_field(name="🔓 Đang mở", value=len(open_tickets), inline=True)
-        embed.add_field(name="🔒 Đã đóng", value=len(guild_tickets) - len(open_tickets), inline=True)
+        embed.add_field(name="🎫 Tổng ticket", value=total_tickets, inline=True)
+        embed.add_field(name="🔓 Đang mở", value=open_tickets, inline=True)
+        embed.add_field(name="🔒 Đã đóng", value=total_tickets - open_tickets, inline=True)
 
         if type_counts:
             ticket_types = self.config.get('ticket_types', {})
@@ -330,15 +318,13 @@ class TicketSystem(commands.Cog):
             return
 
         target_channel = channel or interaction.channel
-        ticket_id = str(target_channel.id)
 
-        if ticket_id not in self.tickets:
+        if await self.tickets.get(target_channel.id) is None:
             await interaction.response.send_message("❌ Đây không phải kênh ticket!", ephemeral=True)
             return
 
         # Close ticket
-        self.tickets[ticket_id]["status"] = "closed"
-        self.save_tickets()
+        await self.tickets.mark_closed(target_channel.id)
 
         embed = disnake.Embed(
             title="🔒 Ticket đã được đóng",
@@ -376,14 +362,13 @@ class TicketPanelView(disnake.ui.View):
     async def create_ticket_button(self, interaction: disnake.MessageInteraction):
         try:
             # Check max tickets
-            user_tickets = [t for t in self.ticket_system.tickets.values()
-                           if t.get("user_id") == interaction.user.id and t.get("guild_id") == interaction.guild.id and t.get("status") == "open"]
+            open_count = await self.ticket_system.tickets.count_open_by_owner(interaction.guild.id, interaction.user.id)
             max_tickets = self.ticket_system.config.get("max_tickets_per_user", 3)
 
-            if len(user_tickets) >= max_tickets:
+            if open_count >= max_tickets:
                 embed = disnake.Embed(
                     title="❌ Quá nhiều ticket",
-                    description=f"Bạn đã có {len(user_tickets)} ticket đang mở. Tối đa {max_tickets} ticket/người.",
+                    description=f"Bạn đã có {open_count} ticket đang mở. Tối đa {max_tickets} ticket/người.",
                     color=0xff6b6b
                 )
                 await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -496,7 +481,8 @@ class TicketTypeView(disnake.ui.View):
 
             # Create channel with safe name
             safe_username = ''.join(c for c in interaction.user.name if c.isalnum() or c in '-_')[:20]
-            channel_name = f"ticket-{safe_username}-{len(self.ticket_system.tickets) + 1}"
+            ticket_number = sum(total for total, _ in (await self.ticket_system.tickets.stats(guild.id)).values()) + 1
+            channel_name = f"ticket-{safe_username}-{ticket_number}"
 
             overwrites = {
                 guild.default_role: disnake.PermissionOverwrite(read_messages=False),
@@ -517,16 +503,15 @@ class TicketTypeView(disnake.ui.View):
             )
 
             # Save ticket info
-            ticket_id = str(channel.id)
-            self.ticket_system.tickets[ticket_id] = {
+            ticket_id = channel.id
+            await self.ticket_system.tickets.create({
                 "user_id": interaction.user.id,
                 "guild_id": guild.id,
                 "channel_id": channel.id,
                 "type": ticket_type,
                 "created_at": datetime.now().isoformat(),
                 "status": "open"
-            }
-            self.ticket_system.save_tickets()
+            })
 
             # Send welcome message
             embed = disnake.Embed(
@@ -566,14 +551,14 @@ class TicketControlView(disnake.ui.View):
     @disnake.ui.button(label="🔒 Đóng Ticket", style=disnake.ButtonStyle.danger, custom_id="close_ticket")
     async def close_ticket(self, button: disnake.ui.Button, interaction: disnake.MessageInteraction):
         try:
-            ticket_id = str(interaction.channel.id)
+            ticket_id = interaction.channel.id
+            ticket_info = await self.ticket_system.tickets.get(ticket_id)
 
-            if ticket_id not in self.ticket_system.tickets:
+            if ticket_info is None:
                 await interaction.response.send_message("❌ Không tìm thấy ticket!", ephemeral=True)
                 return
 
             # Check if user can close ticket
-            ticket_info = self.ticket_system.tickets[ticket_id]
             support_roles = self.ticket_system.config.get("support_roles", [])
             user_roles = [role.id for role in interaction.user.roles]
 
@@ -621,9 +606,7 @@ class ConfirmCloseView(disnake.ui.View):
     async def confirm_close(self, button: disnake.ui.Button, interaction: disnake.MessageInteraction):
         try:
             # Mark ticket as closed instead of deleting immediately
-            if self.ticket_id in self.ticket_system.tickets:
-                self.ticket_system.tickets[self.ticket_id]["status"] = "closed"
-                self.ticket_system.save_tickets()
+            await self.ticket_system.tickets.mark_closed(self.ticket_id)
 
             await interaction.response.edit_message(
                 embed=disnake.Embed(title="✅ Ticket sẽ bị xóa sau 5 giây", color=0x00ff00),
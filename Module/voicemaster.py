@@ -1,8 +1,7 @@
 import disnake
 from disnake.ext import commands
-import json
-import os
 import asyncio
+from utils.persistence import PERSISTENCE
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -14,33 +13,23 @@ class VoiceMaster(commands.Cog):
         self.bot = bot
         self.config_file = 'data/voicemaster_config.json'
         self.temp_channels: Dict[int, Dict] = {}  # Store temp channel info
+        # Cấu hình được giữ trong bộ nhớ, chỉ đọc file một lần khi nạp module
+        self.config: Dict[str, Dict] = PERSISTENCE.load(self.config_file, {})
+        PERSISTENCE.register("voicemaster_config", self.config_file, lambda: self.config)
     
-    def load_config(self) -> Dict:
-        """Load VoiceMaster configuration"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            print(f"Error loading config: {e}")
-            return {}
+    def get_guild_config(self, guild_id: int) -> Dict:
+        return self.config.get(str(guild_id), {})
     
-    def save_config(self, data: Dict):
+    async def save_config(self):
         """Save VoiceMaster configuration"""
-        try:
-            os.makedirs('data', exist_ok=True)
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving voicemaster config: {e}")
+        PERSISTENCE.mark_dirty("voicemaster_config")
+        await PERSISTENCE.flush("voicemaster_config")
     
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: disnake.Member, before: disnake.VoiceState, after: disnake.VoiceState):
         """Handle voice state changes"""
         try:
-            config = self.load_config()
-            guild_config = config.get(str(member.guild.id), {})
+            guild_config = self.get_guild_config(member.guild.id)
             
             if not guild_config.get('enabled', False):
                 return
@@ -60,8 +49,7 @@ class VoiceMaster(commands.Cog):
         """Create temporary voice channel for user"""
         try:
             guild = member.guild
-            config = self.load_config()
-            guild_config = config.get(str(guild.id), {})
+            guild_config = self.get_guild_config(guild.id)
             
             # Get category
             category_id = guild_config.get('category_id')
@@ -169,8 +157,7 @@ class VoiceMaster(commands.Cog):
             )
             
             # Save config
-            config = self.load_config()
-            config[str(guild.id)] = {
+            self.config[str(guild.id)] = {
                 'enabled': True,
                 'join_to_create_id': join_channel.id,
                 'category_id': category.id,
@@ -179,7 +166,7 @@ class VoiceMaster(commands.Cog):
                 'setup_by': interaction.user.id,
                 'setup_time': datetime.now().isoformat()
             }
-            self.save_config(config)
+            await self.save_config()
             
             embed = disnake.Embed(
                 title="✅ VoiceMaster Setup Complete!",
@@ -229,16 +216,15 @@ class VoiceMaster(commands.Cog):
             return
 
         try:
-            config = self.load_config()
-            guild_config = config.get(str(interaction.guild.id), {})
+            guild_config = self.get_guild_config(interaction.guild.id)
 
             if not guild_config.get('enabled', False):
                 await interaction.response.send_message("❌ VoiceMaster chưa được thiết lập!", ephemeral=True)
                 return
 
             
-            config[str(interaction.guild.id)]['enabled'] = False
-            self.save_config(config)
+            guild_config['enabled'] = False
+            await self.save_config()
 
             embed = disnake.Embed(
                 title="🔕 VoiceMaster Disabled",
@@ -255,8 +241,7 @@ class VoiceMaster(commands.Cog):
     async def voicemaster_stats(self, interaction: disnake.ApplicationCommandInteraction):
         """Xem thống kê VoiceMaster"""
         try:
-            config = self.load_config()
-            guild_config = config.get(str(interaction.guild.id), {})
+            guild_config = self.get_guild_config(interaction.guild.id)
 
             if not guild_config.get('enabled', False):
                 await interaction.response.send_message("❌ VoiceMaster chưa được thiết lập!", ephemeral=True)
@@ -8,14 +8,20 @@
 import logging
 
 from . import __libraries
+from .__libraries import JSON_BACKEND
+from .cache import *
+from .codec import *
+from .decoders import *
 from .errors import *
 from .events import *
 from .filter import *
+from .health import *
 from .ip import *
 from .node import *
 from .player import *
 from .playlist import *
 from .pool import *
+from .rebalancer import *
 from .region import *
 from .search_type import *
 from .stats import *
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+from logging import getLogger
 from os import getenv
 from typing import TYPE_CHECKING, Any
 
@@ -20,6 +21,7 @@ __all__ = (
     "Guild",
     "GuildChannel",
     "GuildVoiceStatePayload",
+    "JSON_BACKEND",
     "MISSING",
     "StageChannel",
     "VoiceChannel",
@@ -125,13 +127,54 @@ else:
         )
 
 
-try:
+_JSON_BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _json_backend() -> str:
+    """Pick the fastest installed JSON library, ``MAFIC_JSON_BACKEND`` overrides it."""
+    requested = getenv("MAFIC_JSON_BACKEND")
+    if requested is not None and requested not in _JSON_BACKENDS:
+        getLogger(__name__).warning(
+            "Unsupported MAFIC_JSON_BACKEND %r, expected one of %s.",
+            requested,
+            ", ".join(_JSON_BACKENDS),
+        )
+        requested = None
+
+    for backend in (requested, "orjson", "msgspec"):
+        if backend is None:
+            continue
+        try:
+            __import__(backend)
+        except ImportError:
+            continue
+        return backend
+
+    return "json"
+
+
+JSON_BACKEND = _json_backend()
+"""The library used by :func:`dumps` and :func:`loads`.
+
+This is ``orjson`` or ``msgspec`` when installed, else the standard library.
+"""
+
+if JSON_BACKEND == "orjson":
     from orjson import dumps as _dumps, loads
 
     def dumps(obj: Any) -> str:  # noqa: ANN401
         return _dumps(obj).decode()
 
-except ImportError:
+elif JSON_BACKEND == "msgspec":
+    import msgspec
+
+    _encoder = msgspec.json.Encoder()
+    loads = msgspec.json.Decoder().decode
+
+    def dumps(obj: Any) -> str:  # noqa: ANN401
+        return _encoder.encode(obj).decode()
+
+else:
     from json import dumps, loads
 
 
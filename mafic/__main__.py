@@ -43,6 +43,11 @@ def core(_: ArgumentParser, args: Namespace) -> None:
     if args.version:
         show_version()
 
+    if args.benchmark:
+        from .benchmark import run
+
+        run()
+
 
 def parse_args() -> tuple[ArgumentParser, Namespace]:
     """Parse arguments from the CLI."""
@@ -53,6 +58,11 @@ def parse_args() -> tuple[ArgumentParser, Namespace]:
         action="store_true",
         help="shows mafic and other related versions",
     )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="times the JSON backends on recorded Lavalink payloads",
+    )
     return parser, parser.parse_args()
 
 
@@ -0,0 +1,115 @@
+"""Micro-benchmark of the JSON backends on recorded Lavalink payloads.
+
+Run it with ``python -m mafic --benchmark``.
+"""
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import json
+from timeit import repeat
+from typing import TYPE_CHECKING, Any
+
+from .__libraries import JSON_BACKEND
+from .codec import encode_track
+from .decoders import TYPED_DECODING, decode_message, decode_tracks
+from .stats import NodeStats
+from .track import Track
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .typings import TrackInfo
+
+__all__ = ("run",)
+
+# Recorded from a Lavalink v4 node, identifiers shortened.
+PLAYER_UPDATE = (
+    b'{"op":"playerUpdate","guildId":"1010101010101010101",'
+    b'"state":{"time":1700000000000,"position":61234,"connected":true,"ping":23}}'
+)
+STATS = (
+    b'{"op":"stats","players":812,"playingPlayers":640,"uptime":912345678,'
+    b'"memory":{"free":214748364,"used":536870912,"allocated":805306368,'
+    b'"reservable":4294967296},"cpu":{"cores":8,"systemLoad":0.4312,'
+    b'"lavalinkLoad":0.2178},"frameStats":{"sent":1920000,"nulled":312,"deficit":48}}'
+)
+
+
+def _track_list(count: int) -> bytes:
+    tracks = []
+    for index in range(count):
+        info: TrackInfo = {
+            "identifier": f"dQw4w9Wg{index:03d}",
+            "isSeekable": True,
+            "author": "RickAstleyVEVO",
+            "length": 212000,
+            "isStream": False,
+            "position": 0,
+            "title": f"Rick Astley - Never Gonna Give You Up ({index})",
+            "uri": f"https://www.youtube.com/watch?v=dQw4w9Wg{index:03d}",
+            "artworkUrl": "https://i.ytimg.com/vi/dQw4w9WgXcQ/maxresdefault.jpg",
+            "isrc": None,
+            "sourceName": "youtube",
+        }
+        tracks.append({"encoded": encode_track(info), "info": info})
+    return json.dumps(tracks).encode()
+
+
+def _backends() -> dict[str, Callable[[bytes], Any]]:
+    backends: dict[str, Callable[[bytes], Any]] = {"json": json.loads}
+
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        backends["orjson"] = orjson.loads
+
+    try:
+        import msgspec
+    except ImportError:
+        pass
+    else:
+        backends["msgspec"] = msgspec.json.Decoder().decode
+
+    return backends
+
+
+def _time(func: Callable[[], object], number: int) -> float:
+    """Best time per call in microseconds."""
+    return min(repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def run(number: int = 20000) -> None:
+    """Print the time taken to decode each payload with each backend.
+
+    Parameters
+    ----------
+    number:
+        The amount of decodes per measurement.
+    """
+    tracks = _track_list(100)
+    payloads: dict[str, tuple[bytes, Callable[[Any], object], int]] = {
+        "playerUpdate": (PLAYER_UPDATE, lambda data: data["state"]["position"], number),
+        "stats": (STATS, NodeStats, number),
+        "100 tracks": (
+            tracks,
+            lambda data: [Track.from_data_with_info(track) for track in data],
+            number // 100,
+        ),
+    }
+
+    print(f"Selected backend: {JSON_BACKEND}, typed decoding: {TYPED_DECODING}")  # noqa: T201
+    print(f"{'payload':<14}{'backend':<16}{'us/op':>10}")  # noqa: T201
+
+    for name, (data, build, count) in payloads.items():
+        for backend, loads in _backends().items():
+            elapsed = _time(lambda: build(loads(data)), count)  # noqa: B023
+            print(f"{name:<14}{backend:<16}{elapsed:>10.2f}")  # noqa: T201
+
+        if name == "100 tracks":
+            elapsed = _time(lambda: decode_tracks(data), count)  # noqa: B023
+        else:
+            elapsed = _time(lambda: decode_message(data), count)  # noqa: B023
+        print(f"{name:<14}{'typed':<16}{elapsed:>10.2f}")  # noqa: T201
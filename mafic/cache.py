@@ -0,0 +1,264 @@
+"""A cache for track loading results, used in front of ``loadtracks``."""
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from logging import getLogger
+from time import time
+from typing import TYPE_CHECKING
+
+from .__libraries import dumps, loads
+
+if TYPE_CHECKING:
+    from .typings import TrackLoadingResult
+
+__all__ = ("TrackCache",)
+
+_log = getLogger(__name__)
+_log.disabled = True
+
+_EMPTY_LOAD_TYPES = ("empty", "NO_MATCHES")
+_CACHEABLE_LOAD_TYPES = (
+    "track",
+    "playlist",
+    "search",
+    "TRACK_LOADED",
+    "PLAYLIST_LOADED",
+    "SEARCH_RESULT",
+    *_EMPTY_LOAD_TYPES,
+)
+# How often, in seconds, expired rows are removed from the SQLite tier.
+_PRUNE_INTERVAL = 600
+
+
+class TrackCache:
+    r"""An LRU cache of raw ``loadtracks`` results with an optional SQLite tier.
+
+    Entries are stored as the raw payload Lavalink returned, so every track keeps
+    its encoded data and :class:`~mafic.typings.TrackInfo`. This lets
+    :meth:`Track.from_data` rebuild tracks without contacting a node.
+
+    Parameters
+    ----------
+    capacity:
+        The maximum amount of entries kept in memory.
+    ttl:
+        How long, in seconds, a successful result is kept.
+    negative_ttl:
+        How long, in seconds, an empty result is kept.
+    path:
+        The path to an SQLite database used to persist entries across restarts.
+        If not provided, the cache only lives in memory.
+    """
+
+    __slots__ = (
+        "_capacity",
+        "_db",
+        "_db_lock",
+        "_entries",
+        "_last_prune",
+        "_negative_ttl",
+        "_path",
+        "_ttl",
+    )
+
+    def __init__(
+        self,
+        *,
+        capacity: int = 2048,
+        ttl: float = 3600,
+        negative_ttl: float = 300,
+        path: str | None = None,
+    ) -> None:
+        self._capacity = capacity
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._path = path
+
+        self._entries: OrderedDict[str, tuple[float, TrackLoadingResult]] = (
+            OrderedDict()
+        )
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._last_prune = 0.0
+
+    @staticmethod
+    def make_key(query: str, search_type: str) -> str:
+        """Build the cache key for a query.
+
+        URLs are kept as-is, as their paths and query strings are case sensitive.
+        Searches are whitespace collapsed and case folded, then prefixed with the
+        search type.
+
+        Parameters
+        ----------
+        query:
+            The query passed to :meth:`Node.fetch_tracks`.
+        search_type:
+            The search type used for the query.
+
+        Returns
+        -------
+        :class:`str`
+            The cache key.
+        """
+        query = query.strip()
+
+        if query.startswith(("http://", "https://")):
+            return query
+
+        return f"{search_type}:{' '.join(query.split()).casefold()}"
+
+    def __len__(self) -> int:
+        """Return the amount of entries kept in memory."""
+        return len(self._entries)
+
+    async def get(self, key: str) -> TrackLoadingResult | None:
+        r"""Get a cached result.
+
+        Parameters
+        ----------
+        key:
+            The key from :meth:`make_key`.
+
+        Returns
+        -------
+        :data:`~typing.Optional`\[:class:`dict`]
+            The raw ``loadtracks`` payload, or ``None`` if not cached or expired.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None and self._path is not None:
+            entry = await asyncio.to_thread(self._disk_get, key)
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None:
+            return None
+
+        expires_at, data = entry
+        if expires_at < time():
+            self._entries.pop(key, None)
+            return None
+
+        self._entries.move_to_end(key)
+        return data
+
+    async def put(self, key: str, data: TrackLoadingResult) -> None:
+        """Cache a result.
+
+        Load errors and unknown load types are never cached.
+
+        Parameters
+        ----------
+        key:
+            The key from :meth:`make_key`.
+        data:
+            The raw ``loadtracks`` payload.
+        """
+        load_type = data["loadType"]
+        if load_type not in _CACHEABLE_LOAD_TYPES:
+            return
+
+        ttl = self._negative_ttl if load_type in _EMPTY_LOAD_TYPES else self._ttl
+        entry = (time() + ttl, data)
+        self._remember(key, entry)
+
+        if self._path is not None:
+            await asyncio.to_thread(self._disk_put, key, entry)
+
+    async def invalidate(self, key: str) -> None:
+        """Remove an entry from memory and disk.
+
+        Parameters
+        ----------
+        key:
+            The key from :meth:`make_key`.
+        """
+        self._entries.pop(key, None)
+
+        if self._path is not None:
+            await asyncio.to_thread(self._disk_delete, key)
+
+    def clear(self) -> None:
+        """Remove every entry kept in memory."""
+        self._entries.clear()
+
+    def close(self) -> None:
+        """Close the SQLite database, if one is open."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, entry: tuple[float, TrackLoadingResult]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            assert self._path is not None
+
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._db = sqlite3.connect(self._path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS tracks(
+                    key TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                )"""
+            )
+            self._prune(self._db)
+            _log.debug("Opened track cache database at %s", self._path)
+
+        return self._db
+
+    def _prune(self, db: sqlite3.Connection) -> None:
+        now = time()
+        db.execute("DELETE FROM tracks WHERE expires_at < ?", (now,))
+        db.commit()
+        self._last_prune = now
+
+    def _disk_get(self, key: str) -> tuple[float, TrackLoadingResult] | None:
+        with self._db_lock:
+            row = (
+                self._connection()
+                .execute("SELECT expires_at, data FROM tracks WHERE key=?", (key,))
+                .fetchone()
+            )
+
+        if row is None:
+            return None
+
+        return row[0], loads(row[1])
+
+    def _disk_put(self, key: str, entry: tuple[float, TrackLoadingResult]) -> None:
+        with self._db_lock:
+            db = self._connection()
+            db.execute(
+                "INSERT OR REPLACE INTO tracks(key, expires_at, data) VALUES (?, ?, ?)",
+                (key, entry[0], dumps(entry[1])),
+            )
+            db.commit()
+
+            # Expired rows are otherwise only removed when the database is opened.
+            if time() - self._last_prune >= _PRUNE_INTERVAL:
+                self._prune(db)
+
+    def _disk_delete(self, key: str) -> None:
+        with self._db_lock:
+            db = self._connection()
+            db.execute("DELETE FROM tracks WHERE key=?", (key,))
+            db.commit()
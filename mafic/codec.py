@@ -0,0 +1,239 @@
+"""A local codec for the encoded track strings used by Lavalink.
+
+Lavalink (lavaplayer) encodes a track as a base64 message:
+
+- a 4 byte header, the upper 2 bits are flags and the rest is the message size
+- a version byte, if the ``TRACK_INFO_VERSIONED`` flag is set
+- title, author, length, identifier, stream flag
+- uri (version 2+), artwork URL and ISRC (version 3+)
+- the source name, followed by data specific to that source
+- the position of the track
+
+Strings are Java "modified UTF-8", prefixed with an unsigned 2 byte length.
+"""
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from base64 import b64decode, b64encode
+from binascii import Error as Base64Error
+from struct import error as StructError
+from struct import pack, unpack_from
+from typing import TYPE_CHECKING
+
+from .errors import TrackDecodeError
+
+if TYPE_CHECKING:
+    from .typings import TrackInfo, TrackWithInfo
+
+__all__ = ("decode_track", "decode_track_info", "encode_track")
+
+_TRACK_INFO_VERSIONED = 1
+_TRACK_INFO_VERSION = 3
+_SIZE_MASK = 0x3FFFFFFF
+
+
+def _decode_utf(data: bytes) -> str:
+    # Java writes NUL as C0 80 and characters outside the BMP as surrogate pairs.
+    if b"\xc0\x80" in data:
+        data = data.replace(b"\xc0\x80", b"\x00")
+
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("utf-8", "surrogatepass")
+        return text.encode("utf-16", "surrogatepass").decode("utf-16")
+
+
+def _surrogates(char: str) -> str:
+    code = ord(char) - 0x10000
+    return chr(0xD800 + (code >> 10)) + chr(0xDC00 + (code & 0x3FF))
+
+
+def _encode_utf(text: str) -> bytes:
+    if text.isascii():
+        data = text.encode("ascii")
+    else:
+        # Characters outside the BMP are written as surrogate pairs, like Java does.
+        if any(ord(char) > 0xFFFF for char in text):
+            text = "".join(
+                _surrogates(char) if ord(char) > 0xFFFF else char for char in text
+            )
+        data = text.encode("utf-8", "surrogatepass")
+
+    if b"\x00" in data:
+        data = data.replace(b"\x00", b"\xc0\x80")
+
+    if len(data) > 0xFFFF:
+        msg = "string is too long to encode"
+        raise ValueError(msg)
+
+    return pack(">H", len(data)) + data
+
+
+class _Reader:
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data: bytes, offset: int) -> None:
+        self.data = data
+        self.offset = offset
+
+    def byte(self) -> int:
+        value = self.data[self.offset]
+        self.offset += 1
+        return value
+
+    def boolean(self) -> bool:
+        return self.byte() != 0
+
+    def long(self) -> int:
+        (value,) = unpack_from(">q", self.data, self.offset)
+        self.offset += 8
+        return value
+
+    def utf(self) -> str:
+        (length,) = unpack_from(">H", self.data, self.offset)
+        start = self.offset + 2
+        self.offset = start + length
+        if self.offset > len(self.data):
+            msg = "string runs past the end of the message"
+            raise TrackDecodeError(msg)
+        return _decode_utf(self.data[start : self.offset])
+
+    def nullable_utf(self) -> str | None:
+        return self.utf() if self.boolean() else None
+
+
+def decode_track_info(encoded: str) -> tuple[TrackInfo, bytes]:
+    r"""Decode an encoded track into its info and source specific data.
+
+    Parameters
+    ----------
+    encoded:
+        The base64 encoded track, as in :attr:`Track.id`.
+
+    Returns
+    -------
+    :class:`tuple`\[:class:`~mafic.typings.TrackInfo`, :class:`bytes`]
+        The track info, and the raw data written by the source for this track.
+        Pass the data back to :func:`encode_track` to re-encode the track.
+
+    Raises
+    ------
+    TrackDecodeError
+        If the track is not valid.
+    """
+    try:
+        data = b64decode(encoded, validate=True)
+        (header,) = unpack_from(">I", data, 0)
+    except (Base64Error, StructError, ValueError) as e:
+        raise TrackDecodeError(str(e)) from None
+
+    flags = header >> 30
+    end = 4 + (header & _SIZE_MASK)
+    if end > len(data):
+        msg = "message is shorter than its header says"
+        raise TrackDecodeError(msg)
+
+    reader = _Reader(data[:end], 4)
+
+    try:
+        version = reader.byte() if flags & _TRACK_INFO_VERSIONED else 1
+        if version > _TRACK_INFO_VERSION:
+            msg = f"unsupported track version {version}"
+            raise TrackDecodeError(msg)
+
+        title = reader.utf()
+        author = reader.utf()
+        length = reader.long()
+        identifier = reader.utf()
+        stream = reader.boolean()
+        uri = reader.nullable_utf() if version >= 2 else None
+        artwork_url = reader.nullable_utf() if version >= 3 else None
+        isrc = reader.nullable_utf() if version >= 3 else None
+        source = reader.utf()
+
+        # The position is always last, whatever the source wrote before it.
+        source_data = data[reader.offset : end - 8]
+        (position,) = unpack_from(">q", data, end - 8)
+    except (IndexError, StructError) as e:
+        raise TrackDecodeError(str(e)) from None
+
+    if reader.offset > end - 8:
+        msg = "message is too short"
+        raise TrackDecodeError(msg)
+
+    info: TrackInfo = {
+        "identifier": identifier,
+        "isSeekable": not stream,
+        "author": author,
+        "length": length,
+        "isStream": stream,
+        "position": position,
+        "title": title,
+        "uri": uri,
+        "artworkUrl": artwork_url,
+        "isrc": isrc,
+        "sourceName": source,
+    }
+    return info, source_data
+
+
+def decode_track(encoded: str) -> TrackWithInfo:
+    """Decode an encoded track without contacting a node.
+
+    This returns the same data as Lavalink's ``decodetrack`` endpoint.
+
+    Parameters
+    ----------
+    encoded:
+        The base64 encoded track, as in :attr:`Track.id`.
+
+    Raises
+    ------
+    TrackDecodeError
+        If the track is not valid.
+    """
+    info, _ = decode_track_info(encoded)
+    return {"encoded": encoded, "info": info}
+
+
+def encode_track(info: TrackInfo, source_data: bytes = b"") -> str:
+    """Encode a track in the format Lavalink expects.
+
+    Parameters
+    ----------
+    info:
+        The track info.
+    source_data:
+        The data specific to the track source, as returned by
+        :func:`decode_track_info`. Sources such as ``youtube`` or ``soundcloud``
+        write nothing, ``http`` and ``local`` write the container probe.
+
+    Returns
+    -------
+    :class:`str`
+        The base64 encoded track.
+    """
+
+    def nullable(value: str | None) -> bytes:
+        return b"\x00" if value is None else b"\x01" + _encode_utf(value)
+
+    body = b"".join(
+        (
+            pack(">B", _TRACK_INFO_VERSION),
+            _encode_utf(info["title"]),
+            _encode_utf(info["author"]),
+            pack(">q", info["length"]),
+            _encode_utf(info["identifier"]),
+            pack(">?", info["isStream"]),
+            nullable(info["uri"]),
+            nullable(info.get("artworkUrl")),
+            nullable(info.get("isrc")),
+            _encode_utf(info["sourceName"]),
+            source_data,
+            pack(">q", info.get("position", 0)),
+        )
+    )
+    header = len(body) | (_TRACK_INFO_VERSIONED << 30)
+    return b64encode(pack(">I", header) + body).decode("ascii")
@@ -0,0 +1,254 @@
+r"""Typed decoders for the hottest Lavalink payloads.
+
+When :mod:`msgspec` is installed, ``playerUpdate`` and ``stats`` websocket frames and
+track lists are decoded from the raw frame straight into typed structs, without
+building the intermediate :class:`dict`\s. Without it, the payload is parsed with
+:func:`~mafic.__libraries.loads` and converted into the same types.
+"""
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING, Optional, Union
+
+from .__libraries import loads
+from .stats import CPUStats, FrameStats, MemoryStats, NodeStats
+from .track import Track
+
+if TYPE_CHECKING:
+    from .typings import IncomingMessage
+
+__all__ = (
+    "TYPED_DECODING",
+    "PlayerState",
+    "PlayerUpdate",
+    "decode_message",
+    "decode_tracks",
+)
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+TYPED_DECODING = msgspec is not None
+"""Whether payloads are decoded straight into structs by :mod:`msgspec`."""
+
+
+if msgspec is not None:
+
+    class PlayerState(msgspec.Struct):  # pyright: ignore[reportRedeclaration]
+        """The state sent in a ``playerUpdate`` message."""
+
+        time: int
+        connected: bool = False
+        position: int = 0
+        ping: int = -1
+
+    class PlayerUpdate(  # pyright: ignore[reportRedeclaration]
+        msgspec.Struct, tag_field="op", tag="playerUpdate", rename={"guild_id": "guildId"}
+    ):
+        """A ``playerUpdate`` message."""
+
+        guild_id: str
+        state: PlayerState
+
+    class _Memory(msgspec.Struct):
+        free: int
+        used: int
+        allocated: int
+        reservable: int
+
+    class _CPU(msgspec.Struct, rename="camel"):
+        cores: int
+        system_load: float
+        lavalink_load: float
+
+    class _Frames(msgspec.Struct):
+        sent: int
+        nulled: int
+        deficit: int
+
+    class _Stats(msgspec.Struct, tag_field="op", tag="stats", rename="camel"):
+        players: int
+        playing_players: int
+        uptime: int
+        memory: _Memory
+        cpu: _CPU
+        frame_stats: Optional[_Frames] = None  # noqa: UP007
+
+    class _TrackInfo(msgspec.Struct, rename="camel"):
+        identifier: str
+        is_seekable: bool
+        author: str
+        length: int
+        is_stream: bool
+        title: str
+        source_name: str
+        position: int = 0
+        uri: Optional[str] = None  # noqa: UP007
+        artwork_url: Optional[str] = None  # noqa: UP007
+        isrc: Optional[str] = None  # noqa: UP007
+
+    class _Track(msgspec.Struct):
+        encoded: str
+        info: _TrackInfo
+
+    _message_decoder = msgspec.json.Decoder(Union[PlayerUpdate, _Stats])
+    _tracks_decoder = msgspec.json.Decoder(list[_Track])
+
+    def _node_stats(data: _Stats) -> NodeStats:
+        # The stats classes are filled from the struct, skipping their dict __init__.
+        stats = NodeStats.__new__(NodeStats)
+        stats.player_count = data.players
+        stats.playing_player_count = data.playing_players
+        stats.uptime = timedelta(milliseconds=data.uptime)
+
+        memory = stats.memory = MemoryStats.__new__(MemoryStats)
+        memory.free = data.memory.free
+        memory.used = data.memory.used
+        memory.allocated = data.memory.allocated
+        memory.reservable = data.memory.reservable
+
+        cpu = stats.cpu = CPUStats.__new__(CPUStats)
+        cpu.cores = data.cpu.cores
+        cpu.system_load = data.cpu.system_load  # pyright: ignore[reportAttributeAccessIssue]
+        cpu.lavalink_load = data.cpu.lavalink_load  # pyright: ignore[reportAttributeAccessIssue]
+
+        if data.frame_stats is None:
+            stats.frame_stats = None
+        else:
+            frames = stats.frame_stats = FrameStats.__new__(FrameStats)
+            frames.sent = data.frame_stats.sent
+            frames.nulled = data.frame_stats.nulled
+            frames.deficit = data.frame_stats.deficit
+
+        return stats
+
+    def decode_message(  # pyright: ignore[reportRedeclaration]
+        data: str | bytes,
+    ) -> PlayerUpdate | NodeStats | IncomingMessage:
+        r"""Decode a websocket frame.
+
+        Parameters
+        ----------
+        data:
+            The raw frame.
+
+        Returns
+        -------
+        :data:`~typing.Union`\[:class:`PlayerUpdate`, :class:`NodeStats`, :class:`dict`]
+            A :class:`PlayerUpdate` or :class:`NodeStats` for those messages,
+            otherwise the parsed message.
+        """
+        try:
+            message = _message_decoder.decode(data)
+        except msgspec.ValidationError:
+            # Events and ready messages are rare, parse them the usual way.
+            return loads(data)
+
+        if isinstance(message, PlayerUpdate):
+            return message
+
+        return _node_stats(message)
+
+    def decode_tracks(data: str | bytes) -> list[Track]:  # pyright: ignore[reportRedeclaration]
+        r"""Decode a JSON list of encoded tracks with their info into :class:`Track`\s.
+
+        This is the format of the ``decodetracks`` endpoint.
+
+        Parameters
+        ----------
+        data:
+            The raw JSON.
+        """
+        return [
+            Track(
+                track_id=track.encoded,
+                title=track.info.title,
+                author=track.info.author,
+                identifier=track.info.identifier,
+                uri=track.info.uri,
+                source=track.info.source_name,
+                stream=track.info.is_stream,
+                seekable=track.info.is_seekable,
+                position=track.info.position,
+                length=track.info.length,
+                artwork_url=track.info.artwork_url,
+                isrc=track.info.isrc,
+            )
+            for track in _tracks_decoder.decode(data)
+        ]
+
+else:
+
+    class PlayerState:
+        """The state sent in a ``playerUpdate`` message."""
+
+        __slots__ = ("connected", "ping", "position", "time")
+
+        def __init__(
+            self, *, time: int, connected: bool = False, position: int = 0, ping: int = -1
+        ) -> None:
+            self.time: int = time
+            self.connected: bool = connected
+            self.position: int = position
+            self.ping: int = ping
+
+    class PlayerUpdate:
+        """A ``playerUpdate`` message."""
+
+        __slots__ = ("guild_id", "state")
+
+        def __init__(self, *, guild_id: str, state: PlayerState) -> None:
+            self.guild_id: str = guild_id
+            self.state: PlayerState = state
+
+    def decode_message(
+        data: str | bytes,
+    ) -> PlayerUpdate | NodeStats | IncomingMessage:
+        r"""Decode a websocket frame.
+
+        Parameters
+        ----------
+        data:
+            The raw frame.
+
+        Returns
+        -------
+        :data:`~typing.Union`\[:class:`PlayerUpdate`, :class:`NodeStats`, :class:`dict`]
+            A :class:`PlayerUpdate` or :class:`NodeStats` for those messages,
+            otherwise the parsed message.
+        """
+        message = loads(data)
+        op = message.get("op")
+
+        if op == "playerUpdate":
+            state = message["state"]
+            return PlayerUpdate(
+                guild_id=message["guildId"],
+                state=PlayerState(
+                    time=state["time"],
+                    connected=state.get("connected", False),
+                    position=state.get("position", 0),
+                    ping=state.get("ping", -1),
+                ),
+            )
+
+        if op == "stats":
+            return NodeStats(message)
+
+        return message
+
+    def decode_tracks(data: str | bytes) -> list[Track]:
+        r"""Decode a JSON list of encoded tracks with their info into :class:`Track`\s.
+
+        This is the format of the ``decodetracks`` endpoint.
+
+        Parameters
+        ----------
+        data:
+            The raw JSON.
+        """
+        return [Track.from_data_with_info(track) for track in loads(data)]
@@ -23,6 +23,7 @@ __all__ = (
     "NodeAlreadyConnected",
     "PlayerException",
     "PlayerNotConnected",
+    "TrackDecodeError",
     "TrackLoadException",
 )
 
@@ -155,3 +156,10 @@ class HTTPNotFound(HTTPException):
 
     def __init__(self, message: str) -> None:
         super().__init__(404, message)
+
+
+class TrackDecodeError(MaficException):
+    """An error raised when an encoded track could not be decoded locally."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(f"The track could not be decoded: {message}")
@@ -0,0 +1,189 @@
+r"""Health tracking for :class:`Node`\s, used by :attr:`Strategy.HEALTH`."""
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from logging import getLogger
+from time import monotonic
+
+__all__ = ("NodeHealth",)
+
+_log = getLogger(__name__)
+_log.disabled = True
+
+
+class NodeHealth:
+    """Measured REST latency, error rate and circuit breaker state of a node.
+
+    Every REST request made by a node is recorded here. Latency and errors are
+    tracked as exponentially weighted moving averages, so recent requests matter
+    more than old ones.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and the node
+    is left out of :attr:`Strategy.HEALTH` selection for ``cooldown`` seconds. After
+    that the circuit is half-open, the next request decides whether it closes again
+    or re-opens.
+
+    Parameters
+    ----------
+    alpha:
+        The smoothing factor of the moving averages, between 0 and 1.
+    failure_threshold:
+        The amount of consecutive failures that opens the circuit.
+    cooldown:
+        How long, in seconds, the circuit stays open.
+    player_limit:
+        The maximum amount of players this node should serve, if any.
+    """
+
+    __slots__ = (
+        "alpha",
+        "cooldown",
+        "failure_threshold",
+        "player_limit",
+        "_consecutive_failures",
+        "_error_rate",
+        "_latency",
+        "_opened_at",
+        "_requests",
+    )
+
+    def __init__(
+        self,
+        *,
+        alpha: float = 0.2,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        player_limit: int | None = None,
+    ) -> None:
+        self.alpha: float = alpha
+        self.failure_threshold: int = failure_threshold
+        self.cooldown: float = cooldown
+        self.player_limit: int | None = player_limit
+
+        self._latency: float | None = None
+        self._error_rate: float = 0.0
+        self._consecutive_failures: int = 0
+        self._opened_at: float | None = None
+        self._requests: int = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<NodeHealth latency={self._latency!r} error_rate={self._error_rate:.3f} "
+            f"state={self.state!r}>"
+        )
+
+    @property
+    def latency(self) -> float | None:
+        """The moving average of the REST round-trip time in seconds.
+
+        This is ``None`` until a request succeeded.
+        """
+        return self._latency
+
+    @property
+    def error_rate(self) -> float:
+        """The moving average of failed requests, between 0 and 1."""
+        return self._error_rate
+
+    @property
+    def requests(self) -> int:
+        """The amount of requests recorded."""
+        return self._requests
+
+    @property
+    def state(self) -> str:
+        """The circuit state, ``closed``, ``open`` or ``half-open``."""
+        if self._opened_at is None:
+            return "closed"
+
+        if monotonic() - self._opened_at < self.cooldown:
+            return "open"
+
+        return "half-open"
+
+    @property
+    def accepting(self) -> bool:
+        """Whether new players may be placed on the node."""
+        return self.state != "open"
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request.
+
+        Parameters
+        ----------
+        latency:
+            The round-trip time of the request in seconds.
+        """
+        self._requests += 1
+        self._latency = (
+            latency
+            if self._latency is None
+            else self._latency + self.alpha * (latency - self._latency)
+        )
+        self._error_rate -= self.alpha * self._error_rate
+        self._consecutive_failures = 0
+
+        if self._opened_at is not None:
+            _log.info("Circuit closed after a successful request.")
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit if needed."""
+        self._requests += 1
+        self._error_rate += self.alpha * (1 - self._error_rate)
+        self._consecutive_failures += 1
+
+        # A failed trial request while half-open re-opens the circuit straight away.
+        if (
+            self._consecutive_failures >= self.failure_threshold
+            or self.state == "half-open"
+        ):
+            self.trip()
+
+    def trip(self) -> None:
+        """Open the circuit now, for example when the websocket is lost."""
+        if self.state != "open":
+            _log.warning("Circuit opened for %.1fs.", self.cooldown)
+        self._opened_at = monotonic()
+
+    def reset(self) -> None:
+        """Forget every measurement and close the circuit."""
+        self._latency = None
+        self._error_rate = 0.0
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._requests = 0
+
+    def has_headroom(self, players: int) -> bool:
+        """Whether the node can take another player.
+
+        Parameters
+        ----------
+        players:
+            The amount of players currently on the node.
+        """
+        return self.player_limit is None or players < self.player_limit
+
+    def score(self, players: int, default_latency: float) -> float:
+        """Get the selection score of the node, lower is better.
+
+        The score is the expected latency, inflated by the error rate and by how
+        full the node is.
+
+        Parameters
+        ----------
+        players:
+            The amount of players currently on the node.
+        default_latency:
+            The latency to assume if the node has not been measured yet.
+        """
+        latency = self._latency if self._latency is not None else default_latency
+
+        if self.player_limit:
+            load = players / self.player_limit
+        else:
+            # Without a limit, every 100 players cost as much as doubling the latency.
+            load = players / 100
+
+        return latency * (1 + 4 * self._error_rate) * (1 + load)
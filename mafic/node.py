@@ -7,16 +7,20 @@ from __future__ import annotations
 
 import re
 import warnings
-from asyncio import Event, TimeoutError, create_task, gather, sleep, wait_for
+from asyncio import Event, TimeoutError, create_task, gather, shield, sleep, wait_for
 from logging import getLogger
+from time import perf_counter
 from traceback import print_exc
-from typing import TYPE_CHECKING, Generic, cast
+from typing import TYPE_CHECKING, ClassVar, Generic, cast
 
 import aiohttp
 import yarl
 
 from .__libraries import MISSING, ExponentialBackoff, dumps, loads
+from .cache import TrackCache
+from .decoders import PlayerUpdate, decode_message
 from .errors import *
+from .health import NodeHealth
 from .ip import (
     BalancingIPRoutePlannerStatus,
     NanoIPRoutePlannerStatus,
@@ -67,6 +71,8 @@ if TYPE_CHECKING:
 _log = getLogger(__name__)
 _log.disabled = True
 URL_REGEX = re.compile(r"https?://")
+# Upper bound of guilds with a buffered playerUpdate while the node is not ready.
+MAX_PENDING_UPDATES = 10_000
 
 __all__ = ("Node",)
 
@@ -161,6 +167,20 @@ class Node(Generic[ClientT]):
         resuming, players will be destroyed if Lavalink loses connection to us.
 
         .. versionadded:: 2.2
+    connection_limit:
+        The maximum number of simultaneous HTTP connections kept open to the node.
+        Connections are kept alive and reused for every REST call.
+
+        This is ignored if ``session`` is provided.
+    request_timeout:
+        The total timeout in seconds for a single REST request to the node.
+        If not provided, the aiohttp default is used.
+    track_cache:
+        The cache to consult before sending ``loadtracks`` requests.
+        This can be shared between nodes, as results do not depend on the node.
+    health:
+        The health tracker used by :attr:`Strategy.HEALTH`.
+        If not provided, one with default thresholds is created.
 
     Attributes
     ----------
@@ -179,16 +199,22 @@ class Node(Generic[ClientT]):
         "_checked_version",
         "_client",
         "_connect_task",
+        "_connection_limit",
+        "_health",
         "_heartbeat",
         "_host",
         "_label",
         "_msg_tasks",
+        "_pending_stats",
+        "_pending_updates",
         "_players",
         "_port",
         "_resume_key",
         "_secure",
         "_timeout",
+        "_track_cache",
         "_ready",
+        "_request_timeout",
         "_rest_uri",
         "_resuming_session_id",
         "_session_id",
@@ -202,6 +228,9 @@ class Node(Generic[ClientT]):
         "shard_ids",
     )
 
+    # Shared by every node, results of ``loadtracks`` do not depend on the node.
+    _pending_loads: ClassVar[dict[str, Task[list[Track] | Playlist | None]]] = {}
+
     def __init__(
         self,
         *,
@@ -218,6 +247,10 @@ class Node(Generic[ClientT]):
         regions: Sequence[Group | Region | VoiceRegion] | None = None,
         shard_ids: Sequence[int] | None = None,
         resuming_session_id: str | None = None,
+        connection_limit: int = 100,
+        request_timeout: float | None = None,
+        track_cache: TrackCache | None = None,
+        health: NodeHealth | None = None,
     ) -> None:
         self._host = host
         self._port = port
@@ -226,7 +259,15 @@ class Node(Generic[ClientT]):
         self._secure = secure
         self._heartbeat = heartbeat
         self._timeout = timeout
+        self._connection_limit = connection_limit
+        self._request_timeout: aiohttp.ClientTimeout | None = (
+            aiohttp.ClientTimeout(total=request_timeout)
+            if request_timeout is not None
+            else None
+        )
         self._client = client
+        self._track_cache = track_cache
+        self._health: NodeHealth = health or NodeHealth()
         self.__session = session
         self.shard_ids: Sequence[int] | None = shard_ids
         self.regions: list[VoiceRegion] | None = _wrap_regions(regions)
@@ -250,6 +291,8 @@ class Node(Generic[ClientT]):
         self._session_id: str | None = None
 
         self._msg_tasks: set[Task[None]] = set()
+        self._pending_updates: dict[str, PlayerUpdate] = {}
+        self._pending_stats: NodeStats | None = None
         self._connect_task: Task[None] | None = None
 
         self._checked_version: bool = False
@@ -292,6 +335,16 @@ class Node(Generic[ClientT]):
         """
         return self._stats
 
+    @property
+    def track_cache(self) -> TrackCache | None:
+        """The cache consulted by :meth:`fetch_tracks`, if any."""
+        return self._track_cache
+
+    @property
+    def health(self) -> NodeHealth:
+        """The measured REST latency, error rate and circuit state of the node."""
+        return self._health
+
     @property
     def available(self) -> bool:
         """Whether the node is available.
@@ -686,6 +739,7 @@ class Node(Generic[ClientT]):
             )
             await self.sync_players(player_cls=player_cls)
             self._event_queue.set()
+            self._flush_pending_updates()
             self._available = True
             self._client.dispatch("node_ready", self)
 
@@ -736,6 +790,8 @@ class Node(Generic[ClientT]):
         self.__session = None
         self._ready.clear()
         self._event_queue.clear()
+        self._pending_updates.clear()
+        self._pending_stats = None
 
     async def _ws_listener(self) -> None:
         """Listen for messages from the websocket."""
@@ -760,6 +816,8 @@ class Node(Generic[ClientT]):
 
             if _type is aiohttp.WSMsgType.CLOSED:
                 self._available = False
+                # Keep new players away until the node has proven itself again.
+                self._health.trip()
                 self._client.dispatch("node_unavailable", self)
                 close_code = self._ws.close_code
                 self._ready.clear()
@@ -786,17 +844,80 @@ class Node(Generic[ClientT]):
                 task.add_done_callback(remove_task)
                 return
             else:
+                data = decode_message(msg.data)
+
+                # State updates are handled inline, they only overwrite state.
+                if isinstance(data, (PlayerUpdate, NodeStats)):
+                    self._handle_update(data)
+                    continue
+
                 _log.debug(
                     "Creating task to handle websocket message.",
                     extra={"label": self._label},
                 )
-                task = create_task(self._handle_msg(msg.json(loads=loads)))
+                task = create_task(self._handle_msg(data))
                 self._msg_tasks.add(task)
                 task.add_done_callback(self._msg_tasks.discard)
 
+    def _handle_update(self, data: PlayerUpdate | NodeStats) -> None:
+        """Apply a ``playerUpdate`` or ``stats`` message, or buffer it until ready.
+
+        Only the latest update per guild is kept while the node is not ready, so the
+        buffer is bounded by :data:`MAX_PENDING_UPDATES` during reconnects.
+
+        Parameters
+        ----------
+        data:
+            The decoded message.
+        """
+        if not self._event_queue.is_set():
+            if isinstance(data, NodeStats):
+                self._pending_stats = data
+                return
+
+            # Re-insert so the dict stays ordered by the latest update.
+            self._pending_updates.pop(data.guild_id, None)
+            if len(self._pending_updates) >= MAX_PENDING_UPDATES:
+                del self._pending_updates[next(iter(self._pending_updates))]
+            self._pending_updates[data.guild_id] = data
+            return
+
+        if isinstance(data, NodeStats):
+            self._stats = data
+            self.client.dispatch("node_stats", self)
+            return
+
+        guild_id = int(data.guild_id)
+        player = self.get_player(guild_id)
+
+        if player is None:
+            if data.state.connected is True:
+                _log.error(
+                    "Could not find player for guild %s, discarding event.",
+                    guild_id,
+                )
+
+            return
+
+        player.update_state(data.state)
+
+    def _flush_pending_updates(self) -> None:
+        """Apply the updates buffered while the node was not ready."""
+        updates = list(self._pending_updates.values())
+        self._pending_updates.clear()
+
+        for update in updates:
+            self._handle_update(update)
+
+        if self._pending_stats is not None:
+            stats, self._pending_stats = self._pending_stats, None
+            self._handle_update(stats)
+
     async def _handle_msg(self, data: IncomingMessage) -> None:
         """Handle a message from the websocket.
 
+        ``playerUpdate`` and ``stats`` messages are handled by :meth:`_handle_update`.
+
         Parameters
         ----------
         data:
@@ -804,28 +925,10 @@ class Node(Generic[ClientT]):
         """
         _log.debug("Event data: %s", data)
         _log.debug("Received event with op %s", data["op"])
-        # Queue up events like "playerUpdate" until we receive "ready" and resumed.
         if data["op"] != "ready":
             await self._event_queue.wait()
 
-        if data["op"] == "playerUpdate":
-            guild_id = int(data["guildId"])
-            player = self.get_player(guild_id)
-
-            if player is None:
-                if data["state"]["connected"] is True:
-                    _log.error(
-                        "Could not find player for guild %s, discarding event.",
-                        guild_id,
-                    )
-
-                return
-
-            player.update_state(data["state"])
-        elif data["op"] == "stats":
-            self._stats = NodeStats(data)
-            self.client.dispatch("node_stats", self)
-        elif data["op"] == "event":
+        if data["op"] == "event":
             await self._handle_event(data)
         elif data["op"] == "ready":
             resumed = data["resumed"]
@@ -835,6 +938,8 @@ class Node(Generic[ClientT]):
                 "Received session ID %s", session_id, extra={"label": self._label}
             )
             self._session_id = session_id
+            # Reconnects resume this session, not the one the node was created with.
+            self._resuming_session_id = session_id
 
             if resumed:
                 _log.info(
@@ -1069,8 +1174,47 @@ class Node(Generic[ClientT]):
         )
 
     async def _create_session(self) -> aiohttp.ClientSession:
-        """Create a new session for the node."""
-        return aiohttp.ClientSession(json_serialize=dumps)
+        """Create a new session for the node.
+
+        The session owns a keep-alive connection pool bounded by
+        ``connection_limit``, shared by the websocket and every REST call.
+        """
+        connector = aiohttp.TCPConnector(limit=self._connection_limit)
+        return aiohttp.ClientSession(json_serialize=dumps, connector=connector)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json: OutgoingMessage | None = None,
+        params: OutgoingParams | None = None,
+    ) -> Any:  # noqa: ANN401
+        """Send a REST request to the node over its pooled session.
+
+        This is meant for endpoints mafic does not wrap, such as plugin routes.
+
+        Parameters
+        ----------
+        method:
+            The HTTP method to use.
+        path:
+            The path to send the request to, without the version prefix.
+        json:
+            The JSON to send.
+        params:
+            The query parameters to send.
+
+        Returns
+        -------
+        :data:`~typing.Any`
+            The JSON response from the node, or ``None`` for ``204``.
+
+        Raises
+        ------
+        HTTPException
+            If the node responds with a non-2xx status.
+        """
+        return await self.__request(method, path, json, params)
 
     async def __request(
         self,
@@ -1110,12 +1254,39 @@ class Node(Generic[ClientT]):
             json,
             extra={"label": self._label},
         )
+        started = perf_counter()
+        try:
+            result = await self.__send(session, method, uri, path, json, params)
+        except HTTPException as e:
+            # 4xx responses are caused by the request, not by the node.
+            if e.status >= 500:
+                self._health.record_failure()
+            else:
+                self._health.record_success(perf_counter() - started)
+            raise
+        except (aiohttp.ClientError, TimeoutError):
+            self._health.record_failure()
+            raise
+
+        self._health.record_success(perf_counter() - started)
+        return result
+
+    async def __send(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        uri: yarl.URL,
+        path: str,
+        json: OutgoingMessage | None,
+        params: OutgoingParams | None,
+    ) -> Any:  # noqa: ANN401
         async with session.request(
             method,
             uri,
             json=json,
             params=params,
             headers={"Authorization": self.__password},
+            timeout=self._request_timeout or session.timeout,
         ) as resp:
             _log.debug("Received status %s from lavalink.", resp.status)
             if resp.status == 204:
@@ -1137,11 +1308,12 @@ class Node(Generic[ClientT]):
                 "Received status %s from lavalink from path %s", resp.status, path
             )
 
-            json = await resp.json(loads=loads)
+            # Parsed from the raw bytes, skipping aiohttp's text decoding.
+            json = loads(await resp.read())
             _log.debug("Received raw data %s from %s", json, path)
             return json
 
-    async def fetch_tracks(  # noqa: PLR0911  # V3/V4 compat.
+    async def fetch_tracks(
         self, query: str, *, search_type: str
     ) -> list[Track] | Playlist | None:
         r"""Fetch tracks from the node.
@@ -1162,13 +1334,74 @@ class Node(Generic[ClientT]):
         None
             If the load type is ``NO_MATCHES``.
         """
-        if not URL_REGEX.match(query):
-            query = f"{search_type}:{query}"
+        key = TrackCache.make_key(query, search_type)
 
-        data: TrackLoadingResult = await self.__request(
-            "GET", "loadtracks", params={"identifier": query}
-        )
+        # Identical concurrent loads share one request and its parsed result.
+        task = self._pending_loads.get(key)
+        if task is None:
+            task = create_task(self._load_tracks(key, query, search_type))
+            self._pending_loads[key] = task
+
+            def remove_task(done: Task[list[Track] | Playlist | None]) -> None:
+                self._pending_loads.pop(key, None)
+                # Mark the exception as retrieved if every waiter was cancelled.
+                if not done.cancelled():
+                    done.exception()
+
+            task.add_done_callback(remove_task)
+        else:
+            _log.debug(
+                "Joining in-flight load for %s.", key, extra={"label": self._label}
+            )
+
+        # Shielded so a cancelled waiter does not cancel the load for the others.
+        result = await shield(task)
+
+        # Waiters may mutate the list they get back, the tracks are shared.
+        return [*result] if isinstance(result, list) else result
 
+    async def _load_tracks(
+        self, key: str, query: str, search_type: str
+    ) -> list[Track] | Playlist | None:
+        """Load tracks from the cache or the node, caching the raw result.
+
+        Parameters
+        ----------
+        key:
+            The normalized cache key of the query.
+        query:
+            The query to search for.
+        search_type:
+            The search type to use.
+        """
+        data: TrackLoadingResult | None = None
+
+        if self._track_cache is not None:
+            data = await self._track_cache.get(key)
+
+        if data is None:
+            if not URL_REGEX.match(query):
+                query = f"{search_type}:{query}"
+
+            data = await self.__request(
+                "GET", "loadtracks", params={"identifier": query}
+            )
+
+            if self._track_cache is not None:
+                await self._track_cache.put(key, data)  # pyright: ignore
+
+        return self._parse_load_result(data)  # pyright: ignore
+
+    def _parse_load_result(  # noqa: PLR0911  # V3/V4 compat.
+        self, data: TrackLoadingResult
+    ) -> list[Track] | Playlist | None:
+        """Turn a raw ``loadtracks`` payload into tracks or a playlist.
+
+        Parameters
+        ----------
+        data:
+            The payload returned by Lavalink, or a cached copy of it.
+        """
         if data["loadType"] in ("empty", "NO_MATCHES"):
             return []
         elif data["loadType"] == "track":
@@ -1214,6 +1447,14 @@ class Node(Generic[ClientT]):
         --------
         :meth:`decode_tracks`
         """
+        try:
+            return Track.from_encoded(track)
+        except TrackDecodeError:
+            _log.debug(
+                "Could not decode track locally, asking the node.",
+                extra={"label": self._label},
+            )
+
         track_object: TrackWithInfo = await self.__request(
             "GET", "decodetrack", params={"encodedTrack": track}
         )
@@ -1237,11 +1478,26 @@ class Node(Generic[ClientT]):
         --------
         :meth:`decode_track`
         """
+        decoded: list[Track | None] = []
+        remote: list[str] = []
+
+        for track in tracks:
+            try:
+                decoded.append(Track.from_encoded(track))
+            except TrackDecodeError:
+                decoded.append(None)
+                remote.append(track)
+
+        if not remote:
+            return cast("list[Track]", decoded)
+
+        # Only tracks the local codec does not understand are sent to the node.
         track_data: list[TrackWithInfo] = await self.__request(
-            "POST", "decodetracks", json=tracks
+            "POST", "decodetracks", json=remote
         )
+        fetched = iter(Track.from_data_with_info(track) for track in track_data)
 
-        return [Track.from_data_with_info(track) for track in track_data]
+        return [track if track is not None else next(fetched) for track in decoded]
 
     async def fetch_plugins(self) -> list[Plugin]:
         r"""Fetch the plugins from the node.
@@ -36,6 +36,7 @@ if TYPE_CHECKING:
         GuildVoiceStatePayload,
         VoiceServerUpdatePayload,
     )
+    from .decoders import PlayerState
     from .node import Node
     from .playlist import Playlist
     from .typings import EventPayload, Player as PlayerPayload, PlayerUpdateState
@@ -192,7 +193,7 @@ class Player(VoiceProtocol, Generic[ClientT]):
         """Whether the player is paused."""
         return self._paused
 
-    def update_state(self, state: PlayerUpdateState) -> None:
+    def update_state(self, state: PlayerUpdateState | PlayerState) -> None:
         """Update the player state.
 
         This is called by the library and usually should not be called by the user.
@@ -200,15 +201,22 @@ class Player(VoiceProtocol, Generic[ClientT]):
         Parameters
         ----------
         state:
-            The state to update the player with.
+            The state to update the player with, raw or as decoded by
+            :func:`~mafic.decode_message`.
         """
         if not self._node_player_ready_event.is_set():
             self._node_player_ready_event.set()
 
-        self._last_update = state["time"]
-        self._position = state.get("position", 0)
-        self._connected = state["connected"]
-        self._ping = state.get("ping", -1)
+        if isinstance(state, dict):
+            self._last_update = state["time"]
+            self._position = state.get("position", 0)
+            self._connected = state["connected"]
+            self._ping = state.get("ping", -1)
+        else:
+            self._last_update = state.time
+            self._position = state.position
+            self._connected = state.connected
+            self._ping = state.ping
 
     # If people are so in love with the VoiceClient interface
     def is_connected(self) -> bool:
@@ -393,7 +401,7 @@ class Player(VoiceProtocol, Generic[ClientT]):
         self._node.add_player(self._guild_id, self)
 
         self._guild_id = int(data["guild_id"])
-        self._endpoint = data["endpoint"]
+        self.endpoint = data["endpoint"]
         self._server_state = data
 
         await self._dispatch_player_update()
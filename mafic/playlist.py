@@ -3,14 +3,69 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, overload
 
 from .track import Track
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from .typings import PlaylistInfo, TrackWithInfo
 
-__all__ = ("Playlist",)
+__all__ = ("LazyTrackList", "Playlist")
+
+
+class LazyTrackList(Sequence[Track]):
+    r"""A read-only sequence of tracks built from raw payloads on access.
+
+    Only the encoded track and info dictionaries Lavalink sent are kept.
+    A :class:`Track` is created each time an item is read, so a large playlist
+    costs nothing until its tracks are actually used.
+
+    Parameters
+    ----------
+    data:
+        The raw track payloads.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: list[TrackWithInfo]) -> None:
+        self._data: list[TrackWithInfo] = data
+
+    @property
+    def raw(self) -> list[TrackWithInfo]:
+        r""":class:`list`\[:class:`dict`]: The raw track payloads, without copying."""
+        return self._data
+
+    def __len__(self) -> int:
+        """Return the amount of tracks."""
+        return len(self._data)
+
+    @overload
+    def __getitem__(self, index: int) -> Track:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Track]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> Track | list[Track]:
+        """Build the track, or tracks, at the given index."""
+        if isinstance(index, slice):
+            return [Track.from_data_with_info(track) for track in self._data[index]]
+
+        return Track.from_data_with_info(self._data[index])
+
+    def __iter__(self) -> Iterator[Track]:
+        """Iterate over the tracks, building each one as it is reached."""
+        for track in self._data:
+            yield Track.from_data_with_info(track)
+
+    def __repr__(self) -> str:
+        """Return the string representation of this list."""
+        return f"<{type(self).__name__} len={len(self._data)}>"
 
 
 class Playlist:
@@ -22,8 +77,9 @@ class Playlist:
         The name of the playlist.
     selected_track: :class:`int`
         The index of the selected track, if any.
-    tracks: :class:`list`\[:class:`Track`]
-        A list of tracks in the playlist.
+    tracks: :class:`LazyTrackList`
+        The tracks in the playlist.
+        Each :class:`Track` is only built when it is accessed.
     plugin_info: :class:`dict`\[:class:`str`, :class:`Any`]
         A dictionary containing plugin-specific information.
 
@@ -41,7 +97,23 @@ class Playlist:
     ) -> None:
         self.name: str = info["name"]
         self.selected_track: int = info["selectedTrack"]
-        self.tracks: list[Track] = [
-            Track.from_data_with_info(track) for track in tracks
-        ]
+        self.tracks: LazyTrackList = LazyTrackList(tracks)
         self.plugin_info: dict[str, Any] = plugin_info
+
+    @property
+    def raw_tracks(self) -> list[TrackWithInfo]:
+        r""":class:`list`\[:class:`dict`]: The raw track payloads of the playlist.
+
+        These can be queued as-is and turned into tracks later with
+        :meth:`Track.from_data_with_info`.
+        """
+        return self.tracks.raw
+
+    @property
+    def total_length(self) -> int:
+        """:class:`int`: The summed length of every non-stream track, in ms."""
+        return sum(
+            track["info"]["length"]
+            for track in self.tracks.raw
+            if not track["info"]["isStream"]
+        )
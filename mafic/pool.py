@@ -21,6 +21,8 @@ if TYPE_CHECKING:
 
     import aiohttp
 
+    from .cache import TrackCache
+    from .health import NodeHealth
     from .player import Player
     from .region import Group, Region, VoiceRegion
 
@@ -89,6 +91,12 @@ class NodePool(Generic[ClientT]):
         """Get a mapping node labels to nodes."""
         return cls._nodes
 
+    @classproperty
+    def default_strategies(cls) -> list[Strategy | StrategyCallable[ClientT]]:
+        """Get the strategies used when :meth:`get_node` is not given any."""
+        strategies = cls._default_strategies
+        return [strategies] if callable(strategies) else [*strategies]
+
     @classproperty
     def nodes(cls) -> list[Node[ClientT]]:
         """Get the list of all available nodes."""
@@ -110,6 +118,10 @@ class NodePool(Generic[ClientT]):
         shard_ids: Sequence[int] | None = None,
         resuming_session_id: str | None = None,
         player_cls: type[Player[ClientT]] | None = None,
+        connection_limit: int = 100,
+        request_timeout: float | None = None,
+        track_cache: TrackCache | None = None,
+        health: NodeHealth | None = None,
     ) -> Node[ClientT]:
         r"""Create a node and connect it.
 
@@ -160,6 +172,15 @@ class NodePool(Generic[ClientT]):
             The player class to use for this node when resuming.
 
             .. versionadded:: 2.8
+        connection_limit:
+            The maximum number of pooled HTTP connections to the node.
+        request_timeout:
+            The total timeout in seconds for a single REST request to the node.
+        track_cache:
+            The cache to consult before sending ``loadtracks`` requests.
+            Pass the same cache to every node so results are shared.
+        health:
+            The health tracker used by :attr:`Strategy.HEALTH`.
 
         Returns
         -------
@@ -189,6 +210,10 @@ class NodePool(Generic[ClientT]):
             regions=regions,
             shard_ids=shard_ids,
             resuming_session_id=resuming_session_id,
+            connection_limit=connection_limit,
+            request_timeout=request_timeout,
+            track_cache=track_cache,
+            health=health,
         )
 
         await self.add_node(node, player_cls=player_cls)
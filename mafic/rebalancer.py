@@ -0,0 +1,229 @@
+r"""Move players off overloaded :class:`Node`\s before they fail."""
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from asyncio import Semaphore, create_task, gather
+from logging import getLogger
+from time import monotonic
+from typing import TYPE_CHECKING, Generic
+
+from .errors import HTTPException, NoNodesAvailable, PlayerNotConnected
+from .pool import NodePool
+from .type_variables import ClientT
+
+if TYPE_CHECKING:
+    from asyncio import Task
+
+    from .node import Node
+    from .player import Player
+
+__all__ = ("Rebalancer",)
+
+_log = getLogger(__name__)
+_log.disabled = True
+
+# Lavalink sends 50 frames per second for every playing player, stats cover a minute.
+_FRAMES_PER_PLAYER = 3000
+
+
+class Rebalancer(Generic[ClientT]):
+    """Watches node stats and migrates players off degraded nodes.
+
+    A node is degraded when its system CPU load or its frame loss (nulled and
+    deficit frames per player over the frames a player sends in a minute) is above
+    the threshold. Once a node has been degraded for ``strikes`` stats updates in a
+    row, up to ``batch_size`` playing players are moved to other nodes with
+    :meth:`Player.transfer_to`, which keeps the track, position, volume and filters.
+    The node is re-evaluated on its next stats update, so a hot node is cooled down
+    gradually instead of all at once.
+
+    Call :meth:`observe` from :func:`~mafic.on_node_stats`.
+
+    Parameters
+    ----------
+    pool:
+        The pool to pick target nodes from.
+    cpu_threshold:
+        The system load, between 0 and 1, above which a node is degraded.
+    frame_loss_threshold:
+        The ratio of lost frames, between 0 and 1, above which a node is degraded.
+    strikes:
+        The amount of consecutive degraded stats updates before players are moved.
+    batch_size:
+        The maximum amount of players moved per stats update.
+    concurrency:
+        The maximum amount of transfers running at once.
+    cooldown:
+        The minimum time, in seconds, between two batches from the same node.
+    """
+
+    __slots__ = (
+        "batch_size",
+        "cooldown",
+        "cpu_threshold",
+        "frame_loss_threshold",
+        "strikes",
+        "_last_batch",
+        "_pool",
+        "_semaphore",
+        "_strikes",
+        "_tasks",
+    )
+
+    def __init__(
+        self,
+        pool: NodePool[ClientT],
+        *,
+        cpu_threshold: float = 0.9,
+        frame_loss_threshold: float = 0.05,
+        strikes: int = 2,
+        batch_size: int = 5,
+        concurrency: int = 3,
+        cooldown: float = 60.0,
+    ) -> None:
+        self._pool = pool
+        self.cpu_threshold: float = cpu_threshold
+        self.frame_loss_threshold: float = frame_loss_threshold
+        self.strikes: int = strikes
+        self.batch_size: int = batch_size
+        self.cooldown: float = cooldown
+
+        self._semaphore = Semaphore(concurrency)
+        self._strikes: dict[str, int] = {}
+        self._last_batch: dict[str, float] = {}
+        self._tasks: dict[str, Task[int]] = {}
+
+    @staticmethod
+    def frame_loss(node: Node[ClientT]) -> float:
+        """Get the ratio of frames lost by the node in the last stats window.
+
+        Parameters
+        ----------
+        node:
+            The node to check.
+        """
+        stats = node.stats
+        if stats is None or stats.frame_stats is None:
+            return 0.0
+
+        if stats.playing_player_count <= 0:
+            return 0.0
+
+        # Lavalink already averages nulled and deficit frames per player.
+        lost = stats.frame_stats.nulled + stats.frame_stats.deficit
+        return max(0.0, lost / _FRAMES_PER_PLAYER)
+
+    def is_degraded(self, node: Node[ClientT]) -> bool:
+        """Whether the node is overloaded or losing frames.
+
+        Parameters
+        ----------
+        node:
+            The node to check.
+        """
+        stats = node.stats
+        if stats is None:
+            return False
+
+        return (
+            stats.cpu.system_load >= self.cpu_threshold
+            or self.frame_loss(node) >= self.frame_loss_threshold
+        )
+
+    def observe(self, node: Node[ClientT]) -> Task[int] | None:
+        """Record a stats update and start moving players if the node is degraded.
+
+        Parameters
+        ----------
+        node:
+            The node that sent stats.
+
+        Returns
+        -------
+        :data:`~typing.Optional`\\[:class:`asyncio.Task`\\[:class:`int`]]
+            The task moving players, if one was started.
+        """
+        label = node.label
+
+        if not self.is_degraded(node):
+            self._strikes.pop(label, None)
+            return None
+
+        strikes = self._strikes[label] = self._strikes.get(label, 0) + 1
+        _log.debug(
+            "Node is degraded (%d/%d).", strikes, self.strikes, extra={"label": label}
+        )
+
+        if strikes < self.strikes or label in self._tasks:
+            return None
+
+        if monotonic() - self._last_batch.get(label, 0.0) < self.cooldown:
+            return None
+
+        self._last_batch[label] = monotonic()
+        task = create_task(self.rebalance(node))
+        self._tasks[label] = task
+        task.add_done_callback(lambda _: self._tasks.pop(label, None))
+        return task
+
+    def _candidates(self, node: Node[ClientT]) -> list[Player[ClientT]]:
+        # Playing players are what costs frames and CPU, idle ones are left alone.
+        players = [
+            player
+            for player in node.players
+            if player.current is not None and not player.paused
+        ]
+        return players[: self.batch_size]
+
+    async def rebalance(self, node: Node[ClientT]) -> int:
+        """Move a batch of players off the node.
+
+        Parameters
+        ----------
+        node:
+            The node to move players off.
+
+        Returns
+        -------
+        :class:`int`
+            The amount of players moved.
+        """
+
+        def exclude_degraded(
+            nodes: list[Node[ClientT]], _: int, __: int | None, ___: str | None
+        ) -> list[Node[ClientT]]:
+            return [n for n in nodes if n is not node and not self.is_degraded(n)]
+
+        strategies = [exclude_degraded, *self._pool.default_strategies]
+
+        async def move(player: Player[ClientT]) -> bool:
+            async with self._semaphore:
+                try:
+                    target = self._pool.get_node(
+                        guild_id=player.guild.id,
+                        endpoint=player.endpoint,
+                        strategies=strategies,
+                    )
+                    await player.transfer_to(target)
+                except NoNodesAvailable:
+                    return False
+                except (RuntimeError, PlayerNotConnected, HTTPException):
+                    _log.error(
+                        "Failed to move player %d off degraded node.",
+                        player.guild.id,
+                        exc_info=True,
+                        extra={"label": node.label},
+                    )
+                    return False
+
+                _log.info(
+                    "Moved player %d to %s.",
+                    player.guild.id,
+                    target.label,
+                    extra={"label": node.label},
+                )
+                return True
+
+        results = await gather(*(move(player) for player in self._candidates(node)))
+        return sum(results)
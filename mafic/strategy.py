@@ -43,6 +43,12 @@ class Strategy(Enum):
     USAGE = auto()
     """Selects a node based on the least used node."""
 
+    HEALTH = auto()
+    """Selects a node based on measured REST latency, error rate and player headroom.
+
+    Nodes with an open circuit, see :class:`NodeHealth`, are skipped.
+    """
+
 
 def shard_strategy(
     nodes: list[Node[ClientT]], guild_id: int, shard_count: int | None, _: str | None
@@ -170,6 +176,55 @@ def usage_strategy(
     return list(filter(lambda node: node.weight == lowest, nodes))
 
 
+def health_strategy(
+    nodes: list[Node[ClientT]], _: int, __: int | None, ___: str | None
+) -> list[Node[ClientT]]:
+    """Get the node expected to serve a new player the fastest.
+
+    This is calculated using :meth:`NodeHealth.score`. Nodes with an open circuit or
+    without player headroom are skipped, unless no other node is left.
+
+    Parameters
+    ----------
+    nodes:
+        The nodes to select from.
+    _:
+        Unused parameter.
+    __:
+        Unused parameter.
+    ___:
+        Unused parameter.
+    """
+    healthy = [
+        node
+        for node in nodes
+        if node.health.accepting and node.health.has_headroom(len(node.players))
+    ]
+
+    if not healthy:
+        _log.error("No healthy nodes found, defaulting to all nodes.")
+        healthy = nodes
+
+    # Unmeasured nodes are assumed to be average, so they still get picked up.
+    measured = [n.health.latency for n in healthy if n.health.latency is not None]
+    default_latency = sum(measured) / len(measured) if measured else 1.0
+
+    lowest = None
+    scores: list[float] = []
+
+    for node in healthy:
+        score = node.health.score(len(node.players), default_latency)
+        scores.append(score)
+
+        if lowest is None or score < lowest:
+            lowest = score
+
+    if lowest is None:
+        return healthy
+
+    return [node for node, score in zip(healthy, scores) if score == lowest]
+
+
 def random_strategy(
     nodes: list[Node[ClientT]], _: int, __: int | None, ___: str | None
 ) -> list[Node[ClientT]]:
@@ -220,6 +275,8 @@ def call_strategy(
         return shard_strategy(nodes, guild_id, shard_count, endpoint)
     elif strategy is Strategy.USAGE:
         return usage_strategy(nodes, guild_id, shard_count, endpoint)
+    elif strategy is Strategy.HEALTH:
+        return health_strategy(nodes, guild_id, shard_count, endpoint)
     else:
         msg = f"Unknown strategy {strategy}"
         raise ValueError(msg)
@@ -5,6 +5,8 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from .codec import decode_track
+
 if TYPE_CHECKING:
     from typing_extensions import Self
 
@@ -152,6 +154,27 @@ class Track:
             isrc=info.get("isrc"),
         )
 
+    @classmethod
+    def from_encoded(cls, encoded: str) -> Self:
+        """Create a track from its encoded data, without contacting a node.
+
+        Parameters
+        ----------
+        encoded:
+            The base64 encoded track, as in :attr:`id`.
+
+        Returns
+        -------
+        :class:`Track`
+            The track.
+
+        Raises
+        ------
+        TrackDecodeError
+            If the track could not be decoded locally.
+        """
+        return cls.from_data_with_info(decode_track(encoded))
+
     @classmethod
     def from_data_with_info(cls, data: TrackWithInfo) -> Self:
         """Create a track from the raw data, bundled with the track and info.
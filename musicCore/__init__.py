@@ -4,11 +4,13 @@ Music core functionality for the Discord bot:
 - player: Music player implementation
 - check: Voice channel checks and decorators
 - lyric_cache: Lyrics caching system
+- track_store: Compact, shared storage for queued tracks
 """
 
 from .player import MusicPlayer, QueueInterface, VolumeInteraction, SelectInteraction, STATE
 from .check import check_voice, has_player
 from .lyric_cache import LyricCache
+from .track_store import TrackTable, TrackQueue, QueueView, TRACK_TABLE
 
 __all__ = [
     'MusicPlayer',
@@ -18,5 +20,9 @@ __all__ = [
     'STATE',
     'check_voice',
     'has_player',
-    'LyricCache'
+    'LyricCache',
+    'TrackTable',
+    'TrackQueue',
+    'QueueView',
+    'TRACK_TABLE'
 ]
\ No newline at end of file
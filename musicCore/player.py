@@ -4,19 +4,22 @@ import random
 from asyncio import Lock, sleep
 from traceback import print_exc
 
-from aiohttp import ClientSession
 from mafic.errors import TrackLoadException, HTTPUnauthorized, HTTPException, HTTPNotFound, HTTPBadRequest
-from mafic import Track, Player, PlayerNotConnected
+from mafic import Track, Player, PlayerNotConnected, Filter, Timescale, TrackDecodeError, decode_track
+from mafic.typings import TrackWithInfo
+from musicCore.track_store import TrackQueue, QueueView
 from disnake.abc import Connectable
 from utils.ClientUser import ClientUser
-from collections import deque
-from typing import Optional, Any
+from itertools import chain, islice
+from typing import Optional, Any, Iterable
 from disnake import Message, MessageInteraction, ui, SelectOption, ButtonStyle, Embed, MessageFlags, utils, TextChannel, Thread, VoiceChannel, StageChannel, PartialMessageable
 from utils.conv import time_format, trim_text, LoopMODE
 from logging import getLogger
 from datetime import datetime
 from typing import Union
 from utils.controller.player_controler import render_player
+from utils.controller.render_cache import RENDER_CACHE
+from utils.controller.scheduler import CONTROLLER_SCHEDULER
 
 MessageableChannel = Union[TextChannel, Thread, VoiceChannel, StageChannel, PartialMessageable]
 
@@ -31,17 +34,28 @@ class STATE(enumerate):
     
 
 class Queue:
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
         self.is_playing: Optional[Track] = None
-        self.next_track: deque = deque()
-        self.played: deque = deque(maxlen=45)
+        # Chỉ lưu id của bài, metadata nằm trong TRACK_TABLE dùng chung giữa các guild
+        self.next_track: TrackQueue = TrackQueue()
+        self.played: TrackQueue = TrackQueue(maxlen=45)
         self.loop = LoopMODE.OFF
-        self.autoplay: deque = deque(maxlen=25)
+        self.autoplay: TrackQueue = TrackQueue(maxlen=25)
         self.keep_connect = STATE.OFF
         self.shuffle = STATE.OFF
+        # Các bài đã bốc trong vòng trộn hiện tại (shuffle + lặp playlist)
+        self.drawn: TrackQueue = TrackQueue()
+        self.rng = random.Random(seed)
 
-    def get_next_track(self):
-        return [track for track in self.next_track]
+    def reseed(self, seed: Optional[int] = None):
+        """Đặt lại seed cho bộ trộn, cùng seed sẽ cho cùng thứ tự phát"""
+        self.rng.seed(seed)
+
+    def get_next_track(self, limit: Optional[int] = None) -> list[Track]:
+        return list(islice(self.next_track, limit))
+
+    def view(self) -> QueueView:
+        return self.next_track.view()
 
     def process_next(self):
         if self.loop == LoopMODE.SONG:
@@ -49,20 +63,27 @@ class Queue:
         return self.next()
 
     def next(self):
+        shuffle_cycle = self.shuffle == STATE.ON and self.loop == LoopMODE.PLAYLIST
+
         if self.is_playing is not None:
-            self.played.append(self.is_playing)
+            if shuffle_cycle:
+                self.drawn.append(self.is_playing)
+            else:
+                self.played.append(self.is_playing)
             self.is_playing = None
 
+        # Chỉ trả các bài đã bốc về hàng đợi khi hết vòng, để không bài nào bị lặp lại trước đó
+        if self.drawn and (not shuffle_cycle or not self.next_track):
+            self.next_track.extend(self.drawn)
+            self.drawn.clear()
+
         if self.loop == LoopMODE.PLAYLIST or self.keep_connect == STATE.ON and self.next_track.__len__() == 0:
-            for track in self.played:
-                self.next_track.append(track)
+            self.next_track.extend(self.played)
             self.played.clear()
 
         if self.next_track:
             if self.shuffle == STATE.ON:
-                index = random.randrange(0, len(self.next_track))
-                self.is_playing = self.next_track[index]
-                del self.next_track[index]
+                self.is_playing = self.next_track.pop_random(self.rng)
             else:
                 self.is_playing = self.next_track.popleft()
             return self.is_playing
@@ -72,14 +93,20 @@ class Queue:
 
         return self.is_playing
 
+    @property
+    def has_previous(self) -> bool:
+        return bool(self.played or self.drawn)
+
     def previous(self) -> Optional[Track]:
-        if self.played.__len__() == 0:
+        # Khi trộn + lặp playlist, các bài đã phát nằm trong drawn thay vì played
+        history = self.played if self.played else self.drawn
+        if history.__len__() == 0:
             return None
 
         if self.is_playing is not None:
             self.next_track.appendleft(self.is_playing)
 
-        self.is_playing = self.played.pop()
+        self.is_playing = history.pop()
         return self.is_playing
 
     def add_next_track(self, track: Track):
@@ -88,8 +115,49 @@ class Queue:
             return
         self.next_track.append(track)
 
+    def extend(self, tracks: Iterable[Union[Track, TrackWithInfo]]):
+        """Thêm nhiều bài cùng lúc, payload thô chỉ được dựng thành Track khi tới lượt phát"""
+        self.next_track.extend(tracks)
+
     def clear_queue(self):
         self.next_track.clear()
+        self.drawn.clear()
+
+    def snapshot(self) -> dict:
+        """Trạng thái hàng đợi dưới dạng encoded track, dùng cho PlayerSnapshotStore"""
+        return {
+            "current": self.is_playing.id if self.is_playing is not None else None,
+            "loop": self.loop,
+            "shuffle": self.shuffle,
+            "keep_connect": self.keep_connect,
+            "next_track": self.next_track.encoded(),
+            "played": self.played.encoded(),
+            "drawn": self.drawn.encoded(),
+            "autoplay": self.autoplay.encoded(),
+        }
+
+    def restore(self, snapshot: dict):
+        """Nạp lại hàng đợi từ snapshot, bài không giải mã được sẽ bị bỏ qua"""
+        self.loop = snapshot["loop"]
+        self.shuffle = snapshot["shuffle"]
+        self.keep_connect = snapshot["keep_connect"]
+        for name in ("next_track", "played", "drawn", "autoplay"):
+            queue: TrackQueue = getattr(self, name)
+            queue.clear()
+            queue.extend(decode_tracks(snapshot[name]))
+        current = decode_tracks([snapshot["current"]] if snapshot["current"] else [])
+        self.is_playing = Track.from_data_with_info(current[0]) if current else None
+
+
+def decode_tracks(encoded: Iterable[str]) -> list[TrackWithInfo]:
+    """Giải mã encoded track tại chỗ, Track chỉ được dựng khi bài được phát tới"""
+    tracks = []
+    for track in encoded:
+        try:
+            tracks.append(decode_track(track))
+        except TrackDecodeError as e:
+            logger.warning(f"Bỏ qua bài không giải mã được khi khôi phục hàng đợi: {e}")
+    return tracks
 
 class MusicPlayer(Player[ClientUser]):
     def __init__(self, client: ClientUser, channel: Connectable):
@@ -106,7 +174,6 @@ class MusicPlayer(Player[ClientUser]):
         self.is_autoplay_mode = False
         self.player_controller: Optional[Message] = None
         self.locker = Lock()
-        self.update_controller_task: asyncio.Task = None # type: ignore
 
     @property
     def player_volume(self) -> int:
@@ -128,25 +195,62 @@ class MusicPlayer(Player[ClientUser]):
     def node_password(self):
         return self.node._Node__password # noqa
 
+    def snapshot(self) -> Optional[dict]:
+        """Trạng thái đầy đủ của trình phát để lưu lại, None nếu không có gì để khôi phục"""
+        if self.channel is None or (self.queue.is_playing is None and not self.queue.next_track):
+            return None
+        return {
+            **self.queue.snapshot(),
+            "guild_id": self.guild.id,
+            "node": self._node.label if self._node is not None else None,
+            "voice_channel_id": self.channel.id,
+            "text_channel_id": self.NotiChannel.id if self.NotiChannel is not None else None,
+            "position": self.position,
+            "paused": self.paused,
+            "volume": self._volume,
+            "autoplay_mode": self.is_autoplay_mode,
+            "nightcore": self.nightCore,
+        }
+
+    async def restore(self, snapshot: dict, resumed: bool = False):
+        """Khôi phục trình phát từ snapshot
+
+        resumed: Lavalink vẫn giữ trình phát (session được resume), chỉ cần nạp lại hàng đợi,
+        ngược lại bài đang phát được phát lại từ vị trí đã lưu
+        """
+        self.queue.restore(snapshot)
+        self.NotiChannel = self.client.get_channel(snapshot["text_channel_id"]) if snapshot["text_channel_id"] else None
+        self.is_autoplay_mode = snapshot["autoplay_mode"]
+        self.keep_connection = snapshot["keep_connect"]
+        self.nightCore = snapshot["nightcore"]
+
+        if resumed:
+            if self.current is not None:
+                self.queue.is_playing = self.current
+                self.start_time = datetime.now()
+                return
+            # Bài đã phát hết trong lúc bot tắt, chuyển sang bài tiếp theo
+            track = self.queue.process_next()
+        else:
+            if self.nightCore == STATE.ON:
+                await self.add_filter(Filter(timescale=Timescale(speed=1.1, pitch=1.2)), label="nightcore")
+            track = self.queue.is_playing or self.queue.process_next()
+
+        if track is None:
+            return
+        self.start_time = datetime.now()
+        await self.play(
+            track,
+            start_time=snapshot["position"] if track.id == snapshot["current"] and track.seekable else None,
+            volume=snapshot["volume"],
+            pause=snapshot["paused"],
+        )
+
     async def request(self,
                       method: str,
                       path: str) -> Any:
-        uri  = self.rest_uri / path
-        async with ClientSession() as session:
-            resp = await session.request(method, uri, headers={"Authorization": self.node_password}) # noqa
-            match resp.status:
-                case 200:
-                    return await resp.json()
-                case 204:
-                    return None
-                case 400:
-                    raise HTTPBadRequest(await resp.text())
-                case 401:
-                    raise HTTPUnauthorized(await resp.text())
-                case 404:
-                    raise HTTPNotFound(await resp.text())
-                case _:
-                    raise HTTPException(resp.status, message=await resp.text())
+        # Dùng chung session keep-alive của node thay vì mở kết nối mới mỗi lần
+        return await self.node.request(method, path)
 
     async def get_lyric(self, guildID) -> dict | None:
         try:
@@ -154,7 +258,7 @@ class MusicPlayer(Player[ClientUser]):
             if req is not None:
                 return req
             return None
-        except HTTPNotFound or HTTPUnauthorized or HTTPBadRequest or HTTPException:
+        except (HTTPNotFound, HTTPUnauthorized, HTTPBadRequest, HTTPException):
             return None
 
     async def pause_player(self) -> None:
@@ -198,6 +302,7 @@ class MusicPlayer(Player[ClientUser]):
             self.queue.played.clear()
             self.queue.autoplay.clear()
             self.queue.next_track.clear()
+            self.queue.drawn.clear()
             self.queue.is_playing = None
             await self.disconnect(force=True)
             if not isButton:
@@ -244,8 +349,10 @@ class MusicPlayer(Player[ClientUser]):
             try:
                 if replace:
                     controller_data = render_player(self, lang)
-                    if controller_data:
+                    # Chỉ sửa tin nhắn khi nội dung thực sự thay đổi
+                    if controller_data and not RENDER_CACHE.is_unchanged(self.guild.id, self.player_controller.id, controller_data):
                         self.player_controller = await self.player_controller.edit(**controller_data)
+                        RENDER_CACHE.remember(self.guild.id, self.player_controller.id, controller_data)
                 elif force_resync:
                     if self.player_controller is not None:
                         await self.player_controller.delete()
@@ -253,6 +360,7 @@ class MusicPlayer(Player[ClientUser]):
                         controller_data = render_player(self, lang)
                         if controller_data:
                             self.player_controller = await self.NotiChannel.send(flags=MessageFlags(suppress_notifications=True), **controller_data)
+                            RENDER_CACHE.remember(self.guild.id, self.player_controller.id, controller_data)
                 else:
                     if self.player_controller is not None:
                         await self.player_controller.delete()
@@ -260,18 +368,15 @@ class MusicPlayer(Player[ClientUser]):
                         controller_data = render_player(self, lang)
                         if controller_data:
                             self.player_controller = await self.NotiChannel.send(flags=MessageFlags(suppress_notifications=True), **controller_data)
+                            RENDER_CACHE.remember(self.guild.id, self.player_controller.id, controller_data)
             except Exception as e:
+                RENDER_CACHE.forget(self.guild.id)
                 if "Unknown Message" in str(e):
                     await self.controller(True)
                 logger.error(f"Tải trình điều khuyển thất bại: {e}")
                 # self.player_controller = None
                 # self.NotiChannel = None
     
-    async def update_controller(self):
-        while True:
-            await sleep(20)
-            await self.controller(force_resync=True)
-            
     async def get_auto_tracks(self):
         try:
             return self.queue.autoplay.popleft()
@@ -283,7 +388,7 @@ class MusicPlayer(Player[ClientUser]):
         if self.locked:
             return
 
-        for q in self.queue.played + self.queue.autoplay:
+        for q in chain(self.queue.played, self.queue.autoplay):
 
             if len(search) > 4: break
 
@@ -397,7 +502,8 @@ class MusicPlayer(Player[ClientUser]):
                 self.player_controller = await self.player_controller.delete()
             except:
                 self.player_controller = None
-        self.update_controller_task.cancel()
+            RENDER_CACHE.forget(self.guild.id)
+        CONTROLLER_SCHEDULER.unregister(self.guild.id)
 
     async def endPlayer(self):
         async with self.locker:
@@ -419,12 +525,15 @@ class MusicPlayer(Player[ClientUser]):
                 stopped_embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/1211567863538786334/1312988508645752892/ExuEyes.gif")
 
                 await self.player_controller.edit(embed=stopped_embed, view=None)
+                RENDER_CACHE.forget(self.guild.id)
             except:
                 return await self.destroy_player_controller()
-        self.update_controller_task.cancel()
+        CONTROLLER_SCHEDULER.unregister(self.guild.id)
 
 class QueueInterface(ui.View):
 
+    PAGE_SIZE = 12
+
     def __init__(self, player: MusicPlayer, timeout = 60):
         self.player = player
         self.pages = []
@@ -437,37 +546,33 @@ class QueueInterface(ui.View):
         self.update_pages()
         self.update_embed()
 
-    def update_pages(self):
-
-        counter = 1
-
-        self.pages = list(utils.as_chunks(self.player.queue.next_track, max_size=12))
-        self.selected.clear()
-
-        self.clear_items()
+    def render_page(self, n: int) -> tuple[str, list[SelectOption]]:
+        """Dựng một trang, chỉ các bài trong trang mới được dựng thành Track"""
+        start = n * self.PAGE_SIZE
+        txt = "\n"
+        opts = []
 
-        for n, page in enumerate(self.pages):
+        for counter, t in enumerate(self.player.queue.view()[start:start + self.PAGE_SIZE], start=start + 1):
+            duration = time_format(t.length) if not t.stream else '🔴 Livestream'
 
-            txt = "\n"
-            opts = []
+            txt += f"`┌ {counter})` [`{trim_text(t.title, limit=50)}`]({t.uri})\n" \
+                   f"`└ ⏲️ {duration}`\n"
 
-            for t in page:
-                duration = time_format(t.length) if not t.stream else '🔴 Livestream'
+            opts.append(
+                SelectOption(
+                    label=f"{counter}. {t.author}"[:25], description=f"[{duration}] | {t.title}"[:50],
+                    value=f"queue_select_{t.id}",
+                )
+            )
 
-                txt += f"`┌ {counter})` [`{trim_text(t.title, limit=50)}`]({t.uri})\n" \
-                       f"`└ ⏲️ {duration}`\n"
+        return txt, opts
 
-                opts.append(
-                    SelectOption(
-                        label=f"{counter}. {t.author}"[:25], description=f"[{duration}] | {t.title}"[:50],
-                        value=f"queue_select_{t.id}",
-                    )
-                )
+    def update_pages(self):
 
-                counter += 1
+        # Chỉ tính số trang, nội dung từng trang được dựng khi trang đó được hiển thị
+        self.pages = range(max(1, -(-len(self.player.queue.next_track) // self.PAGE_SIZE)))
 
-            self.pages[n] = txt
-            self.selected.append(opts)
+        self.clear_items()
 
         first = ui.Button(emoji='⏮️', style=ButtonStyle.grey)
         first.callback = self.first
@@ -511,12 +616,11 @@ class QueueInterface(ui.View):
 
     def update_embed(self):
         self.embed.title = f"**Page [{self.current + 1} / {self.max_pages + 1}]**"
-        self.embed.description = self.pages[self.current]
-        self.children[0].options = self.selected[self.current]
+        self.embed.description, self.selected = self.render_page(self.current)
 
         for n, c in enumerate(self.children):
             if isinstance(c, ui.StringSelect):
-                self.children[n].options = self.selected[self.current]
+                self.children[n].options = self.selected
 
     async def first(self, interaction: MessageInteraction):
 
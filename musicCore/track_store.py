@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import random
+from array import array
+from collections.abc import Sequence
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Union, overload
+
+from mafic import Track
+from mafic.typings import TrackWithInfo
+
+QueueItem = Union[Track, TrackWithInfo]
+
+
+class TrackTable:
+    """Bảng metadata dùng chung cho mọi hàng đợi.
+
+    Mỗi encoded track chỉ được lưu một lần và được gán một id số nguyên,
+    các hàng đợi chỉ giữ id. Bài trùng nhau giữa các guild dùng chung một bản ghi,
+    bản ghi được giải phóng khi không còn hàng đợi nào tham chiếu tới.
+    """
+
+    __slots__ = ("_index", "_entries", "_refs", "_lengths", "_free")
+
+    def __init__(self):
+        self._index: dict[str, int] = {}
+        self._entries: list[Optional[QueueItem]] = []
+        self._refs: array = array("I")
+        # Thời lượng (ms) của từng bài, livestream tính là 0, đọc được mà không cần dựng Track
+        self._lengths: array = array("q")
+        self._free: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def intern(self, item: QueueItem) -> int:
+        encoded = item.id if isinstance(item, Track) else item["encoded"]
+        track_id = self._index.get(encoded)
+
+        if track_id is not None:
+            self._refs[track_id] += 1
+            return track_id
+
+        if isinstance(item, Track):
+            length = 0 if item.stream else item.length
+        else:
+            length = 0 if item["info"]["isStream"] else item["info"]["length"]
+
+        if self._free:
+            track_id = self._free.pop()
+            self._entries[track_id] = item
+            self._refs[track_id] = 1
+            self._lengths[track_id] = length
+        else:
+            track_id = len(self._entries)
+            self._entries.append(item)
+            self._refs.append(1)
+            self._lengths.append(length)
+
+        self._index[encoded] = track_id
+        return track_id
+
+    def acquire(self, track_id: int) -> int:
+        self._refs[track_id] += 1
+        return track_id
+
+    def release(self, track_id: int) -> None:
+        self._refs[track_id] -= 1
+        if self._refs[track_id]:
+            return
+
+        entry = self._entries[track_id]
+        encoded = entry.id if isinstance(entry, Track) else entry["encoded"]
+        del self._index[encoded]
+        self._entries[track_id] = None
+        self._free.append(track_id)
+
+    def length(self, track_id: int) -> int:
+        return self._lengths[track_id]
+
+    def encoded(self, track_id: int) -> str:
+        entry = self._entries[track_id]
+        return entry.id if isinstance(entry, Track) else entry["encoded"]
+
+    def get(self, track_id: int) -> Track:
+        entry = self._entries[track_id]
+        if not isinstance(entry, Track):
+            # Payload thô chỉ được dựng thành Track ở lần đọc đầu tiên
+            entry = Track.from_data_with_info(entry)
+            self._entries[track_id] = entry
+        return entry
+
+
+TRACK_TABLE = TrackTable()
+
+
+class TrackQueue:
+    """Hàng đợi kiểu deque lưu id trong array thay vì đối tượng Track.
+
+    popleft / append / truy cập theo chỉ số là O(1) (trừ khi dồn mảng, khấu hao O(1)).
+    """
+
+    __slots__ = ("_ids", "_head", "_table", "maxlen")
+
+    def __init__(self, iterable: Iterable[QueueItem] = (), maxlen: Optional[int] = None,
+                 table: TrackTable = TRACK_TABLE):
+        self._ids: array = array("I")
+        self._head = 0
+        self._table = table
+        self.maxlen = maxlen
+        self.extend(iterable)
+
+    def __del__(self):
+        try:
+            self.clear()
+        except Exception:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._ids) - self._head
+
+    def __bool__(self) -> bool:
+        return len(self._ids) > self._head
+
+    def __iter__(self) -> Iterator[Track]:
+        get = self._table.get
+        for track_id in islice(self._ids, self._head, None):
+            yield get(track_id)
+
+    def __getitem__(self, index: int) -> Track:
+        return self._table.get(self._ids[self._position(index)])
+
+    def __repr__(self) -> str:
+        return f"<TrackQueue len={len(self)} maxlen={self.maxlen}>"
+
+    def _position(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("queue index out of range")
+        return self._head + index
+
+    def _compact(self) -> None:
+        # Dồn mảng khi phần đầu đã bỏ đi chiếm quá nửa, giữ chi phí khấu hao O(1)
+        if self._head > 32 and self._head * 2 > len(self._ids):
+            del self._ids[:self._head]
+            self._head = 0
+
+    def _trim(self) -> None:
+        if self.maxlen is None:
+            return
+        while len(self) > self.maxlen:
+            self._table.release(self._ids[self._head])
+            self._head += 1
+        self._compact()
+
+    def append(self, item: QueueItem) -> None:
+        self._ids.append(self._table.intern(item))
+        self._trim()
+
+    def appendleft(self, item: QueueItem) -> None:
+        track_id = self._table.intern(item)
+        if self._head:
+            self._head -= 1
+            self._ids[self._head] = track_id
+        else:
+            self._ids.insert(0, track_id)
+        if self.maxlen is not None and len(self) > self.maxlen:
+            self._table.release(self._ids.pop())
+
+    def extend(self, items: Iterable[QueueItem]) -> None:
+        if isinstance(items, TrackQueue) and items._table is self._table:
+            # Sao chép id trước, phòng trường hợp items chính là hàng đợi này
+            track_ids = items._ids[items._head:]
+            for track_id in track_ids:
+                self._table.acquire(track_id)
+            self._ids.extend(track_ids)
+        else:
+            intern = self._table.intern
+            self._ids.extend(intern(item) for item in items)
+        self._trim()
+
+    def popleft(self) -> Track:
+        if not self:
+            raise IndexError("pop from an empty queue")
+        track_id = self._ids[self._head]
+        self._head += 1
+        track = self._table.get(track_id)
+        self._table.release(track_id)
+        self._compact()
+        return track
+
+    def pop_random(self, rng: Optional[random.Random] = None) -> Track:
+        """Bốc một bài ngẫu nhiên trong O(1) bất kể độ dài hàng đợi.
+
+        Mỗi lần bốc là một bước Fisher–Yates: đổi chỗ bài được chọn với bài đầu rồi popleft,
+        nên mỗi bài chỉ được bốc một lần cho tới khi hàng đợi cạn.
+        """
+        if not self:
+            raise IndexError("pop from an empty queue")
+        ids = self._ids
+        position = self._head + (rng or random).randrange(len(self))
+        ids[self._head], ids[position] = ids[position], ids[self._head]
+        return self.popleft()
+
+    def pop(self) -> Track:
+        if not self:
+            raise IndexError("pop from an empty queue")
+        track_id = self._ids.pop()
+        track = self._table.get(track_id)
+        self._table.release(track_id)
+        return track
+
+    def clear(self) -> None:
+        release = self._table.release
+        for track_id in islice(self._ids, self._head, None):
+            release(track_id)
+        self._ids = array("I")
+        self._head = 0
+
+    def view(self) -> QueueView:
+        return QueueView(self)
+
+    def total_length(self) -> int:
+        """Tổng thời lượng (ms) các bài trong hàng đợi, bỏ qua livestream, không dựng đối tượng Track"""
+        lengths = self._table._lengths
+        return sum(lengths[track_id] for track_id in islice(self._ids, self._head, None))
+
+    def encoded(self) -> list[str]:
+        """Danh sách encoded track theo thứ tự, không dựng đối tượng Track"""
+        encoded = self._table.encoded
+        return [encoded(track_id) for track_id in islice(self._ids, self._head, None)]
+
+
+class QueueView(Sequence):
+    """Góc nhìn chỉ đọc lên TrackQueue, không sao chép dữ liệu"""
+
+    __slots__ = ("_queue",)
+
+    def __init__(self, queue: TrackQueue):
+        self._queue = queue
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @overload
+    def __getitem__(self, index: int) -> Track: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Track]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._queue[i] for i in range(*index.indices(len(self._queue)))]
+        return self._queue[index]
+
+    def __iter__(self) -> Iterator[Track]:
+        return iter(self._queue)
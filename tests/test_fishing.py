@@ -0,0 +1,36 @@
+import logging
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from Module.fishing import Fishing
+
+TRIALS = 20000
+TOLERANCE = 0.01
+
+
+@pytest.fixture(scope="module")
+def fishing():
+    return Fishing(SimpleNamespace(shutdown_hooks=[], logger=logging.getLogger(__name__)))
+
+
+def test_alias_tables_match_rod_weights(fishing):
+    for level, sampler in fishing.samplers.items():
+        table = sampler.table_probabilities()
+        for outcome, probability in sampler.probabilities.items():
+            assert table[outcome] == pytest.approx(probability, abs=1e-9), (level, outcome)
+
+
+def test_drop_rates_match_rod_weights(fishing):
+    rng = random.Random(0)
+    for level, sampler in fishing.samplers.items():
+        draws = sampler.sample_many(TRIALS, rng)
+        for outcome, probability in sampler.probabilities.items():
+            frequency = draws.count(outcome) / TRIALS
+            assert abs(frequency - probability) <= TOLERANCE, (level, outcome, frequency, probability)
+
+
+def test_better_rods_miss_less(fishing):
+    misses = [fishing.samplers[level].probabilities.get(None, 0.0) for level in sorted(fishing.samplers)]
+    assert misses == sorted(misses, reverse=True)
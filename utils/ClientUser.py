@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from asyncio import get_event_loop
+from asyncio import get_event_loop, gather, wait_for
 from json import load as json_load
 
 from os import environ, path, walk
@@ -9,19 +9,25 @@ from disnake.ext.commands import AutoShardedBot, ExtensionNotLoaded, ExtensionAl
 from dotenv import load_dotenv
 from logging import getLogger
 from gc import collect
-from mafic import NodePool, Node
-from typing import TypedDict, List, Optional, TYPE_CHECKING
+from mafic import NodePool, Node, NodeHealth, Rebalancer, Strategy, TrackCache
+from typing import TypedDict, List, Dict, Optional, TYPE_CHECKING, Callable, Awaitable
 from utils.language.preload import language
 from utils.database.database import Local_Database
+from utils.controller.scheduler import CONTROLLER_SCHEDULER
+from utils.persistence import PERSISTENCE
 
 if TYPE_CHECKING:
     from utils.language.language import LocalizationManager
 
-class Config(TypedDict):
+class Config(TypedDict, total=False):
     host: str
     port: int
     password: str
     secure: bool
+    connection_limit: int
+    request_timeout: float
+    player_limit: int
+    connect_timeout: float
 
 class LavalinkConfig(TypedDict):
     name: str
@@ -43,6 +49,9 @@ except FileNotFoundError: # CONNECT TO LOCALHOST LAVALINK IF lavalink.json NOT F
     }
 ] # NOT RECOMMENDED TO PUT YOUR LAVALINK HERE
 
+SESSION_FILE = "databases/lavalink_sessions.json"
+LEGACY_SESSION_FILE = "lavalink_session_key.ini"
+
 collect()
 
 load_dotenv()
@@ -57,7 +66,20 @@ class ClientUser(AutoShardedBot):
         self.sesson_key = None
         self.uptime = utils.utcnow().utcnow()
         self.env = environ
-        self.nodeClient = NodePool(self)
+        # Ưu tiên node phản hồi nhanh và ổn định nhất, bỏ qua node vừa gặp lỗi liên tục
+        self.nodeClient = NodePool(self, default_strategies=[Strategy.SHARD, Strategy.LOCATION, Strategy.HEALTH])
+        # Chuyển dần player khỏi node đang quá tải hoặc bị mất khung hình
+        self.rebalancer = Rebalancer(
+            self.nodeClient,
+            cpu_threshold=float(environ.get("NODE_REBALANCE_CPU", 0.9)),
+            frame_loss_threshold=float(environ.get("NODE_REBALANCE_FRAME_LOSS", 0.05))
+        ) if environ.get("NODE_REBALANCE", "True") == "True" else None
+        self.track_cache = TrackCache(
+            capacity=int(environ.get("TRACK_CACHE_SIZE", 2048)),
+            ttl=int(environ.get("TRACK_CACHE_TTL", 3600)),
+            negative_ttl=int(environ.get("TRACK_CACHE_NEGATIVE_TTL", 300)),
+            path="databases/trackCache.sqlite" if environ.get("TRACK_CACHE_PERSIST", "True") == "True" else None
+        )
         self.logger = logger
         self.loop = get_event_loop()
         self.connect_node_task = self.loop.create_task(self.loadNode())
@@ -67,34 +89,67 @@ class ClientUser(AutoShardedBot):
         self.game = Activity(name=environ.get("PRESENCE"), type=ActivityType.listening)
         self.language: Optional[LocalizationManager] = language
         self.database = Local_Database()
+        # Các coroutine được gọi khi bot tắt, dùng để ghi nốt dữ liệu còn trong bộ nhớ
+        self.shutdown_hooks: List[Callable[[], Awaitable]] = []
+        # Session id của từng node theo label, dùng để resume player sau khi khởi động lại
+        self.node_sessions: Dict[str, str] = PERSISTENCE.load(SESSION_FILE, {})
+        PERSISTENCE.register("lavalink_sessions", SESSION_FILE, lambda: self.node_sessions)
         self.remove_command("help")
 
     async def loadNode(self):
+            # File cũ chỉ lưu một session id chung, chỉ dùng cho node chưa có session riêng
             try:
-                with open("lavalink_session_key.ini", "r") as session_key_value:
-                    session_key = session_key_value.read()
+                with open(LEGACY_SESSION_FILE, "r") as session_key_value:
+                    legacy_session_key = session_key_value.read().strip() or None
             except FileNotFoundError:
-                session_key = None
-
-            for node in data:
-                    try:
-                        await self.nodeClient.create_node(
-                            label=node["name"],
-                            password=node["config"]["password"],
-                            port=node["config"]["port"],
-                            host=node["config"]["host"],
-                            secure=node["config"]["secure"],
-                            resuming_session_id=session_key
-                        )
-                    except Exception as e:
-                        logger.error(f"Đã xảy ra sự cố khi kết nối đến máy chủ âm nhạc: {e}")
-                        self.unavailable_nodes.append(node)
+                legacy_session_key = None
+
+            # Node chỉ kết nối được khi bot đã đăng nhập, không tính thời gian này vào timeout
+            await self.wait_until_ready()
+            await gather(*(self.connectNode(node, legacy_session_key) for node in data))
+
+    async def connectNode(self, node: LavalinkConfig, legacy_session_key: Optional[str] = None):
+        # Import vòng: musicCore.player -> utils.ClientUser
+        from musicCore.player import MusicPlayer
+
+        config = node["config"]
+        client = Node(
+            client=self,
+            label=node["name"],
+            password=config["password"],
+            port=config["port"],
+            host=config["host"],
+            secure=config["secure"],
+            resuming_session_id=self.node_sessions.get(node["name"], legacy_session_key),
+            connection_limit=config.get("connection_limit", 100),
+            request_timeout=config.get("request_timeout"),
+            track_cache=self.track_cache,
+            health=NodeHealth(player_limit=config.get("player_limit"))
+        )
+        try:
+            # Mỗi node có timeout riêng, node chậm hoặc chết không làm chậm các node khác
+            # Player được Lavalink giữ lại khi resume sẽ được dựng lại thành MusicPlayer
+            await wait_for(self.nodeClient.add_node(client, player_cls=MusicPlayer), timeout=config.get("connect_timeout", 30))
+        except Exception as e:
+            logger.error(f"Đã xảy ra sự cố khi kết nối đến máy chủ âm nhạc {node['name']}: {e!r}")
+            self.unavailable_nodes.append(node)
+            try:
+                await client.close()
+            except Exception:
+                pass
 
     async def on_node_ready(self, node: Node):
         self.logger.info(f"Máy chủ {node.label} (v{node.version}) đã sẵn sàng")
-        with open("lavalink_session_key.ini", "w") as session_key_value:
-            session_key_value.write(node.session_id)
+        if node not in self.available_nodes:
             self.available_nodes.append(node)
+        if node.session_id and self.node_sessions.get(node.label) != node.session_id:
+            self.node_sessions[node.label] = node.session_id
+            PERSISTENCE.mark_dirty("lavalink_sessions")
+            await PERSISTENCE.flush("lavalink_sessions")
+
+    async def on_node_stats(self, node: Node):
+        if self.rebalancer is not None:
+            self.rebalancer.observe(node)
 
     async def on_node_unavailable(self, node: Node):
         logger.warning(f"Mất kết nối đến máy chủ âm nhạc: {node.label}")
@@ -107,6 +162,15 @@ class ClientUser(AutoShardedBot):
         await self.change_presence(status=self.status, activity=self.game)
         self.database.initialze()
         await self.database.build_table()
+        try:
+            count = await self.database.cached_databases.warm_up(
+                (guild.id for guild in self.guilds),
+                mode=environ.get("GUILD_CACHE_MODE", "eager").lower()
+            )
+            if count:
+                logger.info(f"Đã nạp sẵn ngôn ngữ của {count} máy chủ vào bộ nhớ đệm")
+        except Exception as e:
+            logger.error(f"Không thể nạp sẵn bộ nhớ đệm ngôn ngữ: {e}")
         logger.info(f"BOT {self.user.name} đã sẵn sàng")
         await self.connect_node_task
 
@@ -114,8 +178,16 @@ class ClientUser(AutoShardedBot):
     async def close(self):
         logger.warning("Đã nhận tín hiệu ngắt bot và dọn dẹp môi trường")
         await self.database.cached_databases.close()
+        CONTROLLER_SCHEDULER.stop()
+        await PERSISTENCE.flush_all()
+        for hook in self.shutdown_hooks:
+            try:
+                await hook()
+            except Exception as e:
+                logger.error(f"Lỗi khi dọn dẹp trước khi tắt bot: {e}")
         logger.info("Đang đóng các node client")
         await self.nodeClient.close()
+        self.track_cache.close()
         return await super().close()
 
     def load_modules(self):
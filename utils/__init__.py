@@ -8,6 +8,7 @@ Utilities package containing various helper modules:
 - database: Database management
 - language: Localization support
 - controller: Player controller utilities
+- persistence: Debounced, atomic JSON file persistence
 """
 
 # Import main components for easy access
@@ -19,8 +19,12 @@ from .player_controler import (
     handle_select_interaction,
     get_progress_bar,
     get_status_color,
-    format_duration
+    format_duration,
+    snap_to_progress_cell,
+    PROGRESS_BAR_CELLS
 )
+from .render_cache import RenderCache, RENDER_CACHE
+from .scheduler import ControllerScheduler, CONTROLLER_SCHEDULER
 from .button_handlers import PlayerButtonHandlers, BUTTON_HANDLERS, handle_button_interaction
 from .auto_updater import (
     ControllerAutoUpdater, 
@@ -49,6 +53,16 @@ __all__ = [
     'get_progress_bar',
     'get_status_color',
     'format_duration',
+    'snap_to_progress_cell',
+    'PROGRESS_BAR_CELLS',
+    
+    # Render cache
+    'RenderCache',
+    'RENDER_CACHE',
+    
+    # Scheduler
+    'ControllerScheduler',
+    'CONTROLLER_SCHEDULER',
     
     # Button handlers
     'PlayerButtonHandlers',
@@ -3,11 +3,12 @@ Auto Controller Updater
 Tự động cập nhật controller khi có thay đổi
 """
 
-import asyncio
 from typing import TYPE_CHECKING, Optional
 from disnake import Message, NotFound, HTTPException
 import logging
 
+from utils.controller.scheduler import CONTROLLER_SCHEDULER
+
 if TYPE_CHECKING:
     from musicCore import MusicPlayer
 
@@ -18,44 +19,23 @@ class ControllerAutoUpdater:
     
     def __init__(self, player: 'MusicPlayer'):
         self.player = player
-        self.update_task: Optional[asyncio.Task] = None
-        self.last_update_time = 0
-        self.update_interval = 5  # Cập nhật mỗi 5 giây
         self.is_running = False
     
     def start_auto_update(self):
         """Bắt đầu tự động cập nhật controller"""
         if not self.is_running:
             self.is_running = True
-            self.update_task = asyncio.create_task(self._update_loop())
+            # Dùng chung scheduler toàn cục thay vì tạo một task riêng cho guild
+            CONTROLLER_SCHEDULER.register(self.player, delay=CONTROLLER_SCHEDULER.active_interval)
             logger.info(f"Started auto-updater for guild {self.player.guild.id}")
     
     def stop_auto_update(self):
         """Dừng tự động cập nhật controller"""
-        self.is_running = False
-        if self.update_task and not self.update_task.done():
-            self.update_task.cancel()
+        if self.is_running:
+            self.is_running = False
+            CONTROLLER_SCHEDULER.unregister(self.player.guild.id)
             logger.info(f"Stopped auto-updater for guild {self.player.guild.id}")
     
-    async def _update_loop(self):
-        """Loop chính để cập nhật controller"""
-        while self.is_running:
-            try:
-                await asyncio.sleep(self.update_interval)
-                
-                if not self.player.current or not self.player.player_controller:
-                    continue
-                
-                # Chỉ cập nhật nếu đang phát và không phải stream
-                if not self.player.paused and not self.player.current.stream:
-                    await self.update_controller()
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in controller auto-updater: {e}")
-                await asyncio.sleep(1)  # Ngắt nghỉ trước khi thử lại
-    
     async def update_controller(self, force: bool = False):
         """Cập nhật controller message"""
         try:
@@ -64,6 +44,7 @@ class ControllerAutoUpdater:
             
             # Import render function
             from utils.controller.player_controler import render_player
+            from utils.controller.render_cache import RENDER_CACHE
             
             # Lấy ngôn ngữ từ database
             language = await self.player.client.database.cached_databases.get_language(self.player.guild.id)
@@ -73,16 +54,24 @@ class ControllerAutoUpdater:
             if not controller_data:
                 return
             
+            # Bỏ qua nếu nội dung không khác lần gửi trước
+            message = self.player.player_controller
+            if not force and RENDER_CACHE.is_unchanged(self.player.guild.id, message.id, controller_data):
+                return
+            
             # Cập nhật message
-            await self.player.player_controller.edit(
+            await message.edit(
                 embed=controller_data["embed"],
                 view=controller_data["view"]
             )
+            RENDER_CACHE.remember(self.player.guild.id, message.id, controller_data)
             
             logger.debug(f"Updated controller for guild {self.player.guild.id}")
             
         except NotFound:
             # Message đã bị xóa
+            from utils.controller.render_cache import RENDER_CACHE
+            RENDER_CACHE.forget(self.player.guild.id)
             self.player.player_controller = None
             self.stop_auto_update()
             logger.warning(f"Controller message not found for guild {self.player.guild.id}")
@@ -115,6 +104,8 @@ class ControllerManager:
     @classmethod
     def remove_updater(cls, guild_id: int):
         """Xóa updater cho guild"""
+        from utils.controller.render_cache import RENDER_CACHE
+        RENDER_CACHE.forget(guild_id)
         if guild_id in cls._instances:
             updater = cls._instances[guild_id]
             updater.stop_auto_update()
@@ -160,6 +151,7 @@ async def on_player_resume(player: 'MusicPlayer'):
     """Được gọi khi player được resume"""
     await update_controller_now(player)
     await start_controller_updates(player)
+    CONTROLLER_SCHEDULER.touch(player.guild.id)
 
 async def on_volume_change(player: 'MusicPlayer'):
     """Được gọi khi âm lượng thay đổi"""
@@ -39,7 +39,7 @@ class PlayerButtonHandlers:
     async def handle_previous(interaction: MessageInteraction, player: 'MusicPlayer'):
         """Xử lý button previous track"""
         try:
-            if len(player.queue.played) == 0:
+            if not player.queue.has_previous:
                 await interaction.response.send_message("❌ Không có bài hát trước đó!", ephemeral=True)
                 return
             
@@ -143,7 +143,7 @@ class PlayerButtonHandlers:
             # Bài tiếp theo
             if player.queue.next_track:
                 next_songs = []
-                for i, track in enumerate(player.queue.next_track[:5]):  # Hiển thị 5 bài đầu
+                for i, track in enumerate(player.queue.get_next_track(5)):  # Hiển thị 5 bài đầu
                     next_songs.append(f"`{i+1}.` **{trim_text(track.title, 40)}**")
                 
                 if len(player.queue.next_track) > 5:
@@ -162,7 +162,7 @@ class PlayerButtonHandlers:
                 )
             
             # Thống kê
-            total_duration = sum(track.length for track in player.queue.next_track if not track.stream)
+            total_duration = player.queue.next_track.total_length()
             embed.set_footer(text=f"📊 Tổng cộng: {len(player.queue.next_track)} bài • {time_format(total_duration)}")
             
             await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -20,6 +20,7 @@ class ControllerIntegration:
         """Gửi controller message mới"""
         try:
             from .player_controler import render_player
+            from .render_cache import RENDER_CACHE
             from .auto_updater import start_controller_updates
             
             # Render controller
@@ -35,6 +36,7 @@ class ControllerIntegration:
             
             # Lưu reference và bắt đầu auto-update
             player.player_controller = message
+            RENDER_CACHE.remember(player.guild.id, message.id, controller_data)
             await start_controller_updates(player)
             
             logger.info(f"Sent new controller for guild {player.guild.id}")
@@ -52,17 +54,24 @@ class ControllerIntegration:
                 return False
             
             from .player_controler import render_player
+            from .render_cache import RENDER_CACHE
             
             # Render controller mới
             controller_data = render_player(player, language)
             if not controller_data:
                 return False
             
+            # Không gửi lại nếu nội dung không đổi
+            message = player.player_controller
+            if RENDER_CACHE.is_unchanged(player.guild.id, message.id, controller_data):
+                return True
+            
             # Cập nhật message
-            await player.player_controller.edit(
+            await message.edit(
                 embed=controller_data["embed"],
                 view=controller_data["view"]
             )
+            RENDER_CACHE.remember(player.guild.id, message.id, controller_data)
             
             return True
             
@@ -1,6 +1,7 @@
 from disnake import Embed, ButtonStyle, Color, SelectOption
 from disnake.ui import View, Button, Select
 from typing import TYPE_CHECKING, Optional, List
+from os import environ
 import asyncio
 
 # Import với error handling
@@ -27,7 +28,10 @@ except ImportError:
 if TYPE_CHECKING:
     from musicCore import MusicPlayer
 
-def get_progress_bar(current_pos: int, total_length: int, bar_length: int = 30) -> str:
+# Số ô của thanh tiến trình, controller chỉ được sửa khi thanh nhích thêm một ô
+PROGRESS_BAR_CELLS = max(1, int(environ.get("CONTROLLER_PROGRESS_CELLS", 30)))
+
+def get_progress_bar(current_pos: int, total_length: int, bar_length: int = PROGRESS_BAR_CELLS) -> str:
     """Tạo thanh tiến trình đẹp mắt cho bài hát"""
     if total_length == 0:
         return "▬" * bar_length
@@ -40,6 +44,13 @@ def get_progress_bar(current_pos: int, total_length: int, bar_length: int = 30)
     empty = "░" * (bar_length - filled_length)
     return f"{filled}{empty}"
 
+def snap_to_progress_cell(current_pos: int, total_length: int, bar_length: int = PROGRESS_BAR_CELLS) -> int:
+    """Làm tròn vị trí về đầu ô hiện tại của thanh tiến trình"""
+    if total_length <= 0:
+        return 0
+    current_pos = min(max(current_pos, 0), total_length)
+    return total_length * (current_pos * bar_length // total_length) // bar_length
+
 def get_status_color(player) -> Color:
     """Lấy màu cho embed dựa trên trạng thái player"""
     try:
@@ -219,8 +230,8 @@ def render_player(self, language: str = 'vi'):
         # Thời gian và thanh tiến trình
         is_stream = hasattr(player.current, 'stream') and player.current.stream
         if not is_stream and hasattr(player.current, 'length') and player.current.length > 0:
-            current_time = getattr(player.current, 'position', 0)
             total_time = player.current.length
+            current_time = snap_to_progress_cell(getattr(player, 'position', 0), total_time)
 
             current_formatted = format_duration(current_time)
             total_formatted = format_duration(total_time)
@@ -279,7 +290,7 @@ def render_player(self, language: str = 'vi'):
 
         # Footer
         if not is_stream and hasattr(player.current, 'length'):
-            current_pos = getattr(player.current, 'position', 0)
+            current_pos = snap_to_progress_cell(getattr(player, 'position', 0), player.current.length)
             footer_text = f"Music CitLaLi | {format_duration(current_pos)} / {format_duration(player.current.length)}"
         else:
             footer_text = "Music CitLaLi | Live Stream"
@@ -357,7 +368,8 @@ def create_enhanced_view(player, language: str) -> View:
         # Previous track
         played_count = 0
         if hasattr(player, 'queue') and hasattr(player.queue, 'played'):
-            played_count = safe_len(player.queue.played)
+            # Khi trộn + lặp playlist, các bài đã phát nằm trong drawn
+            played_count = safe_len(player.queue.played) + safe_len(getattr(player.queue, 'drawn', ()))
 
         view.add_item(Button(
             style=ButtonStyle.secondary,
@@ -696,11 +708,15 @@ async def handle_select_interaction(interaction, player):
                 queue_list = []
                 queue_tracks = []
 
+                queue_size = 0
                 if hasattr(player, 'queue'):
-                    if hasattr(player.queue, 'next_track') and player.queue.next_track:
-                        queue_tracks = ensure_list(player.queue.next_track)
+                    if hasattr(player.queue, 'get_next_track') and player.queue.next_track:
+                        # Chỉ dựng 8 bài đầu, phần còn lại chỉ cần đếm
+                        queue_tracks = player.queue.get_next_track(8)
+                        queue_size = safe_len(player.queue.next_track)
                     elif hasattr(player.queue, '_queue') and player.queue._queue:
                         queue_tracks = ensure_list(player.queue._queue)
+                        queue_size = len(queue_tracks)
 
                 embed = Embed(title="📋 Hàng đợi phát nhạc", color=Color.blue())
 
@@ -722,11 +738,11 @@ async def handle_select_interaction(interaction, player):
                         queue_list.append(f"`{i}.` **{trim_text(title, 35)}**\n    👤 {trim_text(author, 25)}")
 
                     queue_text = "\n\n".join(queue_list)
-                    if len(queue_tracks) > 8:
-                        queue_text += f"\n\n`...` **và {len(queue_tracks) - 8} bài khác**"
+                    if queue_size > 8:
+                        queue_text += f"\n\n`...` **và {queue_size - 8} bài khác**"
 
                     embed.add_field(
-                        name=f"⏭️ Tiếp theo ({len(queue_tracks)} bài)",
+                        name=f"⏭️ Tiếp theo ({queue_size} bài)",
                         value=queue_text,
                         inline=False
                     )
@@ -738,7 +754,7 @@ async def handle_select_interaction(interaction, player):
                     )
 
                 # Thông tin thêm
-                total_songs = len(queue_tracks) + (1 if hasattr(player, 'current') and player.current else 0)
+                total_songs = queue_size + (1 if hasattr(player, 'current') and player.current else 0)
                 embed.set_footer(text=f"Tổng cộng: {total_songs} bài hát")
 
                 # Thumbnail
@@ -0,0 +1,59 @@
+"""
+Render Cache
+Ghi nhớ fingerprint của lần render controller gần nhất theo guild,
+bỏ qua việc sửa tin nhắn khi nội dung không thay đổi
+"""
+
+import json
+from hashlib import blake2b
+from typing import Optional
+
+
+class RenderCache:
+    """Lưu fingerprint của payload đã gửi lên Discord cho mỗi guild"""
+
+    def __init__(self):
+        # guild_id -> (message_id, fingerprint)
+        self._fingerprints: dict[int, tuple[int, str]] = {}
+        self.skipped = 0
+        self.sent = 0
+
+    @staticmethod
+    def fingerprint(payload: dict) -> str:
+        """Tính fingerprint từ embed và các component của view"""
+        embed = payload.get("embed")
+        view = payload.get("view")
+        data = {
+            "embed": embed.to_dict() if embed is not None else None,
+            "components": view.to_components() if view is not None else None,
+        }
+        raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        return blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def is_unchanged(self, guild_id: int, message_id: Optional[int], payload: dict) -> bool:
+        """Trả về True nếu tin nhắn hiện tại đã hiển thị đúng payload này"""
+        cached = self._fingerprints.get(guild_id)
+        if cached is None or cached[0] != message_id:
+            return False
+        if cached[1] == self.fingerprint(payload):
+            self.skipped += 1
+            return True
+        return False
+
+    def remember(self, guild_id: int, message_id: Optional[int], payload: dict):
+        """Ghi nhớ payload vừa được gửi thành công"""
+        if message_id is None:
+            self.forget(guild_id)
+            return
+        self._fingerprints[guild_id] = (message_id, self.fingerprint(payload))
+        self.sent += 1
+
+    def forget(self, guild_id: int):
+        """Xóa fingerprint của guild, lần render sau sẽ luôn được gửi"""
+        self._fingerprints.pop(guild_id, None)
+
+    def clear(self):
+        self._fingerprints.clear()
+
+
+RENDER_CACHE = RenderCache()
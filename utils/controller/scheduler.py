@@ -0,0 +1,178 @@
+"""
+Controller Scheduler
+Một vòng lặp duy nhất cập nhật controller cho mọi guild thay vì mỗi player một task
+"""
+
+import asyncio
+import heapq
+import logging
+from itertools import count
+from os import environ
+from time import monotonic
+from typing import TYPE_CHECKING, Optional
+
+from utils.controller.render_cache import RENDER_CACHE
+
+if TYPE_CHECKING:
+    from musicCore import MusicPlayer
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("player", "due", "interval", "active_until")
+
+    def __init__(self, player: 'MusicPlayer', due: float, interval: float):
+        self.player = player
+        self.due = due
+        self.interval = interval
+        self.active_until = 0.0
+
+
+class ControllerScheduler:
+    """Lập lịch cập nhật controller bằng heap theo thời điểm đến hạn.
+
+    - Các guild có người đang tương tác được cập nhật dày hơn và được ưu tiên trước
+    - Player tạm dừng, đang phát trực tiếp hoặc không có bài sẽ giãn dần chu kỳ cập nhật
+    - Tổng số lần sửa tin nhắn gửi lên Discord bị giới hạn bởi một token bucket dùng chung
+    """
+
+    def __init__(self, interval: float = 20, active_interval: float = 5, idle_interval: float = 120,
+                 active_window: float = 30, edit_rate: float = 5, edit_burst: int = 10):
+        self.interval = interval
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.active_window = active_window
+        self.edit_rate = edit_rate
+        self.edit_burst = edit_burst
+
+        self._entries: dict[int, _Entry] = {}
+        # (due, priority, seq, guild_id), phần tử cũ được bỏ qua khi lấy ra
+        self._heap: list[tuple[float, int, int, int]] = []
+        self._seq = count()
+        self._tokens = float(edit_burst)
+        self._refilled_at = monotonic()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _push(self, guild_id: int, entry: _Entry):
+        priority = 0 if entry.active_until > entry.due else 1
+        heapq.heappush(self._heap, (entry.due, priority, next(self._seq), guild_id))
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def register(self, player: 'MusicPlayer', delay: Optional[float] = None):
+        """Thêm player vào lịch cập nhật"""
+        guild_id = player.guild.id
+        entry = _Entry(player, monotonic() + (self.interval if delay is None else delay), self.interval)
+        self._entries[guild_id] = entry
+        self._push(guild_id, entry)
+        self._ensure_running()
+        self._wakeup.set()
+
+    def unregister(self, guild_id: int):
+        """Xóa player khỏi lịch cập nhật"""
+        self._entries.pop(guild_id, None)
+
+    def touch(self, guild_id: int, delay: float = 1):
+        """Đánh dấu guild đang có người tương tác, cập nhật sớm và dày hơn trong một khoảng thời gian"""
+        entry = self._entries.get(guild_id)
+        if entry is None:
+            return
+        now = monotonic()
+        entry.active_until = now + self.active_window
+        entry.interval = self.active_interval
+        if entry.due > now + delay:
+            entry.due = now + delay
+            self._push(guild_id, entry)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def stop(self):
+        """Dừng vòng lặp và xóa toàn bộ lịch"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._entries.clear()
+        self._heap.clear()
+
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(self.edit_burst, self._tokens + (now - self._refilled_at) * self.edit_rate)
+        self._refilled_at = now
+
+    def _next_interval(self, entry: _Entry) -> float:
+        player = entry.player
+        now = monotonic()
+        if entry.active_until > now:
+            return self.active_interval
+        if player.current is None or player.paused or player.current.stream:
+            # Giãn chu kỳ gấp đôi mỗi lần cho tới idle_interval
+            return min(max(entry.interval, self.interval) * 2, self.idle_interval)
+        return self.interval
+
+    def _pop_due(self, limit: int) -> list[tuple[int, _Entry]]:
+        now = monotonic()
+        batch = []
+        while self._heap and len(batch) < limit:
+            due, _, _, guild_id = self._heap[0]
+            entry = self._entries.get(guild_id)
+            if entry is None or entry.due != due:
+                heapq.heappop(self._heap)
+                continue
+            if due > now:
+                break
+            heapq.heappop(self._heap)
+            batch.append((guild_id, entry))
+        return batch
+
+    async def _refresh(self, guild_id: int, entry: _Entry):
+        try:
+            await entry.player.controller(force_resync=True)
+        except Exception as e:
+            logger.error(f"Error refreshing controller for guild {guild_id}: {e}")
+        finally:
+            if self._entries.get(guild_id) is entry:
+                entry.interval = self._next_interval(entry)
+                entry.due = monotonic() + entry.interval
+                self._push(guild_id, entry)
+
+    async def _run(self):
+        while True:
+            try:
+                self._refill()
+                # Luôn cho phép ít nhất một lượt để lịch không bị kẹt khi hết token
+                batch = self._pop_due(max(1, int(self._tokens)))
+
+                if batch:
+                    sent = RENDER_CACHE.sent
+                    await asyncio.gather(*(self._refresh(guild_id, entry) for guild_id, entry in batch))
+                    self._tokens -= RENDER_CACHE.sent - sent
+                    if self._tokens < 1:
+                        await asyncio.sleep((1 - self._tokens) / self.edit_rate)
+                    continue
+
+                timeout = self._heap[0][0] - monotonic() if self._heap else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in controller scheduler: {e}")
+                await asyncio.sleep(1)
+
+
+CONTROLLER_SCHEDULER = ControllerScheduler(
+    interval=float(environ.get("CONTROLLER_UPDATE_INTERVAL", 20)),
+    edit_rate=float(environ.get("CONTROLLER_EDIT_RATE", 5)),
+)
@@ -0,0 +1,167 @@
+import json
+import os
+from datetime import datetime
+from logging import getLogger
+from typing import Optional
+
+import aiosqlite
+from asyncio import Lock
+
+logger = getLogger(__name__)
+
+
+class BoostLog:
+    """Lịch sử boost dạng chỉ ghi thêm, kèm số liệu tổng hợp theo guild được cập nhật dần
+
+    Mỗi lần boost là một INSERT, thống kê và lịch sử gần đây chỉ đọc theo chỉ mục
+    nên không phụ thuộc vào lượng lịch sử đã tích lũy
+    """
+
+    DATABASE_PATH = "databases/boosts.sqlite"
+    LEGACY_PATH = "data/boost_history.json"
+
+    def __init__(self, path: str = DATABASE_PATH):
+        self.path = path
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._connect_lock = Lock()
+        # guild_id -> (total_boosts, unique_boosters)
+        self._aggregates: dict[int, tuple[int, int]] = {}
+
+    async def connection(self) -> aiosqlite.Connection:
+        if self._connection is None:
+            async with self._connect_lock:
+                if self._connection is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    db = await aiosqlite.connect(self.path)
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.execute("PRAGMA synchronous=NORMAL")
+                    await self._build_tables(db)
+                    self._connection = db
+                    await self._migrate_legacy()
+        return self._connection
+
+    async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    async def _build_tables(db: aiosqlite.Connection):
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS boost_events(
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                user_name TEXT,
+                guild_name TEXT,
+                boost_time REAL NOT NULL,
+                boost_count_after INTEGER,
+                tier_after INTEGER,
+                message_id INTEGER,
+                channel_id INTEGER
+            )
+        """)
+        await db.execute("""CREATE INDEX IF NOT EXISTS idx_boost_events_guild ON boost_events(guild_id, boost_time)""")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS boost_boosters(
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                PRIMARY KEY (guild_id, user_id)
+            ) WITHOUT ROWID
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS boost_aggregates(
+                guild_id INTEGER PRIMARY KEY,
+                total_boosts INTEGER NOT NULL DEFAULT 0,
+                unique_boosters INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        await db.commit()
+
+    async def _migrate_legacy(self):
+        """Chuyển data/boost_history.json sang SQLite ở lần chạy đầu tiên"""
+        if not os.path.exists(self.LEGACY_PATH):
+            return
+        try:
+            with open(self.LEGACY_PATH, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.error(f"Không thể đọc {self.LEGACY_PATH}: {e}")
+            return
+
+        for entry in legacy:
+            await self._insert(entry)
+        await self._connection.commit()
+        os.replace(self.LEGACY_PATH, self.LEGACY_PATH + ".migrated")
+        logger.info(f"Đã chuyển {len(legacy)} lượt boost từ {self.LEGACY_PATH} sang SQLite")
+
+    async def _insert(self, entry: dict):
+        db = self._connection
+        guild_id = entry['guild_id']
+        await db.execute(
+            """INSERT INTO boost_events(guild_id, user_id, user_name, guild_name, boost_time,
+                                        boost_count_after, tier_after, message_id, channel_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                guild_id, entry['user_id'], entry.get('user_name'), entry.get('guild_name'),
+                datetime.fromisoformat(entry['boost_time']).timestamp(),
+                entry.get('boost_count_after'), entry.get('tier_after'),
+                entry.get('message_id'), entry.get('channel_id')
+            )
+        )
+        cursor = await db.execute(
+            """INSERT OR IGNORE INTO boost_boosters(guild_id, user_id) VALUES (?, ?)""",
+            (guild_id, entry['user_id'])
+        )
+        new_booster = 1 if cursor.rowcount > 0 else 0
+        await db.execute(
+            """INSERT INTO boost_aggregates(guild_id, total_boosts, unique_boosters) VALUES (?, 1, ?)
+               ON CONFLICT(guild_id) DO UPDATE SET
+                   total_boosts = total_boosts + 1,
+                   unique_boosters = unique_boosters + excluded.unique_boosters""",
+            (guild_id, new_booster)
+        )
+        cached = self._aggregates.get(guild_id)
+        if cached is not None:
+            self._aggregates[guild_id] = (cached[0] + 1, cached[1] + new_booster)
+
+    async def append(self, entry: dict):
+        """Ghi thêm một lượt boost và cập nhật số liệu tổng hợp trong cùng transaction"""
+        await self.connection()
+        await self._insert(entry)
+        await self._connection.commit()
+
+    async def stats(self, guild_id: int) -> tuple[int, int]:
+        """Trả về (tổng số lượt boost, số người boost khác nhau) của guild"""
+        cached = self._aggregates.get(guild_id)
+        if cached is not None:
+            return cached
+        db = await self.connection()
+        async with db.execute(
+            """SELECT total_boosts, unique_boosters FROM boost_aggregates WHERE guild_id=?""", (guild_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        result = (row[0], row[1]) if row else (0, 0)
+        self._aggregates[guild_id] = result
+        return result
+
+    async def recent(self, guild_id: int, limit: int = 10) -> list[dict]:
+        """Các lượt boost gần nhất của guild, mới nhất đứng đầu"""
+        db = await self.connection()
+        async with db.execute(
+            """SELECT user_id, user_name, boost_time, boost_count_after, tier_after
+               FROM boost_events WHERE guild_id=? ORDER BY boost_time DESC LIMIT ?""",
+            (guild_id, limit)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [
+            {
+                'user_id': user_id,
+                'user_name': user_name,
+                'boost_time': datetime.fromtimestamp(boost_time).isoformat(),
+                'boost_count_after': boost_count_after,
+                'tier_after': tier_after
+            }
+            for user_id, user_name, boost_time, boost_count_after, tier_after in rows
+        ]
@@ -2,8 +2,8 @@ import os
 from logging import getLogger
 
 import aiosqlite
-from typing import TypedDict, Optional
-from asyncio import sleep, create_task
+from typing import TypedDict, Optional, Iterable
+from asyncio import sleep, create_task, Lock
 
 logger = getLogger(__name__)
 
@@ -16,20 +16,53 @@ class Cached_Databases:
 
     async def __commit_all__(self):
         while True:
-            count = 0
-            for guildID, guildData in self.databases.items():
-                if not guildData["synced"]:
-                    await self.database.set_guild(guildID, guildData["language"])
-                    guildData["synced"] = True
-                    count += 1
-            if count:
-                logger.info(f"Đã đồng bộ {count} guilds lên database")
             await sleep(600)
+            await self.flush()
 
     def __init__(self, database):
         self.database = database
         create_task(self.__commit_all__())
 
+    async def flush(self) -> int:
+        """Ghi toàn bộ guild chưa đồng bộ xuống database trong một transaction"""
+        dirty = [guildID for guildID, guildData in self.databases.items() if not guildData["synced"]]
+        if not dirty:
+            return 0
+        rows = []
+        for guildID in dirty:
+            # Đánh dấu trước khi ghi, nếu guild bị sửa trong lúc ghi thì lần sau sẽ ghi lại
+            self.databases[guildID]["synced"] = True
+            rows.append((guildID, self.databases[guildID]["language"]))
+        try:
+            await self.database.set_guilds(rows)
+        except Exception:
+            for guildID in dirty:
+                if guildID in self.databases:
+                    self.databases[guildID]["synced"] = False
+            raise
+        logger.info(f"Đã đồng bộ {len(rows)} guilds lên database")
+        return len(rows)
+
+    async def warm_up(self, guildIDs: Iterable[int] = (), mode: str = "eager") -> int:
+        """Nạp sẵn ngôn ngữ của các guild vào cache
+
+        - eager: đọc toàn bộ bảng guilds trong một truy vấn, guild chưa có sẽ được thêm hàng loạt
+        - lazy: không nạp gì, mỗi guild được đọc ở lần truy cập đầu tiên
+        """
+        if mode != "eager":
+            return 0
+        rows = await self.database.get_all_guilds()
+        missing = [guildID for guildID in guildIDs if guildID not in rows]
+        if missing:
+            await self.database.create_guilds(missing)
+            rows.update(dict.fromkeys(missing, "vi"))
+        for guildID, language in rows.items():
+            cached = self.databases.get(guildID)
+            # Không ghi đè thay đổi chưa được đồng bộ
+            if cached is None or cached["synced"]:
+                self.databases[guildID] = {"language": language, "synced": True}
+        return len(rows)
+
     async def add_guild(self, guildID: int, language: str = "vi"):
         await self.database.create_guild(guildID, language)
         self.databases[guildID] = {}
@@ -60,69 +93,118 @@ class Cached_Databases:
 
     async def close(self):
         logger.info("Đang lưu dữ liệu...")
-        count = 0
-        for guildID in self.databases:
-            if not self.databases[guildID]['synced']:
-                await self.database.set_guild(guildID, self.databases[guildID]['language'])
-                count += 1
+        count = await self.flush()
         logger.info(f"Đã đồng bộ {count} guild{'s' if count > 1 else ''} vào cơ sở dữ liệu")
+        await self.database.close()
 
 
 class Local_Database:
+    DATABASE_PATH = "databases/guildData.sqlite"
+    # Giới hạn số tham số của SQLite cho câu lệnh IN (...)
+    QUERY_CHUNK = 500
+
     def __init__(self):
         self.cached_databases: Optional[Cached_Databases] = None
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._connect_lock = Lock()
 
     def initialze(self):
         path = 'databases/'
         if not os.path.exists(path):
             os.makedirs(path)
 
-        self.cached_databases = Cached_Databases(self)
+        if self.cached_databases is None:
+            self.cached_databases = Cached_Databases(self)
+
+    async def connection(self) -> aiosqlite.Connection:
+        """Kết nối dùng chung cho mọi truy vấn, chỉ mở một lần"""
+        if self._connection is None:
+            async with self._connect_lock:
+                if self._connection is None:
+                    db = await aiosqlite.connect(self.DATABASE_PATH, cached_statements=64)
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.execute("PRAGMA synchronous=NORMAL")
+                    self._connection = db
+        return self._connection
+
+    async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
 
     async def build_table(self):
-        async with aiosqlite.connect("databases/guildData.sqlite") as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS guilds(
-                    guildID INTEGER PRIMARY KEY, 
-                    language TEXT DEFAULT 'vi'
-                )
-            """)
-            await db.commit()
-            await db.close()
+        db = await self.connection()
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS guilds(
+                guildID INTEGER PRIMARY KEY, 
+                language TEXT DEFAULT 'vi'
+            )
+        """)
+        await db.commit()
 
     async def create_guild(self, guildID: int, language: str = "vi"):
-        async with aiosqlite.connect("databases/guildData.sqlite") as cursor:
-            await cursor.execute(
-                """INSERT INTO guilds(guildID, language) VALUES (?, ?)""",
-                (guildID, language,)
-            )
-            await cursor.commit()
-            await cursor.close()
+        db = await self.connection()
+        await db.execute(
+            """INSERT INTO guilds(guildID, language) VALUES (?, ?)""",
+            (guildID, language,)
+        )
+        await db.commit()
 
     async def get_guild(self, guildID: int):
-        async with aiosqlite.connect("databases/guildData.sqlite") as db:
-            cursor = await db.execute(
-                """SELECT language FROM guilds WHERE guildID=?""",
-                (guildID,)
-                )
+        db = await self.connection()
+        async with db.execute(
+            """SELECT language FROM guilds WHERE guildID=?""",
+            (guildID,)
+        ) as cursor:
             data = await cursor.fetchone()
-            await db.close()
-            return data[0] if data else None
+        return data[0] if data else None
+
+    async def get_guilds(self, guildIDs: Iterable[int]) -> dict[int, str]:
+        """Lấy ngôn ngữ của nhiều guild cùng lúc, guild chưa có trong database sẽ không có trong kết quả"""
+        guildIDs = list(guildIDs)
+        db = await self.connection()
+        result: dict[int, str] = {}
+        for i in range(0, len(guildIDs), self.QUERY_CHUNK):
+            chunk = guildIDs[i:i + self.QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            async with db.execute(
+                f"""SELECT guildID, language FROM guilds WHERE guildID IN ({placeholders})""",
+                chunk
+            ) as cursor:
+                for guildID, language in await cursor.fetchall():
+                    result[guildID] = language
+        return result
+
+    async def get_all_guilds(self) -> dict[int, str]:
+        db = await self.connection()
+        async with db.execute("""SELECT guildID, language FROM guilds""") as cursor:
+            return {guildID: language for guildID, language in await cursor.fetchall()}
+
+    async def create_guilds(self, guildIDs: Iterable[int], language: str = "vi"):
+        """Thêm nhiều guild trong một transaction, bỏ qua guild đã tồn tại"""
+        db = await self.connection()
+        await db.executemany(
+            """INSERT OR IGNORE INTO guilds(guildID, language) VALUES (?, ?)""",
+            [(guildID, language) for guildID in guildIDs]
+        )
+        await db.commit()
 
     async def delete_guild(self, guildID: int):
-        async with aiosqlite.connect("databases/guildData.sqlite") as cursor:
-            await cursor.execute(
-                """DELETE FROM guilds WHERE guildID=?""",
-                (guildID,)
-            )
-            await cursor.commit()
-            await cursor.close()
+        db = await self.connection()
+        await db.execute(
+            """DELETE FROM guilds WHERE guildID=?""",
+            (guildID,)
+        )
+        await db.commit()
 
     async def set_guild(self, guildID: int, language: str = None):
-        if not language:
-            language = "vi"
-        async with aiosqlite.connect("databases/guildData.sqlite") as cursor:
-            await cursor.execute("""UPDATE guilds SET language=? WHERE guildID=?""", (language, guildID,))
-            await cursor.commit()
-            await cursor.close()
-
+        await self.set_guilds([(guildID, language)])
+
+    async def set_guilds(self, rows: Iterable[tuple[int, Optional[str]]]):
+        """Cập nhật ngôn ngữ của nhiều guild trong một transaction"""
+        db = await self.connection()
+        await db.executemany(
+            """UPDATE guilds SET language=? WHERE guildID=?""",
+            [(language or "vi", guildID) for guildID, language in rows]
+        )
+        await db.commit()
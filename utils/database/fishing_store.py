@@ -0,0 +1,245 @@
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime, date
+from logging import getLogger
+from typing import Optional
+
+import aiosqlite
+from asyncio import Lock, sleep, create_task, Task
+
+logger = getLogger(__name__)
+
+LEADERBOARD_COLUMNS = ("money", "total_caught")
+
+
+def new_player() -> dict:
+    return {
+        "money": 100,
+        "fish_caught": {},
+        "rod_level": 1,
+        "last_fish": None,
+        "total_caught": 0,
+        "achievements": [],
+        "last_daily": None,
+        # quest_id -> thời điểm hoàn thành, theo thứ tự hoàn thành
+        "completed_quests": {}
+    }
+
+
+class FishingStore:
+    """Lưu dữ liệu game câu cá trong SQLite, kèm cache ghi trễ (write-behind) cho người chơi đang hoạt động
+
+    - Người chơi được đọc vào cache ở lần truy cập đầu, các thay đổi chỉ được đánh dấu dirty
+      và ghi xuống database theo lô mỗi flush_interval giây
+    - Cache giới hạn bởi capacity, người chơi ít dùng nhất bị bỏ khỏi bộ nhớ sau khi đã được ghi
+    - Bảng xếp hạng đọc theo chỉ mục trên money / total_caught
+    """
+
+    DATABASE_PATH = "databases/fishing.sqlite"
+
+    def __init__(self, path: str = DATABASE_PATH, capacity: int = 5000, flush_interval: float = 10):
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._connect_lock = Lock()
+        self._flush_lock = Lock()
+        self._players: OrderedDict[int, dict] = OrderedDict()
+        self._dirty: set[int] = set()
+        self._flush_task: Optional[Task] = None
+
+    async def connection(self) -> aiosqlite.Connection:
+        if self._connection is None:
+            async with self._connect_lock:
+                if self._connection is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    db = await aiosqlite.connect(self.path)
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.execute("PRAGMA synchronous=NORMAL")
+                    await self._build_tables(db)
+                    self._connection = db
+                    self._flush_task = create_task(self._flush_loop())
+        return self._connection
+
+    @staticmethod
+    async def _build_tables(db: aiosqlite.Connection):
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS players(
+                user_id INTEGER PRIMARY KEY,
+                money INTEGER NOT NULL DEFAULT 100,
+                rod_level INTEGER NOT NULL DEFAULT 1,
+                total_caught INTEGER NOT NULL DEFAULT 0,
+                last_fish REAL,
+                last_daily TEXT,
+                achievements TEXT NOT NULL DEFAULT '[]'
+            )
+        """)
+        await db.execute("""CREATE INDEX IF NOT EXISTS idx_players_money ON players(money DESC)""")
+        await db.execute("""CREATE INDEX IF NOT EXISTS idx_players_total_caught ON players(total_caught DESC)""")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS inventory(
+                user_id INTEGER NOT NULL,
+                fish TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (user_id, fish)
+            ) WITHOUT ROWID
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS quests(
+                user_id INTEGER NOT NULL,
+                quest_id TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (user_id, quest_id)
+            ) WITHOUT ROWID
+        """)
+        await db.commit()
+
+    async def get(self, user_id: int) -> dict:
+        """Lấy dữ liệu người chơi, tạo mới nếu chưa có"""
+        player = self._players.get(user_id)
+        if player is not None:
+            self._players.move_to_end(user_id)
+            return player
+
+        player = await self._load(user_id)
+        # Có thể đã được nạp bởi một lệnh khác trong lúc chờ database
+        if user_id in self._players:
+            return self._players[user_id]
+        if player is None:
+            # Chỉ được ghi khi một lệnh thực sự thay đổi dữ liệu (save_user_data -> mark_dirty)
+            player = new_player()
+        self._players[user_id] = player
+        self._evict()
+        return player
+
+    def mark_dirty(self, user_id: int):
+        """Đánh dấu người chơi đã thay đổi, sẽ được ghi ở lần flush tiếp theo"""
+        if user_id in self._players:
+            self._dirty.add(user_id)
+
+    async def _load(self, user_id: int) -> Optional[dict]:
+        db = await self.connection()
+        async with db.execute(
+            """SELECT money, rod_level, total_caught, last_fish, last_daily, achievements
+               FROM players WHERE user_id=?""", (user_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        money, rod_level, total_caught, last_fish, last_daily, achievements = row
+
+        async with db.execute("""SELECT fish, count FROM inventory WHERE user_id=?""", (user_id,)) as cursor:
+            fish_caught = {fish: count for fish, count in await cursor.fetchall()}
+        async with db.execute(
+            """SELECT quest_id, completed_at FROM quests WHERE user_id=? ORDER BY completed_at""", (user_id,)
+        ) as cursor:
+            completed_quests = {quest_id: completed_at for quest_id, completed_at in await cursor.fetchall()}
+
+        return {
+            "money": money,
+            "fish_caught": fish_caught,
+            "rod_level": rod_level,
+            "last_fish": datetime.fromtimestamp(last_fish) if last_fish is not None else None,
+            "total_caught": total_caught,
+            "achievements": json.loads(achievements),
+            "last_daily": date.fromisoformat(last_daily) if last_daily else None,
+            "completed_quests": completed_quests
+        }
+
+    def _evict(self):
+        # Chỉ bỏ người chơi đã được ghi xuống database, người chơi dirty sẽ bị bỏ sau lần flush
+        if len(self._players) <= self.capacity:
+            return
+        for user_id in list(self._players):
+            if len(self._players) <= self.capacity:
+                break
+            if user_id not in self._dirty:
+                del self._players[user_id]
+
+    async def flush(self) -> int:
+        """Ghi toàn bộ người chơi dirty trong một transaction"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+            db = await self.connection()
+            dirty = [user_id for user_id in self._dirty if user_id in self._players]
+            self._dirty.clear()
+
+            players, inventory, quests = [], [], []
+            for user_id in dirty:
+                data = self._players[user_id]
+                players.append((
+                    user_id, data["money"], data["rod_level"], data["total_caught"],
+                    data["last_fish"].timestamp() if data["last_fish"] else None,
+                    data["last_daily"].isoformat() if data.get("last_daily") else None,
+                    json.dumps(data.get("achievements", []))
+                ))
+                inventory.extend((user_id, fish, count) for fish, count in data["fish_caught"].items() if count)
+                quests.extend(
+                    (user_id, quest_id, completed_at)
+                    for quest_id, completed_at in data.get("completed_quests", {}).items()
+                )
+
+            try:
+                await db.executemany(
+                    """INSERT INTO players(user_id, money, rod_level, total_caught, last_fish, last_daily, achievements)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(user_id) DO UPDATE SET
+                           money=excluded.money, rod_level=excluded.rod_level,
+                           total_caught=excluded.total_caught, last_fish=excluded.last_fish,
+                           last_daily=excluded.last_daily, achievements=excluded.achievements""",
+                    players
+                )
+                await db.executemany("""DELETE FROM inventory WHERE user_id=?""", [(user_id,) for user_id in dirty])
+                await db.executemany("""INSERT INTO inventory(user_id, fish, count) VALUES (?, ?, ?)""", inventory)
+                await db.executemany(
+                    """INSERT OR IGNORE INTO quests(user_id, quest_id, completed_at) VALUES (?, ?, ?)""", quests
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                self._dirty.update(dirty)
+                raise
+
+            self._evict()
+            return len(dirty)
+
+    async def _flush_loop(self):
+        while True:
+            await sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Lỗi khi lưu dữ liệu câu cá: {e}")
+
+    async def leaderboard(self, column: str = "total_caught", limit: int = 10) -> list[tuple[int, int]]:
+        """Top người chơi theo money hoặc total_caught, đọc theo chỉ mục
+
+        Người chơi dirty chưa được ghi nên giá trị trong database có thể đã cũ, lấy thêm len(dirty) dòng
+        để sau khi bỏ họ vẫn đủ limit dòng, rồi gộp với giá trị đang nằm trong cache
+        """
+        if column not in LEADERBOARD_COLUMNS:
+            raise ValueError(f"Unknown leaderboard column: {column}")
+        dirty = {user_id: self._players[user_id][column] for user_id in self._dirty if user_id in self._players}
+        db = await self.connection()
+        async with db.execute(
+            f"""SELECT user_id, {column} FROM players ORDER BY {column} DESC LIMIT ?""", (limit + len(dirty),)
+        ) as cursor:
+            rows = [(user_id, value) for user_id, value in await cursor.fetchall() if user_id not in dirty]
+        rows.extend(dirty.items())
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:limit]
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._connection is not None:
+            try:
+                await self.flush()
+            finally:
+                await self._connection.close()
+                self._connection = None
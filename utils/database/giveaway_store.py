@@ -0,0 +1,203 @@
+import json
+import os
+from datetime import datetime
+from logging import getLogger
+from typing import Optional
+
+import aiosqlite
+from asyncio import Lock
+
+logger = getLogger(__name__)
+
+GIVEAWAY_COLUMNS = ("id", "guild_id", "channel_id", "message_id", "host_id", "prize",
+                    "duration", "winners", "start_time", "end_time", "ended")
+
+
+class GiveawayStore:
+    """Lưu giveaway trong SQLite, truy vấn theo chỉ mục thay vì đọc lại toàn bộ file JSON
+
+    Người tham gia được lưu thành từng dòng riêng, tham gia chỉ là một lệnh INSERT
+    """
+
+    DATABASE_PATH = "databases/giveaways.sqlite"
+    LEGACY_PATH = "data/giveaways.json"
+
+    def __init__(self, path: str = DATABASE_PATH):
+        self.path = path
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._connect_lock = Lock()
+
+    async def connection(self) -> aiosqlite.Connection:
+        if self._connection is None:
+            async with self._connect_lock:
+                if self._connection is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    db = await aiosqlite.connect(self.path)
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.execute("PRAGMA synchronous=NORMAL")
+                    await self._build_tables(db)
+                    self._connection = db
+                    await self._migrate_legacy()
+        return self._connection
+
+    async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    async def _build_tables(db: aiosqlite.Connection):
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS giveaways(
+                id TEXT PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                host_id INTEGER NOT NULL,
+                prize TEXT NOT NULL,
+                duration INTEGER NOT NULL,
+                winners INTEGER NOT NULL,
+                start_time REAL NOT NULL,
+                end_time REAL NOT NULL,
+                ended INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        await db.execute("""CREATE INDEX IF NOT EXISTS idx_giveaways_pending ON giveaways(ended, end_time)""")
+        await db.execute("""CREATE INDEX IF NOT EXISTS idx_giveaways_guild ON giveaways(guild_id, ended)""")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS giveaway_participants(
+                giveaway_id TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                joined_at REAL NOT NULL,
+                PRIMARY KEY (giveaway_id, user_id)
+            ) WITHOUT ROWID
+        """)
+        await db.commit()
+
+    async def _migrate_legacy(self):
+        """Chuyển dữ liệu từ data/giveaways.json sang SQLite ở lần chạy đầu tiên"""
+        if not os.path.exists(self.LEGACY_PATH):
+            return
+        try:
+            with open(self.LEGACY_PATH, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.error(f"Không thể đọc {self.LEGACY_PATH}: {e}")
+            return
+
+        for giveaway_id, giveaway in legacy.items():
+            await self.create(giveaway_id, giveaway, commit=False)
+            await self._connection.executemany(
+                """INSERT OR IGNORE INTO giveaway_participants(giveaway_id, user_id, joined_at) VALUES (?, ?, ?)""",
+                [(giveaway_id, user_id, 0) for user_id in giveaway.get('participants', [])]
+            )
+            if giveaway.get('ended', False):
+                await self._connection.execute("""UPDATE giveaways SET ended=1 WHERE id=?""", (giveaway_id,))
+        await self._connection.commit()
+        os.replace(self.LEGACY_PATH, self.LEGACY_PATH + ".migrated")
+        logger.info(f"Đã chuyển {len(legacy)} giveaway từ {self.LEGACY_PATH} sang SQLite")
+
+    @staticmethod
+    def _row_to_dict(row) -> dict:
+        data = dict(zip(GIVEAWAY_COLUMNS, row))
+        # Giữ nguyên định dạng cũ để phần hiển thị không phải thay đổi
+        data['start_time'] = datetime.fromtimestamp(data['start_time']).isoformat()
+        data['end_time'] = datetime.fromtimestamp(data['end_time']).isoformat()
+        data['ended'] = bool(data['ended'])
+        return data
+
+    async def create(self, giveaway_id: str, giveaway: dict, commit: bool = True):
+        db = self._connection if not commit else await self.connection()
+        await db.execute(
+            f"""INSERT OR IGNORE INTO giveaways({", ".join(GIVEAWAY_COLUMNS)})
+                VALUES ({", ".join("?" * len(GIVEAWAY_COLUMNS))})""",
+            (
+                giveaway_id, giveaway['guild_id'], giveaway['channel_id'], giveaway['message_id'],
+                giveaway['host_id'], giveaway['prize'], giveaway['duration'], giveaway['winners'],
+                datetime.fromisoformat(giveaway['start_time']).timestamp(),
+                datetime.fromisoformat(giveaway['end_time']).timestamp(),
+                0
+            )
+        )
+        if commit:
+            await db.commit()
+
+    async def get(self, giveaway_id: str, with_participants: bool = True) -> Optional[dict]:
+        db = await self.connection()
+        async with db.execute(
+            f"""SELECT {", ".join(GIVEAWAY_COLUMNS)} FROM giveaways WHERE id=?""", (giveaway_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        giveaway = self._row_to_dict(row)
+        if with_participants:
+            giveaway['participants'] = await self.participants(giveaway_id)
+        else:
+            giveaway['participant_count'] = await self.participant_count(giveaway_id)
+        return giveaway
+
+    async def participants(self, giveaway_id: str) -> list[int]:
+        db = await self.connection()
+        async with db.execute(
+            """SELECT user_id FROM giveaway_participants WHERE giveaway_id=? ORDER BY joined_at""",
+            (giveaway_id,)
+        ) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+    async def participant_count(self, giveaway_id: str) -> int:
+        db = await self.connection()
+        async with db.execute(
+            """SELECT COUNT(*) FROM giveaway_participants WHERE giveaway_id=?""", (giveaway_id,)
+        ) as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def add_participant(self, giveaway_id: str, user_id: int) -> bool:
+        """Thêm người tham gia, trả về False nếu người này đã tham gia trước đó"""
+        db = await self.connection()
+        cursor = await db.execute(
+            """INSERT OR IGNORE INTO giveaway_participants(giveaway_id, user_id, joined_at) VALUES (?, ?, ?)""",
+            (giveaway_id, user_id, datetime.now().timestamp())
+        )
+        await db.commit()
+        return cursor.rowcount > 0
+
+    async def mark_ended(self, giveaway_id: str):
+        db = await self.connection()
+        await db.execute("""UPDATE giveaways SET ended=1 WHERE id=?""", (giveaway_id,))
+        await db.commit()
+
+    async def pending(self) -> list[tuple[float, str]]:
+        """Các giveaway chưa kết thúc dưới dạng (end_time, id), dùng để dựng heap hạn chót"""
+        db = await self.connection()
+        async with db.execute(
+            """SELECT end_time, id FROM giveaways WHERE ended=0 ORDER BY end_time"""
+        ) as cursor:
+            return [(end_time, giveaway_id) for end_time, giveaway_id in await cursor.fetchall()]
+
+    async def active_in_guild(self, guild_id: int, now: float, limit: Optional[int] = None) -> list[dict]:
+        db = await self.connection()
+        async with db.execute(
+            f"""SELECT {", ".join(GIVEAWAY_COLUMNS)},
+                       (SELECT COUNT(*) FROM giveaway_participants p WHERE p.giveaway_id = g.id)
+                FROM giveaways g WHERE guild_id=? AND ended=0 AND end_time>? ORDER BY end_time
+                LIMIT ?""",
+            (guild_id, now, -1 if limit is None else limit)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        result = []
+        for row in rows:
+            giveaway = self._row_to_dict(row[:-1])
+            giveaway['participant_count'] = row[-1]
+            result.append(giveaway)
+        return result
+
+    async def count_active_in_guild(self, guild_id: int, now: float) -> int:
+        db = await self.connection()
+        async with db.execute(
+            """SELECT COUNT(*) FROM giveaways WHERE guild_id=? AND ended=0 AND end_time>?""",
+            (guild_id, now)
+        ) as cursor:
+            return (await cursor.fetchone())[0]
@@ -0,0 +1,189 @@
+import json
+import os
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Callable, Iterable, Optional
+
+import aiosqlite
+from asyncio import Lock, sleep, create_task, Task
+
+logger = getLogger(__name__)
+
+SNAPSHOT_COLUMNS = (
+    "guild_id", "node", "voice_channel_id", "text_channel_id", "current", "position", "paused", "volume",
+    "loop", "shuffle", "keep_connect", "autoplay_mode", "nightcore", "next_track", "played", "drawn", "autoplay"
+)
+QUEUE_COLUMNS = ("next_track", "played", "drawn", "autoplay")
+
+
+class PlayerSnapshotStore:
+    """Lưu trạng thái trình phát của từng guild trong SQLite để khôi phục sau khi khởi động lại bot
+
+    - Hàng đợi chỉ lưu encoded track, khi khôi phục được giải mã tại chỗ, không cần gọi Lavalink
+    - Mỗi flush_interval giây, trạng thái của mọi trình phát được chụp lại nhưng chỉ các dòng
+      thay đổi so với lần ghi trước mới được ghi, gộp trong một transaction
+    - Trình phát không còn tồn tại thì dòng của nó bị xóa ở lần flush kế tiếp, trừ các dòng
+      chưa khôi phục được (node chưa sẵn sàng, guild chưa có trong cache...), chúng được giữ lại
+      để thử lại cho tới khi khôi phục thành công hoặc quá max_age giây
+    """
+
+    DATABASE_PATH = "databases/players.sqlite"
+
+    def __init__(self, source: Callable[[], Iterable[dict]], path: str = DATABASE_PATH, flush_interval: float = 15,
+                 max_age: float = 86400):
+        self.path = path
+        self.source = source
+        self.flush_interval = flush_interval
+        self.max_age = max_age
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._connect_lock = Lock()
+        self._flush_lock = Lock()
+        # guild_id -> dòng đã ghi gần nhất
+        self._written: dict[int, tuple] = {}
+        # guild_id -> snapshot đã đọc lúc khởi động nhưng chưa khôi phục
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._flush_task: Optional[Task] = None
+
+    async def connection(self) -> aiosqlite.Connection:
+        if self._connection is None:
+            async with self._connect_lock:
+                if self._connection is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    db = await aiosqlite.connect(self.path)
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.execute("PRAGMA synchronous=NORMAL")
+                    await self._build_tables(db)
+                    self._connection = db
+        return self._connection
+
+    @staticmethod
+    async def _build_tables(db: aiosqlite.Connection):
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS player_snapshots(
+                guild_id INTEGER PRIMARY KEY,
+                node TEXT,
+                voice_channel_id INTEGER NOT NULL,
+                text_channel_id INTEGER,
+                current TEXT,
+                position INTEGER NOT NULL DEFAULT 0,
+                paused INTEGER NOT NULL DEFAULT 0,
+                volume INTEGER NOT NULL DEFAULT 100,
+                loop INTEGER NOT NULL DEFAULT 0,
+                shuffle INTEGER NOT NULL DEFAULT 0,
+                keep_connect INTEGER NOT NULL DEFAULT 0,
+                autoplay_mode INTEGER NOT NULL DEFAULT 0,
+                nightcore INTEGER NOT NULL DEFAULT 0,
+                next_track TEXT NOT NULL DEFAULT '[]',
+                played TEXT NOT NULL DEFAULT '[]',
+                drawn TEXT NOT NULL DEFAULT '[]',
+                autoplay TEXT NOT NULL DEFAULT '[]',
+                updated_at REAL NOT NULL
+            )
+        """)
+        await db.commit()
+
+    @staticmethod
+    def _to_row(snapshot: dict) -> tuple:
+        return tuple(
+            json.dumps(snapshot.get(column, [])) if column in QUEUE_COLUMNS else snapshot.get(column)
+            for column in SNAPSHOT_COLUMNS
+        )
+
+    @staticmethod
+    def _from_row(row) -> dict[str, Any]:
+        snapshot = dict(zip(SNAPSHOT_COLUMNS, row))
+        for column in QUEUE_COLUMNS:
+            snapshot[column] = json.loads(snapshot[column])
+        for column in ("paused", "autoplay_mode"):
+            snapshot[column] = bool(snapshot[column])
+        return snapshot
+
+    async def load_all(self) -> list[dict[str, Any]]:
+        """Đọc toàn bộ trạng thái đã lưu, dùng khi khởi động bot, các trạng thái được giữ lại tới khi khôi phục xong"""
+        db = await self.connection()
+        async with db.execute(
+            f"""SELECT {", ".join(SNAPSHOT_COLUMNS)}, updated_at FROM player_snapshots"""
+        ) as cursor:
+            rows = await cursor.fetchall()
+        self._written = {row[0]: tuple(row[:-1]) for row in rows}
+        self._pending = {row[0]: {**self._from_row(row[:-1]), "updated_at": row[-1]} for row in rows}
+        return self.pending()
+
+    def pending(self) -> list[dict[str, Any]]:
+        """Các trạng thái chưa khôi phục và chưa hết hạn"""
+        expired_before = datetime.now().timestamp() - self.max_age
+        return [snapshot for snapshot in self._pending.values() if snapshot["updated_at"] >= expired_before]
+
+    def restored(self, guild_id: int):
+        """Đánh dấu trạng thái đã được khôi phục (hoặc không bao giờ khôi phục được), lần flush sau sẽ tự xử lý dòng này"""
+        self._pending.pop(guild_id, None)
+
+    async def delete(self, guild_id: int):
+        db = await self.connection()
+        await db.execute("""DELETE FROM player_snapshots WHERE guild_id=?""", (guild_id,))
+        await db.commit()
+        self._written.pop(guild_id, None)
+
+    async def flush(self) -> int:
+        """Chụp lại trạng thái hiện tại, chỉ ghi các dòng đã thay đổi và xóa trình phát đã mất"""
+        async with self._flush_lock:
+            rows = {row[0]: row for row in map(self._to_row, self.source())}
+            expired_before = datetime.now().timestamp() - self.max_age
+            for guild_id in list(self._pending):
+                # Guild đã có trình phát mới, hoặc trạng thái đã quá cũ
+                if guild_id in rows or self._pending[guild_id]["updated_at"] < expired_before:
+                    del self._pending[guild_id]
+            changed = [row for guild_id, row in rows.items() if self._written.get(guild_id) != row]
+            removed = [guild_id for guild_id in self._written if guild_id not in rows and guild_id not in self._pending]
+            if not changed and not removed:
+                return 0
+
+            db = await self.connection()
+            now = datetime.now().timestamp()
+            try:
+                await db.executemany(
+                    f"""INSERT OR REPLACE INTO player_snapshots({", ".join(SNAPSHOT_COLUMNS)}, updated_at)
+                        VALUES ({", ".join("?" * (len(SNAPSHOT_COLUMNS) + 1))})""",
+                    [(*row, now) for row in changed]
+                )
+                await db.executemany(
+                    """DELETE FROM player_snapshots WHERE guild_id=?""", [(guild_id,) for guild_id in removed]
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+            for row in changed:
+                self._written[row[0]] = row
+            for guild_id in removed:
+                del self._written[guild_id]
+            return len(changed) + len(removed)
+
+    def start(self):
+        """Bắt đầu lưu định kỳ, chỉ gọi sau load_all để các trạng thái cũ được giữ lại chờ khôi phục"""
+        if self._flush_task is None:
+            self._flush_task = create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Lỗi khi lưu trạng thái trình phát: {e}")
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+            # Lần ghi cuối lấy vị trí phát chính xác ngay trước khi tắt bot
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Lỗi khi lưu trạng thái trình phát: {e}")
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
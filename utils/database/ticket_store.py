@@ -0,0 +1,177 @@
+import json
+import os
+from datetime import datetime
+from logging import getLogger
+from typing import Optional
+
+import aiosqlite
+from asyncio import Lock
+
+logger = getLogger(__name__)
+
+TICKET_COLUMNS = ("channel_id", "guild_id", "user_id", "type", "created_at", "status")
+
+
+class TicketStore:
+    """Lưu ticket trong SQLite, mỗi ticket là một dòng riêng
+
+    - Tra cứu theo kênh dùng khóa chính, theo guild / trạng thái / người tạo dùng chỉ mục
+    - Số ticket theo loại của từng guild được cộng dồn trong bảng ticket_counters
+      nên lệnh thống kê không phải quét lại lịch sử ticket đã đóng
+    """
+
+    DATABASE_PATH = "databases/tickets.sqlite"
+    LEGACY_PATH = "Data/tickets.json"
+
+    def __init__(self, path: str = DATABASE_PATH):
+        self.path = path
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._connect_lock = Lock()
+        # guild_id -> {type: [total, open]}
+        self._counters: dict[int, dict[str, list[int]]] = {}
+
+    async def connection(self) -> aiosqlite.Connection:
+        if self._connection is None:
+            async with self._connect_lock:
+                if self._connection is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    db = await aiosqlite.connect(self.path)
+                    await db.execute("PRAGMA journal_mode=WAL")
+                    await db.execute("PRAGMA synchronous=NORMAL")
+                    await self._build_tables(db)
+                    self._connection = db
+                    await self._migrate_legacy()
+        return self._connection
+
+    async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    async def _build_tables(db: aiosqlite.Connection):
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS tickets(
+                channel_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                status TEXT NOT NULL DEFAULT 'open'
+            )
+        """)
+        await db.execute("""CREATE INDEX IF NOT EXISTS idx_tickets_guild_status ON tickets(guild_id, status)""")
+        await db.execute("""CREATE INDEX IF NOT EXISTS idx_tickets_owner ON tickets(guild_id, user_id, status)""")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_counters(
+                guild_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                open INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, type)
+            ) WITHOUT ROWID
+        """)
+        await db.commit()
+
+    async def _migrate_legacy(self):
+        """Chuyển Data/tickets.json sang SQLite ở lần chạy đầu tiên"""
+        if not os.path.exists(self.LEGACY_PATH):
+            return
+        try:
+            with open(self.LEGACY_PATH, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.error(f"Không thể đọc {self.LEGACY_PATH}: {e}")
+            return
+
+        for ticket in legacy.values():
+            await self._insert(ticket)
+        await self._connection.commit()
+        os.replace(self.LEGACY_PATH, self.LEGACY_PATH + ".migrated")
+        logger.info(f"Đã chuyển {len(legacy)} ticket từ {self.LEGACY_PATH} sang SQLite")
+
+    @staticmethod
+    def _row_to_dict(row) -> dict:
+        data = dict(zip(TICKET_COLUMNS, row))
+        # Giữ nguyên định dạng cũ để phần hiển thị không phải thay đổi
+        data['created_at'] = datetime.fromtimestamp(data['created_at']).isoformat()
+        return data
+
+    async def _bump(self, guild_id: int, ticket_type: str, total: int, opened: int):
+        await self._connection.execute(
+            """INSERT INTO ticket_counters(guild_id, type, total, open) VALUES (?, ?, ?, ?)
+               ON CONFLICT(guild_id, type) DO UPDATE SET
+                   total = total + excluded.total,
+                   open = open + excluded.open""",
+            (guild_id, ticket_type, total, opened)
+        )
+        cached = self._counters.get(guild_id)
+        if cached is not None:
+            counter = cached.setdefault(ticket_type, [0, 0])
+            counter[0] += total
+            counter[1] += opened
+
+    async def _insert(self, ticket: dict):
+        status = ticket.get('status', 'open')
+        ticket_type = ticket.get('type', 'unknown')
+        cursor = await self._connection.execute(
+            f"""INSERT OR IGNORE INTO tickets({", ".join(TICKET_COLUMNS)})
+                VALUES ({", ".join("?" * len(TICKET_COLUMNS))})""",
+            (
+                ticket['channel_id'], ticket['guild_id'], ticket['user_id'], ticket_type,
+                datetime.fromisoformat(ticket['created_at']).timestamp(), status
+            )
+        )
+        if cursor.rowcount > 0:
+            await self._bump(ticket['guild_id'], ticket_type, 1, 1 if status == 'open' else 0)
+
+    async def create(self, ticket: dict):
+        await self.connection()
+        await self._insert(ticket)
+        await self._connection.commit()
+
+    async def get(self, channel_id: int) -> Optional[dict]:
+        db = await self.connection()
+        async with db.execute(
+            f"""SELECT {", ".join(TICKET_COLUMNS)} FROM tickets WHERE channel_id=?""", (channel_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return self._row_to_dict(row) if row else None
+
+    async def mark_closed(self, channel_id: int) -> bool:
+        """Đóng ticket, trả về False nếu ticket không tồn tại hoặc đã đóng trước đó"""
+        db = await self.connection()
+        # Kiểm tra và đóng trong cùng một câu lệnh để hai lần đóng đồng thời không trừ bộ đếm hai lần
+        async with db.execute(
+            """UPDATE tickets SET status='closed' WHERE channel_id=? AND status='open' RETURNING guild_id, type""",
+            (channel_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return False
+        await self._bump(row[0], row[1], 0, -1)
+        await db.commit()
+        return True
+
+    async def count_open_by_owner(self, guild_id: int, user_id: int) -> int:
+        db = await self.connection()
+        async with db.execute(
+            """SELECT COUNT(*) FROM tickets WHERE guild_id=? AND user_id=? AND status='open'""",
+            (guild_id, user_id)
+        ) as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def stats(self, guild_id: int) -> dict[str, tuple[int, int]]:
+        """Trả về {loại ticket: (tổng số, đang mở)} của guild"""
+        cached = self._counters.get(guild_id)
+        if cached is None:
+            db = await self.connection()
+            async with db.execute(
+                """SELECT type, total, open FROM ticket_counters WHERE guild_id=?""", (guild_id,)
+            ) as cursor:
+                cached = {ticket_type: [total, opened] for ticket_type, total, opened in await cursor.fetchall()}
+            self._counters.setdefault(guild_id, cached)
+            cached = self._counters[guild_id]
+        return {ticket_type: (total, opened) for ticket_type, (total, opened) in cached.items() if total}
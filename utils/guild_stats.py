@@ -0,0 +1,115 @@
+"""
+Guild Stats
+Bộ đếm thành viên theo trạng thái, bot / người và booster của từng guild,
+được cập nhật dần theo sự kiện thay vì duyệt lại guild.members mỗi lần gọi lệnh
+"""
+
+import heapq
+from datetime import datetime
+from logging import getLogger
+from typing import Optional
+
+import disnake
+
+logger = getLogger(__name__)
+
+
+class GuildStats:
+    __slots__ = ("total", "bots", "status", "boosters")
+
+    def __init__(self):
+        self.total = 0
+        self.bots = 0
+        # "online" / "idle" / "dnd" / "offline" -> số thành viên
+        self.status: dict[str, int] = {}
+        # member_id -> premium_since
+        self.boosters: dict[int, datetime] = {}
+
+    @property
+    def humans(self) -> int:
+        return self.total - self.bots
+
+    def count(self, status: disnake.Status) -> int:
+        return self.status.get(str(status), 0)
+
+    @property
+    def online(self) -> int:
+        """Số thành viên không offline"""
+        return self.total - self.count(disnake.Status.offline)
+
+    def recent_boosters(self, limit: int = 5) -> list[tuple[int, datetime]]:
+        return heapq.nlargest(limit, self.boosters.items(), key=lambda item: item[1])
+
+    def _apply(self, member: disnake.Member, sign: int):
+        self.total += sign
+        if member.bot:
+            self.bots += sign
+        key = str(member.status)
+        self.status[key] = self.status.get(key, 0) + sign
+        if sign > 0 and member.premium_since:
+            self.boosters[member.id] = member.premium_since
+        elif sign < 0:
+            self.boosters.pop(member.id, None)
+
+
+class GuildStatsService:
+    """Giữ GuildStats cho từng guild, dựng bằng một lần duyệt rồi chỉ cập nhật theo sự kiện
+
+    Nếu tổng số đếm được lệch với số thành viên trong cache (vd: guild vừa được chunk xong)
+    thì bộ đếm của guild đó được dựng lại ở lần truy vấn tiếp theo
+    """
+
+    def __init__(self):
+        self._guilds: dict[int, GuildStats] = {}
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    def rebuild(self, guild: disnake.Guild) -> GuildStats:
+        stats = GuildStats()
+        for member in guild.members:
+            stats._apply(member, 1)
+        self._guilds[guild.id] = stats
+        return stats
+
+    def get(self, guild: disnake.Guild) -> GuildStats:
+        stats = self._guilds.get(guild.id)
+        # guild.members dựng lại cả danh sách mỗi lần gọi, đọc thẳng kích thước cache cho O(1)
+        if stats is None or stats.total != len(guild._members):  # noqa
+            stats = self.rebuild(guild)
+        return stats
+
+    def forget(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+    def _tracked(self, guild_id: int) -> Optional[GuildStats]:
+        # Guild chưa từng được truy vấn thì không cần theo dõi, sẽ được dựng khi cần
+        return self._guilds.get(guild_id)
+
+    def member_join(self, member: disnake.Member):
+        stats = self._tracked(member.guild.id)
+        if stats is not None:
+            stats._apply(member, 1)
+
+    def member_remove(self, member: disnake.Member):
+        stats = self._tracked(member.guild.id)
+        if stats is not None:
+            stats._apply(member, -1)
+
+    def member_update(self, before: disnake.Member, after: disnake.Member):
+        """Cập nhật khi trạng thái hoặc boost của thành viên thay đổi"""
+        stats = self._tracked(after.guild.id)
+        if stats is None:
+            return
+        before_status, after_status = str(before.status), str(after.status)
+        if before_status != after_status:
+            stats.status[before_status] = stats.status.get(before_status, 0) - 1
+            stats.status[after_status] = stats.status.get(after_status, 0) + 1
+        if before.premium_since != after.premium_since:
+            if after.premium_since:
+                stats.boosters[after.id] = after.premium_since
+            else:
+                stats.boosters.pop(after.id, None)
+
+
+GUILD_STATS = GuildStatsService()
@@ -0,0 +1,188 @@
+"""
+JSON Persistence
+Dịch vụ lưu file JSON dùng chung cho các cog: gộp nhiều lần ghi liên tiếp (debounce),
+tuần tự hóa trong thread và ghi nguyên tử bằng file tạm + os.replace
+"""
+
+import asyncio
+import json
+import os
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+logger = getLogger(__name__)
+
+
+class DocumentMetrics:
+    __slots__ = ("writes", "errors", "bytes_written", "last_bytes", "last_latency", "total_latency", "max_latency")
+
+    def __init__(self):
+        self.writes = 0
+        self.errors = 0
+        self.bytes_written = 0
+        self.last_bytes = 0
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, size: int, latency: float):
+        self.writes += 1
+        self.bytes_written += size
+        self.last_bytes = size
+        self.last_latency = latency
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def to_dict(self) -> dict:
+        return {
+            "writes": self.writes,
+            "errors": self.errors,
+            "bytes_written": self.bytes_written,
+            "last_bytes": self.last_bytes,
+            "last_latency_ms": round(self.last_latency * 1000, 3),
+            "avg_latency_ms": round(self.total_latency / self.writes * 1000, 3) if self.writes else 0.0,
+            "max_latency_ms": round(self.max_latency * 1000, 3),
+        }
+
+
+class JsonDocument:
+    """Một file JSON được đăng ký với dịch vụ, nội dung lấy từ source() tại thời điểm ghi"""
+
+    def __init__(self, name: str, path: str, source: Callable[[], Any], indent: Optional[int], debounce: float):
+        self.name = name
+        self.path = path
+        self.source = source
+        self.indent = indent
+        self.debounce = debounce
+        self.dirty = False
+        # Số lần ghi lỗi liên tiếp, dùng để giãn thời gian thử lại
+        self.failures = 0
+        self.metrics = DocumentMetrics()
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()
+
+    def serialize(self) -> bytes:
+        """Tuần tự hóa trên event loop, để dữ liệu không bị cog sửa giữa chừng"""
+        return json.dumps(self.source(), ensure_ascii=False, indent=self.indent).encode("utf-8")
+
+    def write(self, payload: bytes) -> int:
+        """Ghi nội dung đã tuần tự hóa ra file, chạy trong thread"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        return len(payload)
+
+
+class JsonPersistence:
+    """Quản lý các JsonDocument, cog chỉ cần gọi mark_dirty sau khi sửa dữ liệu"""
+
+    def __init__(self, debounce: float = 2.0):
+        self.debounce = debounce
+        self.documents: dict[str, JsonDocument] = {}
+
+    @staticmethod
+    def load(path: str, default: Any = None) -> Any:
+        """Đọc file JSON, trả về default nếu file chưa tồn tại hoặc bị lỗi"""
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Không thể đọc {path}: {e}")
+        return default
+
+    def register(self, name: str, path: str, source: Callable[[], Any],
+                 indent: Optional[int] = 2, debounce: Optional[float] = None) -> JsonDocument:
+        document = self.documents.get(name)
+        if document is not None:
+            # Cog được nạp lại, chỉ cập nhật nguồn dữ liệu
+            document.source = source
+            return document
+        document = JsonDocument(name, path, source, indent, self.debounce if debounce is None else debounce)
+        self.documents[name] = document
+        return document
+
+    def mark_dirty(self, name: str):
+        """Đánh dấu tài liệu đã thay đổi, các lần gọi liên tiếp được gộp thành một lần ghi"""
+        document = self.documents[name]
+        document.dirty = True
+        if document._handle is not None:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Chưa có event loop (đang nạp cog), ghi ngay
+            self._write_now(document)
+            return
+        self._schedule(document, document.debounce)
+
+    def _schedule(self, document: JsonDocument, delay: float):
+        loop = asyncio.get_running_loop()
+        document._handle = loop.call_later(delay, lambda: loop.create_task(self.flush(document.name)))
+
+    def _failed(self, document: JsonDocument, error: Exception):
+        """Ghi lỗi: giữ trạng thái dirty và hẹn lần thử lại, thời gian chờ tăng dần tới tối đa 60 giây"""
+        document.dirty = True
+        document.failures += 1
+        document.metrics.errors += 1
+        logger.error(f"Lỗi khi lưu {document.path}: {error}")
+        if document._handle is not None:
+            return
+        try:
+            self._schedule(document, min(document.debounce * 2 ** document.failures, 60.0))
+        except RuntimeError:
+            pass
+
+    def _write_now(self, document: JsonDocument):
+        document.dirty = False
+        started = perf_counter()
+        try:
+            size = document.write(document.serialize())
+        except Exception as e:
+            self._failed(document, e)
+            return
+        document.failures = 0
+        document.metrics.record(size, perf_counter() - started)
+
+    async def flush(self, name: str):
+        """Ghi tài liệu ngay nếu có thay đổi"""
+        document = self.documents[name]
+        if document._handle is not None:
+            document._handle.cancel()
+            document._handle = None
+        async with document._lock:
+            if not document.dirty:
+                return
+            document.dirty = False
+            started = perf_counter()
+            try:
+                # Chỉ giao bytes đã tuần tự hóa cho thread, thread không đọc dữ liệu đang sống của cog
+                payload = document.serialize()
+                size = await asyncio.to_thread(document.write, payload)
+            except Exception as e:
+                self._failed(document, e)
+                return
+            document.failures = 0
+            latency = perf_counter() - started
+            document.metrics.record(size, latency)
+            logger.debug(f"Đã lưu {document.path} ({size} bytes, {latency * 1000:.1f} ms)")
+
+    async def flush_all(self):
+        for name in list(self.documents):
+            await self.flush(name)
+
+    def metrics(self) -> dict[str, dict]:
+        return {
+            name: {**document.metrics.to_dict(), "pending": document.dirty}
+            for name, document in self.documents.items()
+        }
+
+
+PERSISTENCE = JsonPersistence(debounce=float(os.environ.get("PERSISTENCE_DEBOUNCE", 2.0)))